@@ -1,4 +1,5 @@
 import redis
+import redis.asyncio
 from fastapi import HTTPException
 
 from backend.config.settings import settings
@@ -9,6 +10,7 @@ class RedisClient:
         self.redis_url = redis_url
         self.db = db
         self.redis_client = None
+        self.async_redis_client = None
 
     def connect(self):
         """Connect to Redis server"""
@@ -17,6 +19,10 @@ class RedisClient:
                 self.redis_url, db=self.db, decode_responses=True
             )
             self.redis_client.ping()
+            # Connects lazily; used by request paths that must not block the loop
+            self.async_redis_client = redis.asyncio.from_url(
+                self.redis_url, db=self.db, decode_responses=True
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Unable to connect to Redis: {str(e)}"
@@ -28,6 +34,23 @@ class RedisClient:
             raise HTTPException(status_code=503, detail="Redis client is not connected")
         return self.redis_client
 
+    def get_async_redis_client(self):
+        """Get asyncio Redis client instance"""
+        if not self.async_redis_client:
+            raise HTTPException(status_code=503, detail="Redis client is not connected")
+        return self.async_redis_client
+
+    async def disconnect_async(self):
+        """Close the asyncio Redis client"""
+        try:
+            if self.async_redis_client:
+                await self.async_redis_client.aclose()
+                self.async_redis_client = None
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Unable to close Redis connection: {str(e)}"
+            )
+
     def disconnect(self):
         """Disconnect from Redis"""
         try:
@@ -6,6 +6,12 @@ class Settings(BaseSettings):
     MONGODB_URL: str = "mongodb://localhost:27017"
     MONGODB_DB_NAME: str = "web-rag-engine"
     MONGODB_URLS_COLLECTION: str = "urls"
+    INDEX_BOOTSTRAP_ENABLED: bool = True  # create and verify indexes at startup
+    CHAT_SESSION_TTL_SECONDS: int = 0  # delete sessions idle this long (0 = never)
+
+    # Chunk storage settings
+    CHUNK_STORAGE_MODE: str = "inline"  # inline | offsets
+    CHUNK_PAGE_CACHE_SIZE: int = 256
 
     # Redis settings
     REDIS_URL: str
@@ -19,6 +25,103 @@ class Settings(BaseSettings):
     # Embedding settings
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
     EMBEDDING_DIMENSION: int = 384
+    EMBEDDING_STORAGE_DTYPE: str = "float32"  # float32 | float16 | none
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_POOL_PROCESSES: int = 0  # >1 enables the multi-process pool
+    EMBEDDING_POOL_MIN_CHUNKS: int = 256
+
+    # Query embedding cache settings
+    QUERY_EMBEDDING_CACHE_SIZE: int = 4096
+    QUERY_EMBEDDING_CACHE_REDIS: bool = False
+    QUERY_EMBEDDING_CACHE_TTL: int = 86400
+
+    # Near-duplicate detection settings
+    DEDUP_MODE: str = "off"  # off | drop | link
+    DEDUP_HAMMING_THRESHOLD: int = 3
+    DEDUP_SHINGLE_SIZE: int = 3
+
+    # Vector store settings
+    VECTOR_STORE_BACKEND: str = "pinecone"  # pinecone | hnsw | flat | binary
+    VECTOR_STORE_PATH: str = "data/vector_store"
+    VECTOR_STORE_SAVE_INTERVAL: float = 30.0  # seconds between HNSW index saves
+    VECTOR_STORE_RELOAD_INTERVAL: float = 60.0  # min seconds between HNSW reloads
+
+    # HNSW settings (local vector store)
+    HNSW_M: int = 16
+    HNSW_EF_CONSTRUCTION: int = 200
+    HNSW_EF_SEARCH: int = 64
+    HNSW_INITIAL_CAPACITY: int = 100000
+    HNSW_FILTER_EXACT_THRESHOLD: int = 2048  # filtered matches scored exactly
+
+    # Flat settings (local exact vector store)
+    FLAT_SEARCH_BLOCK_ROWS: int = 65536
+    FLAT_COMPACT_RATIO: float = 0.25
+    BINARY_RESCORE_MULTIPLIER: int = 8  # shortlist = top_k * multiplier
+
+    # Hybrid search settings (BM25 + vector, fused with reciprocal rank fusion)
+    HYBRID_SEARCH_ENABLED: bool = True
+    HYBRID_FETCH_MULTIPLIER: int = 2  # candidates per retriever = top_k * multiplier
+    BM25_K1: float = 1.2
+    BM25_B: float = 0.75
+    BM25_JOB_BATCH_SIZE: int = 64  # jobs scored per round trip
+    BM25_MAX_SCORED_JOBS: int = 2000  # per query, highest score bounds first
+    RRF_K: int = 60
+
+    # Rerank settings (cross-encoder over over-fetched candidates)
+    RERANK_ENABLED: bool = False
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 20
+    RERANK_BATCH_SIZE: int = 32
+    RERANK_CACHE_SIZE: int = 20000
+
+    # Context selection settings
+    MMR_ENABLED: bool = False
+    MMR_LAMBDA: float = 0.7  # 1.0 = relevance only, 0.0 = diversity only
+    MMR_FETCH_MULTIPLIER: int = 2  # MMR picks top_k from top_k * multiplier
+    SCORE_CUTOFF_RATIO: float = 0.0  # drop hits below ratio * best score (0 = off)
+
+    # Semantic answer cache settings (stateless queries only)
+    ANSWER_CACHE_ENABLED: bool = False
+    ANSWER_CACHE_SIZE: int = 1024
+    ANSWER_CACHE_THRESHOLD: float = 0.95  # cosine similarity of query embeddings
+    ANSWER_CACHE_TTL: int = 3600
+
+    # Query coalescing settings (identical in-flight stateless queries)
+    QUERY_COALESCING_ENABLED: bool = False
+
+    # Chat session memory settings
+    SESSION_MEMORY_MODE: str = "window"  # "window" (last messages) or "summary"
+    SESSION_HISTORY_MESSAGES: int = 9  # Previous messages in "window" mode
+    SESSION_SUMMARY_TRIGGER_TOKENS: int = 800  # Unsummarized tokens before refresh
+    SESSION_SUMMARY_KEEP_MESSAGES: int = 4  # Recent messages never summarized
+    SESSION_SUMMARY_MAX_TOKENS: int = 400
+
+    # Chat session cache settings (Redis hot cache of active sessions)
+    SESSION_CACHE_ENABLED: bool = True
+    SESSION_CACHE_TTL: int = 3600  # Seconds since last access
+    SESSION_CACHE_MESSAGES: int = 50  # Recent messages kept per session
+    SESSION_WRITE_MODE: str = "write_through"  # write_through | write_behind
+    SESSION_FLUSH_INTERVAL: float = 1.0  # Seconds between write-behind flushes
+    SESSION_FLUSH_BATCH_SIZE: int = 500
+
+    # Prompt budget settings (tokens estimated as chars/4 unless a tokenizer is set)
+    # Llama 3 tokenizer (GROQ_MODEL's); empty estimates 4 characters per token
+    PROMPT_TOKENIZER: str = "NousResearch/Meta-Llama-3-8B-Instruct"
+    PROMPT_MAX_TOKENS: int = 6000
+    PROMPT_HISTORY_SHARE: float = 0.25  # Of the tokens left after instructions
+    PROMPT_MIN_CHUNK_TOKENS: int = 64  # Smallest truncated chunk worth keeping
+    PROMPT_TOKEN_CACHE_SIZE: int = 20000
+
+    # Query settings
+    QUERY_MAX_TOP_K: int = 50  # Largest top_k accepted by /query and /query/batch
+
+    # Batch query settings
+    QUERY_BATCH_MAX_QUERIES: int = 5000
+    QUERY_BATCH_SEARCH_CONCURRENCY: int = 16
+    QUERY_BATCH_LLM_CONCURRENCY: int = 4  # Per batch, within GROQ_MAX_CONCURRENCY
+
+    # Search settings (/search endpoint)
+    SEARCH_MAX_DEPTH: int = 500  # Matches ranked per page; deepest rank reachable
 
     # Pinecone settings
     PINECONE_API_KEY: str
@@ -28,6 +131,9 @@ class Settings(BaseSettings):
     # Groq settings
     GROQ_API_KEY: str
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    GROQ_TIMEOUT_SECONDS: float = 60.0  # Per completion call
+    GROQ_MAX_RETRIES: int = 2
+    GROQ_MAX_CONCURRENCY: int = 16  # In-flight completions per process
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,10 @@
+from typing import Any, Dict
+
+from backend.services.metrics_service import metrics_service
+
+
+class MetricsController:
+    """Controller for runtime statistics"""
+
+    async def get_metrics(self) -> Dict[str, Any]:
+        return metrics_service.snapshot()
@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import Depends
 
+from backend.models.schemas.query_schema import QueryFilters
 from backend.usecases.query_usecase import QueryUsecase
 
 
@@ -10,6 +11,30 @@ class QueryController:
         self.query_usecase = query_usecase
 
     async def query_documents(
-        self, request: str, session_id: Optional[str] = None, top_k: int = 5
+        self,
+        request: str,
+        session_id: Optional[str] = None,
+        top_k: int = 5,
+        filters: Optional[QueryFilters] = None,
     ):
-        return await self.query_usecase.query_documents(request, session_id, top_k)
+        return await self.query_usecase.query_documents(
+            request, session_id, top_k, filters
+        )
+
+    def stream_query(
+        self,
+        request: str,
+        session_id: Optional[str] = None,
+        top_k: int = 5,
+        filters: Optional[QueryFilters] = None,
+    ):
+        return self.query_usecase.stream_query(request, session_id, top_k, filters)
+
+    def query_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[QueryFilters] = None,
+        retrieval_only: bool = False,
+    ):
+        return self.query_usecase.query_batch(queries, top_k, filters, retrieval_only)
@@ -0,0 +1,23 @@
+from typing import Optional
+
+from fastapi import Depends
+
+from backend.models.schemas.query_schema import QueryFilters
+from backend.usecases.search_usecase import SearchUsecase
+
+
+class SearchController:
+    def __init__(self, search_usecase: SearchUsecase = Depends(SearchUsecase)):
+        self.search_usecase = search_usecase
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        min_score: Optional[float] = None,
+        filters: Optional[QueryFilters] = None,
+        cursor: Optional[str] = None,
+    ):
+        return await self.search_usecase.search(
+            query, top_k, min_score, filters, cursor
+        )
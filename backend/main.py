@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 import uvicorn
@@ -6,7 +7,14 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from backend.config.database import mongodb_database
 from backend.config.redis import redis_client
-from backend.routes import query_route, url_route
+from backend.routes import metrics_route, query_route, search_route, url_route
+from backend.services.background_service import background_service
+from backend.services.index_service import IndexService
+from backend.services.session_cache_service import session_cache
+from backend.services.vector_stores import run_vector_store_flusher
+from backend.usecases.chat_session_usecase import run_session_expiry
+from backend.usecases.groq_usecase import close_groq_client
+from backend.usecases.prompt_usecase import load_prompt_tokenizer
 
 
 @asynccontextmanager
@@ -17,10 +25,41 @@ async def db_lifespan(app: FastAPI):
     # Connect to Redis
     redis_client.connect()
 
+    # Load the prompt tokenizer (if PROMPT_TOKENIZER is set) before serving
+    await asyncio.to_thread(load_prompt_tokenizer)
+
+    # Create missing MongoDB indexes without delaying startup
+    index_task = asyncio.create_task(IndexService().bootstrap())
+
+    # Write-behind flusher for cached chat sessions
+    flusher_task = asyncio.create_task(session_cache.run_flusher())
+
+    # Periodic and shutdown saves of local vector indexes written by the API
+    vector_store_task = asyncio.create_task(run_vector_store_flusher())
+
+    # Deletes idle chat sessions with their messages (CHAT_SESSION_TTL_SECONDS)
+    expiry_task = asyncio.create_task(run_session_expiry())
+
     yield
 
+    if not index_task.done():
+        index_task.cancel()
+
+    # Let in-flight chat message writes finish
+    await background_service.drain()
+
+    # Flushes what is still queued once the last messages are accepted
+    flusher_task.cancel()
+    vector_store_task.cancel()
+    expiry_task.cancel()
+    await asyncio.gather(
+        flusher_task, vector_store_task, expiry_task, return_exceptions=True
+    )
+    await close_groq_client()
+
     # Disconnect from databases
     mongodb_database.disconnect()
+    await redis_client.disconnect_async()
     redis_client.disconnect()
 
 
@@ -41,6 +80,8 @@ app.add_middleware(
 # Include routers
 app.include_router(url_route.router, prefix="/api/v1", tags=["URL"])
 app.include_router(query_route.router, prefix="/api/v1", tags=["Query"])
+app.include_router(search_route.router, prefix="/api/v1", tags=["Search"])
+app.include_router(metrics_route.router, prefix="/api/v1", tags=["Metrics"])
 
 
 @app.get("/")
@@ -1,19 +1,41 @@
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from backend.config.settings import settings
+
+
+class QueryFilters(BaseModel):
+    """Optional scope of a query; all given conditions must match"""
+
+    url_prefix: Optional[str] = None
+    domains: Optional[List[str]] = None
+    job_ids: Optional[List[str]] = None
+    ingested_after: Optional[datetime] = None
 
 
 class QueryRequest(BaseModel):
     query: str
     session_id: Optional[str] = None
-    top_k: Optional[int] = 5
+    top_k: int = Field(5, ge=1, le=settings.QUERY_MAX_TOP_K)
+    filters: Optional[QueryFilters] = None
+
+
+class BatchQueryRequest(BaseModel):
+    queries: List[str]
+    top_k: int = Field(5, ge=1, le=settings.QUERY_MAX_TOP_K)  # Per query
+    filters: Optional[QueryFilters] = None
+    retrieval_only: bool = False  # Return sources without calling the LLM
 
 
 class SourceCitation(BaseModel):
     chunk_id: str
     url: str
     content: str
-    score: float
+    score: Optional[float]  # Cosine similarity; None for BM25-only hybrid hits
+    rrf_score: Optional[float] = None  # Fused score, in hybrid mode
+    rerank_score: Optional[float] = None  # When reranking is enabled
     metadata: dict
 
 
@@ -21,3 +43,4 @@ class QueryResponse(BaseModel):
     answer: str
     sources: list
     query: str
+    usage: Optional[dict] = None  # Prompt token counts, when the LLM was called
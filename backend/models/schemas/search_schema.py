@@ -0,0 +1,30 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from backend.config.settings import settings
+from backend.models.schemas.query_schema import QueryFilters
+
+
+class SearchRequest(BaseModel):
+    query: str
+    top_k: int = Field(10, ge=1, le=settings.SEARCH_MAX_DEPTH)  # Results per page
+    min_score: Optional[float] = None  # Minimum cosine similarity
+    filters: Optional[QueryFilters] = None
+    cursor: Optional[str] = None  # next_cursor of the previous page
+
+
+class SearchResult(BaseModel):
+    chunk_id: str
+    url: str
+    content: str
+    score: float
+    vector_score: Optional[float] = None
+    bm25_score: Optional[float] = None
+    metadata: dict
+
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchResult]
+    next_cursor: Optional[str] = None
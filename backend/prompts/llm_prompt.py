@@ -37,3 +37,21 @@ Instructions:
 Be natural, conversational, and intelligent about when to use context vs. chat history.
 
 Response:"""
+
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an AI assistant that answers questions from a knowledge base.
+
+Current Summary:
+{summary}
+
+New Messages:
+{messages}
+
+Instructions:
+- Rewrite the summary so it also covers the new messages
+- Keep the topics, entities, facts and sources the user asked about, and any open questions or preferences they stated
+- Keep names, numbers and URLs exactly as written
+- Drop greetings and small talk
+- Write at most {max_words} words of plain prose, without any preamble
+
+Updated Summary:"""
@@ -0,0 +1,306 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from bson import Binary, ObjectId
+
+from backend.config.database import mongodb_database
+from backend.config.settings import settings
+from backend.services.vector_stores.base import scope_metadata
+
+STATS_ID = "corpus"
+
+
+class BM25Repository:
+    """
+    Repository for the BM25 inverted index in MongoDB
+    Postings are written per (term, job) as packed little-endian uint32
+    (chunk position, term frequency) pairs, with a small header (posting
+    count, highest term frequency, shortest chunk) that bounds the block's
+    score without reading it; chunk IDs and lengths live once per job in
+    bm25_documents.
+    """
+
+    def __init__(self):
+        pass
+
+    def _get_database(self):
+        if mongodb_database.mongodb_client is None:
+            mongodb_database.connect()
+        return mongodb_database.mongodb_client[settings.MONGODB_DB_NAME]
+
+    def _postings(self):
+        return self._get_database()["bm25_postings"]
+
+    def _documents(self):
+        return self._get_database()["bm25_documents"]
+
+    def _stats(self):
+        return self._get_database()["bm25_stats"]
+
+    async def add_job_index(
+        self,
+        job_id: str,
+        url: str,
+        chunk_ids: List[str],
+        lengths: List[int],
+        postings: Dict[str, List[tuple]],
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Add the index of one ingest job
+
+        Args:
+            job_id: Job ID of the chunks
+            url: Source URL of the chunks
+            chunk_ids: Chunk IDs in position order
+            lengths: Token count of each chunk
+            postings: Term -> list of (chunk position, term frequency)
+            metadata: Job-level filter fields (domain, url_prefixes, ingested_at)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            await self._documents().insert_one(
+                {
+                    **(metadata or {}),
+                    "job_id": job_id,
+                    "url": url,
+                    "chunk_ids": chunk_ids,
+                    "lengths": Binary(np.asarray(lengths, dtype="<u4").tobytes()),
+                }
+            )
+            if postings:
+                chunk_lengths = np.asarray(lengths, dtype=np.int64)
+                blocks = []
+                for term, entries in postings.items():
+                    packed = np.asarray(entries, dtype="<u4")
+                    blocks.append(
+                        {
+                            "term": term,
+                            "job_id": job_id,
+                            "count": len(packed),
+                            "max_tf": int(packed[:, 1].max()),
+                            "min_length": int(chunk_lengths[packed[:, 0]].min()),
+                            "postings": Binary(packed.tobytes()),
+                        }
+                    )
+                await self._postings().insert_many(blocks, ordered=False)
+            await self._stats().update_one(
+                {"_id": STATS_ID},
+                {
+                    "$inc": {
+                        "document_count": len(chunk_ids),
+                        "total_length": int(sum(lengths)),
+                    }
+                },
+                upsert=True,
+            )
+            return True
+        except Exception as e:
+            print(f"❌ Failed to add BM25 index for job {job_id}: {str(e)}")
+            return False
+
+    async def get_stats(self) -> dict:
+        """Get corpus document count and total token length"""
+        try:
+            stats = await self._stats().find_one({"_id": STATS_ID})
+            return stats or {"document_count": 0, "total_length": 0}
+        except Exception as e:
+            print(f"❌ Failed to get BM25 stats: {str(e)}")
+            return {"document_count": 0, "total_length": 0}
+
+    async def get_block_headers(self, terms: List[str]) -> List[dict]:
+        """
+        Get the headers of the posting blocks of terms, without postings
+
+        Returns:
+            List of {"term", "job_id", "count", "max_tf", "min_length"};
+            blocks written before headers existed have no max_tf/min_length
+        """
+        if not terms:
+            return []
+
+        try:
+            cursor = self._postings().aggregate(
+                [
+                    {"$match": {"term": {"$in": terms}}},
+                    {
+                        "$project": {
+                            "_id": 0,
+                            "term": 1,
+                            "job_id": 1,
+                            "max_tf": 1,
+                            "min_length": 1,
+                            "count": {
+                                "$ifNull": [
+                                    "$count",
+                                    {"$divide": [{"$binarySize": "$postings"}, 8]},
+                                ]
+                            },
+                        }
+                    },
+                ]
+            )
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            print(f"❌ Failed to get BM25 block headers: {str(e)}")
+            return []
+
+    async def get_job_ids(self, filter_dict: Dict) -> List[str]:
+        """
+        Get the IDs of the jobs matching a scope filter
+
+        Args:
+            filter_dict: Pinecone-style metadata filter, as in get_documents
+
+        Returns:
+            Matching job IDs
+        """
+        try:
+            return await self._documents().distinct("job_id", filter_dict)
+        except Exception as e:
+            print(f"❌ Failed to get BM25 jobs in scope: {str(e)}")
+            return []
+
+    async def get_postings(
+        self, terms: List[str], job_ids: List[str]
+    ) -> Dict[str, List[tuple]]:
+        """
+        Get the posting blocks of terms within some jobs
+
+        Returns:
+            Term -> list of (job_id, int array of shape (n, 2))
+        """
+        postings: Dict[str, List[tuple]] = {}
+        if not terms or not job_ids:
+            return postings
+
+        try:
+            cursor = self._postings().find(
+                {"term": {"$in": terms}, "job_id": {"$in": job_ids}},
+                {"_id": 0, "term": 1, "job_id": 1, "postings": 1},
+            )
+            async for block in cursor:
+                entries = np.frombuffer(block["postings"], dtype="<u4").reshape(-1, 2)
+                postings.setdefault(block["term"], []).append(
+                    (block["job_id"], entries)
+                )
+        except Exception as e:
+            print(f"❌ Failed to get BM25 postings: {str(e)}")
+        return postings
+
+    async def get_documents(
+        self, job_ids: List[str], filter_dict: Optional[Dict] = None
+    ) -> Dict[str, dict]:
+        """
+        Get chunk IDs and lengths of jobs
+
+        Args:
+            job_ids: Jobs to fetch
+            filter_dict: Optional Pinecone-style metadata filter; its
+                operators are valid MongoDB query operators as well
+
+        Returns:
+            job_id -> {"url", "chunk_ids", "lengths" (int array)}
+        """
+        documents = {}
+        if not job_ids:
+            return documents
+
+        try:
+            query = {"job_id": {"$in": job_ids}}
+            if filter_dict:
+                query = {"$and": [query, filter_dict]}
+            cursor = self._documents().find(query, {"_id": 0})
+            async for document in cursor:
+                documents[document["job_id"]] = {
+                    "url": document.get("url"),
+                    "chunk_ids": document["chunk_ids"],
+                    "lengths": np.frombuffer(document["lengths"], dtype="<u4"),
+                }
+        except Exception as e:
+            print(f"❌ Failed to get BM25 documents: {str(e)}")
+        return documents
+
+    async def backfill_scope_metadata(self, job_id: Optional[str] = None) -> int:
+        """
+        Add scope filter fields to jobs indexed before they existed
+
+        The ingest time is taken from the document's ObjectId.
+
+        Args:
+            job_id: Optional job ID to restrict the backfill to
+
+        Returns:
+            Number of jobs updated
+        """
+        query: Dict[str, Any] = {"domain": {"$exists": False}}
+        if job_id:
+            query["job_id"] = job_id
+
+        updated = 0
+        try:
+            cursor = self._documents().find(query, {"_id": 1, "url": 1})
+            async for document in cursor:
+                ingested_at = (
+                    int(document["_id"].generation_time.timestamp())
+                    if isinstance(document["_id"], ObjectId)
+                    else None
+                )
+                fields = scope_metadata(document.get("url"), ingested_at)
+                if fields:
+                    await self._documents().update_one(
+                        {"_id": document["_id"]}, {"$set": fields}
+                    )
+                    updated += 1
+        except Exception as e:
+            print(f"❌ Failed to backfill BM25 scope metadata: {str(e)}")
+        return updated
+
+    async def delete_previous_jobs(self, url: str, job_id: str) -> int:
+        """
+        Remove the indexes of a URL's earlier ingest jobs
+
+        Args:
+            url: Re-ingested URL
+            job_id: Job ID of the current ingest, which is kept
+
+        Returns:
+            Number of jobs removed
+        """
+        try:
+            cursor = self._documents().find(
+                {"url": url, "job_id": {"$ne": job_id}}, {"_id": 0, "job_id": 1}
+            )
+            previous = [document["job_id"] async for document in cursor]
+        except Exception as e:
+            print(f"❌ Failed to find previous BM25 jobs of {url}: {str(e)}")
+            return 0
+
+        removed = 0
+        for previous_job_id in previous:
+            if await self.delete_by_job_id(previous_job_id):
+                removed += 1
+        return removed
+
+    async def delete_by_job_id(self, job_id: str) -> bool:
+        """Remove the index of one job"""
+        try:
+            document = await self._documents().find_one_and_delete({"job_id": job_id})
+            await self._postings().delete_many({"job_id": job_id})
+            if document:
+                lengths = np.frombuffer(document["lengths"], dtype="<u4")
+                await self._stats().update_one(
+                    {"_id": STATS_ID},
+                    {
+                        "$inc": {
+                            "document_count": -len(document["chunk_ids"]),
+                            "total_length": -int(lengths.sum()),
+                        }
+                    },
+                )
+            return True
+        except Exception as e:
+            print(f"❌ Failed to delete BM25 index for job {job_id}: {str(e)}")
+            return False
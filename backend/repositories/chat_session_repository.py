@@ -1,51 +1,125 @@
+import asyncio
 from datetime import datetime
 from typing import List, Optional
 
+from pymongo import DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
 from backend.config.database import mongodb_database
 from backend.config.settings import settings
 
+# Session fields returned to callers; legacy message arrays are never loaded
+SESSION_PROJECTION = {"_id": 0, "messages": 0}
+MESSAGE_PROJECTION = {"_id": 0, "session_id": 0}
+
 
 class ChatSessionRepository:
-    """Repository for managing chat sessions in MongoDB"""
+    """
+    Repository for managing chat sessions in MongoDB
+    Session state (summary, counters, timestamps) lives in chat_sessions and
+    every message is its own document in chat_messages, numbered per session
+    by seq. Reads are index range scans of a fixed size, however long the
+    session gets. Sessions written by older versions as one `messages` array
+    are moved to chat_messages the first time they are opened.
+    """
 
     def __init__(self):
         pass
 
-    def _get_collection(self):
-        """Get the chat_sessions collection"""
+    def _get_database(self):
         if mongodb_database.mongodb_client is None:
             mongodb_database.connect()
-        return mongodb_database.mongodb_client[settings.MONGODB_DB_NAME][
-            "chat_sessions"
-        ]
+        return mongodb_database.mongodb_client[settings.MONGODB_DB_NAME]
 
-    async def create_session(self, session_id: str) -> bool:
+    def _get_collection(self):
+        """Get the chat_sessions collection"""
+        return self._get_database()["chat_sessions"]
+
+    def _get_messages_collection(self):
+        """Get the chat_messages collection"""
+        return self._get_database()["chat_messages"]
+
+    async def get_or_create_session(self, session_id: str) -> Optional[dict]:
         """
-        Create a new chat session
+        Get a chat session, creating it if needed, in one round trip
 
         Args:
-            session_id: Unique session identifier
+            session_id: Session identifier
 
         Returns:
-            True if successful, False otherwise
+            Session data (without messages) or None on failure
         """
         try:
             collection = self._get_collection()
+            now = datetime.utcnow()
 
-            session_data = {
-                "session_id": session_id,
-                "messages": [],
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
-            }
+            session = await collection.find_one_and_update(
+                {"session_id": session_id},
+                {
+                    "$setOnInsert": {
+                        "session_id": session_id,
+                        "summary": "",
+                        "summarized_count": 0,
+                        "message_count": 0,
+                        "created_at": now,
+                    },
+                    "$set": {"updated_at": now},
+                },
+                # First legacy message only, to detect sessions to migrate
+                projection={"_id": 0, "messages": {"$slice": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
 
-            await collection.insert_one(session_data)
-            print(f"✅ Created new session: {session_id}")
-            return True
+            if session.pop("messages", None):
+                await self._migrate_legacy_messages(session_id)
+                session = await self.get_session(session_id)
+            return session
 
         except Exception as e:
-            print(f"❌ Failed to create session: {str(e)}")
+            print(f"❌ Failed to get or create session: {str(e)}")
+            return None
+
+    async def _migrate_legacy_messages(self, session_id: str):
+        """Move a session's embedded messages array into chat_messages"""
+        collection = self._get_collection()
+        legacy = await collection.find_one(
+            {"session_id": session_id}, {"_id": 0, "messages": 1}
+        )
+        messages = (legacy or {}).get("messages") or []
+        if messages:
+            documents = [
+                {**message, "session_id": session_id, "seq": seq}
+                for seq, message in enumerate(messages, start=1)
+            ]
+            try:
+                await self._get_messages_collection().insert_many(
+                    documents, ordered=False
+                )
+            except BulkWriteError:
+                pass  # Already moved by a concurrent request
+
+        await collection.update_one(
+            {"session_id": session_id},
+            {"$unset": {"messages": ""}, "$max": {"message_count": len(messages)}},
+        )
+        print(f"✅ Migrated {len(messages)} messages of session {session_id}")
+
+    async def create_session(self, session_id: str) -> bool:
+        """
+        Create a new chat session
+
+        Args:
+            session_id: Unique session identifier
+
+        Returns:
+            True if successful, False otherwise
+        """
+        session = await self.get_or_create_session(session_id)
+        if session is None:
             return False
+        print(f"✅ Created new session: {session_id}")
+        return True
 
     async def get_session(self, session_id: str) -> Optional[dict]:
         """
@@ -55,11 +129,13 @@ class ChatSessionRepository:
             session_id: Session identifier
 
         Returns:
-            Session data or None if not found
+            Session data (without messages) or None if not found
         """
         try:
             collection = self._get_collection()
-            session = await collection.find_one({"session_id": session_id})
+            session = await collection.find_one(
+                {"session_id": session_id}, SESSION_PROJECTION
+            )
             return session
 
         except Exception as e:
@@ -82,38 +158,106 @@ class ChatSessionRepository:
             True if successful, False otherwise
         """
         try:
-            collection = self._get_collection()
+            now = datetime.utcnow()
+
+            # Reserve the next sequence number and touch the session
+            session = await self._get_collection().find_one_and_update(
+                {"session_id": session_id},
+                {"$inc": {"message_count": 1}, "$set": {"updated_at": now}},
+                projection={"_id": 0, "message_count": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+            if session is None:
+                print(f"⚠️ Session {session_id} not found")
+                return False
 
             message = {
+                "session_id": session_id,
+                "seq": session["message_count"],
                 "role": role,
                 "content": content,
-                "timestamp": datetime.utcnow(),
+                "timestamp": now,
             }
 
             # Add sources only for assistant messages
             if role == "assistant" and sources:
                 message["sources"] = sources
 
-            # Update the session with new message
-            result = await collection.update_one(
-                {"session_id": session_id},
-                {
-                    "$push": {"messages": message},
-                    "$set": {"updated_at": datetime.utcnow()},
-                },
-            )
-
-            if result.modified_count > 0:
-                print(f"✅ Added {role} message to session {session_id}")
-                return True
-            else:
-                print(f"⚠️ Session {session_id} not found")
-                return False
+            await self._get_messages_collection().insert_one(message)
+            print(f"✅ Added {role} message to session {session_id}")
+            return True
 
         except Exception as e:
             print(f"❌ Failed to add message: {str(e)}")
             return False
 
+    async def insert_messages(self, messages: List[dict]) -> bool:
+        """
+        Write messages whose seq was already assigned (by the session cache)
+
+        Messages that already exist are skipped, so a batch can be retried.
+
+        Args:
+            messages: Message documents with "session_id", "seq" and
+                "timestamp"
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not messages:
+            return True
+
+        try:
+            try:
+                await self._get_messages_collection().insert_many(
+                    messages, ordered=False
+                )
+            except BulkWriteError as e:
+                # Duplicate keys (code 11000) mean the message is already stored
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != 11000 for error in errors):
+                    raise
+
+            latest = {}
+            for message in messages:
+                current = latest.get(message["session_id"])
+                if current is None or message["seq"] > current["seq"]:
+                    latest[message["session_id"]] = message
+            await self._get_collection().bulk_write(
+                [
+                    UpdateOne(
+                        {"session_id": session_id},
+                        {
+                            "$max": {
+                                "message_count": message["seq"],
+                                "updated_at": message["timestamp"],
+                            }
+                        },
+                    )
+                    for session_id, message in latest.items()
+                ],
+                ordered=False,
+            )
+            return True
+
+        except Exception as e:
+            print(f"❌ Failed to insert messages: {str(e)}")
+            return False
+
+    async def _get_tail(self, session_id: str, limit: int) -> List[dict]:
+        """Last `limit` messages of a session, most recent last"""
+        if limit <= 0:
+            return []
+        cursor = (
+            self._get_messages_collection()
+            .find({"session_id": session_id}, MESSAGE_PROJECTION)
+            .sort("seq", DESCENDING)
+            .limit(limit)
+        )
+        messages = await cursor.to_list(length=limit)
+        messages.reverse()
+        return messages
+
     async def get_recent_messages(self, session_id: str, limit: int = 10) -> List[dict]:
         """
         Get recent messages from a session
@@ -126,23 +270,90 @@ class ChatSessionRepository:
             List of recent messages (most recent last)
         """
         try:
-            collection = self._get_collection()
+            return await self._get_tail(session_id, limit)
+
+        except Exception as e:
+            print(f"❌ Failed to get recent messages: {str(e)}")
+            return []
+
+    async def get_memory(self, session_id: str, limit: int = 50) -> dict:
+        """
+        Get the running summary and the messages it does not cover yet
 
-            # Get session and extract messages
-            session = await collection.find_one({"session_id": session_id})
+        Args:
+            session_id: Session identifier
+            limit: Maximum number of unsummarized messages to return
 
+        Returns:
+            {"summary", "summarized_count", "message_count", "messages"}
+            with messages (each with its "seq") most recent last; empty if
+            the session is missing
+        """
+        empty = {
+            "summary": "",
+            "summarized_count": 0,
+            "message_count": 0,
+            "messages": [],
+        }
+        try:
+            session, tail = await asyncio.gather(
+                self.get_session(session_id), self._get_tail(session_id, limit)
+            )
             if not session:
                 print(f"⚠️ Session {session_id} not found")
-                return []
+                return empty
+
+            summarized_count = session.get("summarized_count", 0)
+            return {
+                "summary": session.get("summary", ""),
+                "summarized_count": summarized_count,
+                "message_count": session.get("message_count", 0),
+                "messages": [m for m in tail if m["seq"] > summarized_count],
+            }
+
+        except Exception as e:
+            print(f"❌ Failed to get session memory: {str(e)}")
+            return empty
+
+    async def update_summary(
+        self,
+        session_id: str,
+        summary: str,
+        summarized_count: int,
+        previous_count: int,
+    ) -> bool:
+        """
+        Replace the running summary
 
-            messages = session.get("messages", [])
+        Only applies if no other refresh moved the summary since previous_count
+        was read.
 
-            # Return last N messages
-            return messages[-limit:] if len(messages) > limit else messages
+        Args:
+            session_id: Session identifier
+            summary: New summary text
+            summarized_count: Sequence number of the last message covered
+            previous_count: summarized_count the new summary was built from
+
+        Returns:
+            True if the summary was replaced
+        """
+        try:
+            collection = self._get_collection()
+
+            result = await collection.update_one(
+                {
+                    "session_id": session_id,
+                    "summarized_count": (
+                        previous_count if previous_count else {"$in": [0, None]}
+                    ),
+                },
+                {"$set": {"summary": summary, "summarized_count": summarized_count}},
+            )
+            return result.modified_count > 0
 
         except Exception as e:
-            print(f"❌ Failed to get recent messages: {str(e)}")
-            return []
+            print(f"❌ Failed to update session summary: {str(e)}")
+            return False
 
     async def clear_session(self, session_id: str) -> bool:
         """
@@ -161,13 +372,19 @@ class ChatSessionRepository:
                 {"session_id": session_id},
                 {
                     "$set": {
-                        "messages": [],
+                        "summary": "",
+                        "summarized_count": 0,
+                        "message_count": 0,
                         "updated_at": datetime.utcnow(),
-                    }
+                    },
+                    "$unset": {"messages": ""},
                 },
             )
+            await self._get_messages_collection().delete_many(
+                {"session_id": session_id}
+            )
 
-            if result.modified_count > 0:
+            if result.matched_count > 0:
                 print(f"✅ Cleared session {session_id}")
                 return True
             else:
@@ -178,6 +395,49 @@ class ChatSessionRepository:
             print(f"❌ Failed to clear session: {str(e)}")
             return False
 
+    async def delete_idle_sessions(
+        self, idle_before: datetime, limit: int = 1000
+    ) -> int:
+        """
+        Delete sessions idle since before a cutoff, together with their messages
+
+        Args:
+            idle_before: Sessions last updated before this time are deleted
+            limit: Maximum number of sessions to delete in one call
+
+        Returns:
+            Number of sessions deleted
+        """
+        try:
+            collection = self._get_collection()
+            messages = self._get_messages_collection()
+
+            cursor = collection.find(
+                {"updated_at": {"$lt": idle_before}}, {"_id": 0, "session_id": 1}
+            ).limit(limit)
+            deleted = 0
+            async for session in cursor:
+                # Re-checked per session so one that became active again survives
+                result = await collection.delete_one(
+                    {
+                        "session_id": session["session_id"],
+                        "updated_at": {"$lt": idle_before},
+                    }
+                )
+                if result.deleted_count:
+                    await messages.delete_many(
+                        {
+                            "session_id": session["session_id"],
+                            "timestamp": {"$lt": idle_before},
+                        }
+                    )
+                    deleted += 1
+            return deleted
+
+        except Exception as e:
+            print(f"❌ Failed to delete idle sessions: {str(e)}")
+            return 0
+
     async def delete_session(self, session_id: str) -> bool:
         """
         Delete a chat session
@@ -192,6 +452,9 @@ class ChatSessionRepository:
             collection = self._get_collection()
 
             result = await collection.delete_one({"session_id": session_id})
+            await self._get_messages_collection().delete_many(
+                {"session_id": session_id}
+            )
 
             if result.deleted_count > 0:
                 print(f"✅ Deleted session {session_id}")
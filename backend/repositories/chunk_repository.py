@@ -1,10 +1,45 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import numpy as np
+from bson import Binary, ObjectId
+from pymongo.errors import BulkWriteError
+
 from backend.config.database import mongodb_database
 from backend.config.settings import settings
+from backend.repositories.document_repository import DocumentRepository
+
+# Embeddings are large and never part of a chunk read
+CHUNK_PROJECTION = {"embedding": 0}
+
+# Fields needed to serve a chunk on the query path
+HYDRATION_PROJECTION = {
+    "_id": 0,
+    "chunk_id": 1,
+    "content": 1,
+    "metadata": 1,
+    "document_id": 1,
+    "start": 1,
+    "end": 1,
+}
+
+
+def pack_embedding(embedding: np.ndarray, dtype: str = "float32") -> Binary:
+    """Pack an embedding as little-endian float32/float16 bytes"""
+    return Binary(
+        np.asarray(embedding, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()
+    )
+
+
+def unpack_embedding(data: bytes, dtype: str = "float32") -> np.ndarray:
+    """Unpack stored embedding bytes into a float32 vector"""
+    return np.frombuffer(data, dtype=np.dtype(dtype).newbyteorder("<")).astype(
+        np.float32
+    )
 
 
 class ChunkRepository:
     def __init__(self):
-        pass
+        self.document_repository = DocumentRepository()
 
     def _get_collection(self):
         """Get the chunks collection, ensuring MongoDB is connected"""
@@ -12,23 +47,73 @@ class ChunkRepository:
             mongodb_database.connect()
         return mongodb_database.mongodb_client[settings.MONGODB_DB_NAME]["chunks"]
 
+    def _to_document(self, chunk_id: str, chunk_data: dict) -> dict:
+        """
+        Prepare a chunk document, storing offsets instead of content when set
+        An 'embedding' is stored packed in EMBEDDING_STORAGE_DTYPE, so the
+        vector index can be rebuilt without re-running the model.
+        """
+        chunk_document = {
+            "chunk_id": chunk_id,
+            "metadata": chunk_data.get("metadata", {}),
+        }
+        if chunk_data.get("document_id"):
+            chunk_document["document_id"] = chunk_data["document_id"]
+            chunk_document["start"] = chunk_data["start"]
+            chunk_document["end"] = chunk_data["end"]
+        else:
+            chunk_document["content"] = chunk_data.get("content")
+
+        embedding = chunk_data.get("embedding")
+        dtype = settings.EMBEDDING_STORAGE_DTYPE
+        if embedding is not None and len(embedding) and dtype != "none":
+            chunk_document["embedding"] = pack_embedding(embedding, dtype)
+            chunk_document["embedding_dtype"] = dtype
+            chunk_document["embedding_dim"] = len(embedding)
+            chunk_document["embedding_model"] = settings.EMBEDDING_MODEL
+        return chunk_document
+
+    async def _materialize(self, chunks: List[dict]) -> List[Dict[str, Any]]:
+        """Resolve offset-stored chunks against their (cached) page markdown"""
+        document_ids = [
+            chunk["document_id"] for chunk in chunks if "document_id" in chunk
+        ]
+        documents = (
+            await self.document_repository.get_documents(document_ids)
+            if document_ids
+            else {}
+        )
+
+        materialized = []
+        for chunk in chunks:
+            content = chunk.get("content")
+            if content is None and "document_id" in chunk:
+                text = documents.get(chunk["document_id"])
+                if text is not None:
+                    content = text[chunk["start"] : chunk["end"]]
+            materialized.append(
+                {
+                    "id": chunk.get("chunk_id"),
+                    "content": content,
+                    "metadata": chunk.get("metadata", {}),
+                }
+            )
+        return materialized
+
     async def add_chunk(self, chunk_id: str, chunk_data: dict):
         """
         Add a chunk to the database
 
         Args:
             chunk_id: Unique identifier for the chunk
-            chunk_data: Dictionary containing content and metadata
+            chunk_data: Dictionary containing content (or document_id, start
+                and end offsets) and metadata
         """
         try:
             collection = self._get_collection()
 
             # Prepare chunk document for MongoDB
-            chunk_document = {
-                "chunk_id": chunk_id,
-                "content": chunk_data.get("content"),
-                "metadata": chunk_data.get("metadata", {}),
-            }
+            chunk_document = self._to_document(chunk_id, chunk_data)
 
             await collection.insert_one(chunk_document)
             return True
@@ -36,6 +121,42 @@ class ChunkRepository:
             print(f"❌ Failed to add chunk to database: {str(e)}")
             return False
 
+    async def add_chunks(self, chunks: List[dict]) -> int:
+        """
+        Add several chunks to the database in one write
+
+        Args:
+            chunks: List of chunk dictionaries with 'id' (and 'embedding'
+                once embedded)
+
+        Returns:
+            Number of chunks stored
+        """
+        if not chunks:
+            return 0
+
+        try:
+            collection = self._get_collection()
+            result = await collection.insert_many(
+                [self._to_document(chunk["id"], chunk) for chunk in chunks],
+                ordered=False,
+            )
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Unordered inserts keep going past failed documents; chunks that
+            # already exist (duplicate key, code 11000) count as stored
+            errors = e.details.get("writeErrors", [])
+            failed = [error for error in errors if error.get("code") != 11000]
+            if failed:
+                print(
+                    f"❌ Failed to add {len(failed)} chunks to database: "
+                    f"{failed[0].get('errmsg')}"
+                )
+            return e.details.get("nInserted", 0) + len(errors) - len(failed)
+        except Exception as e:
+            print(f"❌ Failed to add chunks to database: {str(e)}")
+            return 0
+
     async def get_chunk(self, chunk_id: str):
         """
         Get a chunk by ID
@@ -48,19 +169,44 @@ class ChunkRepository:
         """
         try:
             collection = self._get_collection()
-            chunk = await collection.find_one({"chunk_id": chunk_id})
+            chunk = await collection.find_one({"chunk_id": chunk_id}, CHUNK_PROJECTION)
 
             if chunk:
-                return {
-                    "id": chunk.get("chunk_id"),
-                    "content": chunk.get("content"),
-                    "metadata": chunk.get("metadata", {}),
-                }
+                materialized = await self._materialize([chunk])
+                return materialized[0]
             return None
         except Exception as e:
             print(f"❌ Failed to get chunk from database: {str(e)}")
             return None
 
+    async def get_chunks(self, chunk_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Get many chunks in one round trip
+
+        Args:
+            chunk_ids: Chunk IDs to retrieve, e.g. in search match order
+
+        Returns:
+            Chunks with id, content and metadata in the order of chunk_ids;
+            IDs that are not found are skipped
+        """
+        if not chunk_ids:
+            return []
+
+        try:
+            collection = self._get_collection()
+            cursor = collection.find(
+                {"chunk_id": {"$in": list(dict.fromkeys(chunk_ids))}},
+                HYDRATION_PROJECTION,
+            )
+            chunks = await self._materialize(await cursor.to_list(length=None))
+
+            by_id = {chunk["id"]: chunk for chunk in chunks}
+            return [by_id[chunk_id] for chunk_id in chunk_ids if chunk_id in by_id]
+        except Exception as e:
+            print(f"❌ Failed to get chunks from database: {str(e)}")
+            return []
+
     async def get_chunks_by_job_id(self, job_id: str):
         """
         Get all chunks for a specific job
@@ -73,17 +219,12 @@ class ChunkRepository:
         """
         try:
             collection = self._get_collection()
-            chunks_cursor = collection.find({"metadata.job_id": job_id})
+            chunks_cursor = collection.find(
+                {"metadata.job_id": job_id}, CHUNK_PROJECTION
+            )
             chunks = await chunks_cursor.to_list(length=None)
 
-            return [
-                {
-                    "id": chunk.get("chunk_id"),
-                    "content": chunk.get("content"),
-                    "metadata": chunk.get("metadata", {}),
-                }
-                for chunk in chunks
-            ]
+            return await self._materialize(chunks)
         except Exception as e:
             print(f"❌ Failed to get chunks from database: {str(e)}")
             return []
@@ -100,17 +241,98 @@ class ChunkRepository:
         """
         try:
             collection = self._get_collection()
-            chunks_cursor = collection.find({"metadata.url": url})
+            chunks_cursor = collection.find({"metadata.url": url}, CHUNK_PROJECTION)
             chunks = await chunks_cursor.to_list(length=None)
 
-            return [
-                {
-                    "id": chunk.get("chunk_id"),
-                    "content": chunk.get("content"),
-                    "metadata": chunk.get("metadata", {}),
-                }
-                for chunk in chunks
-            ]
+            return await self._materialize(chunks)
         except Exception as e:
             print(f"❌ Failed to get chunks from database: {str(e)}")
             return []
+
+    async def get_embeddings(self, chunk_ids: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Get stored embeddings of chunks in one query
+
+        Args:
+            chunk_ids: Chunk IDs to look up
+
+        Returns:
+            chunk_id -> float32 embedding, for chunks embedded with the
+            current model (others are omitted)
+        """
+        if not chunk_ids:
+            return {}
+
+        try:
+            collection = self._get_collection()
+            cursor = collection.find(
+                {
+                    "chunk_id": {"$in": chunk_ids},
+                    "embedding_model": settings.EMBEDDING_MODEL,
+                },
+                {"_id": 0, "chunk_id": 1, "embedding": 1, "embedding_dtype": 1},
+            )
+            return {
+                chunk["chunk_id"]: unpack_embedding(
+                    chunk["embedding"], chunk.get("embedding_dtype", "float32")
+                )
+                async for chunk in cursor
+            }
+        except Exception as e:
+            print(f"❌ Failed to get embeddings from database: {str(e)}")
+            return {}
+
+    async def iter_embeddings(
+        self, batch_size: int = 500, job_id: Optional[str] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream stored embeddings in batches, for rebuilding a vector index
+
+        Args:
+            batch_size: Number of chunks per batch
+            job_id: Optional job ID to restrict the export to
+
+        Yields:
+            Lists of dictionaries with id, embedding (float32 array), metadata
+            and embedding_model; chunks stored before ingest times were
+            recorded get metadata.ingested_at from their ObjectId
+        """
+        query = {"embedding": {"$exists": True}}
+        if job_id:
+            query["metadata.job_id"] = job_id
+
+        collection = self._get_collection()
+        cursor = collection.find(
+            query,
+            {
+                "_id": 1,
+                "chunk_id": 1,
+                "metadata": 1,
+                "embedding": 1,
+                "embedding_dtype": 1,
+                "embedding_model": 1,
+            },
+            batch_size=batch_size,
+        )
+
+        batch = []
+        async for chunk in cursor:
+            metadata = chunk.get("metadata", {})
+            if not metadata.get("ingested_at") and isinstance(chunk["_id"], ObjectId):
+                metadata["ingested_at"] = int(chunk["_id"].generation_time.timestamp())
+            batch.append(
+                {
+                    "id": chunk["chunk_id"],
+                    "embedding": unpack_embedding(
+                        chunk["embedding"], chunk.get("embedding_dtype", "float32")
+                    ),
+                    "metadata": metadata,
+                    "embedding_model": chunk.get("embedding_model"),
+                }
+            )
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
@@ -0,0 +1,105 @@
+import zlib
+from typing import Dict, List, Optional
+
+from bson import Binary
+
+from backend.config.database import mongodb_database
+from backend.config.settings import settings
+from backend.services.cache_service import LRUCache
+
+# Decompressed page markdown, shared by all repository instances in the process
+page_cache = LRUCache(settings.CHUNK_PAGE_CACHE_SIZE)
+
+
+class DocumentRepository:
+    """Repository for compressed page markdown referenced by chunk offsets"""
+
+    def __init__(self):
+        pass
+
+    def _get_collection(self):
+        """Get the documents collection, ensuring MongoDB is connected"""
+        if mongodb_database.mongodb_client is None:
+            mongodb_database.connect()
+        return mongodb_database.mongodb_client[settings.MONGODB_DB_NAME]["documents"]
+
+    async def add_document(
+        self, document_id: str, text: str, url: str, job_id: str
+    ) -> bool:
+        """
+        Store a page's markdown compressed once
+
+        Args:
+            document_id: Unique identifier for the document
+            text: Page markdown the chunk offsets point into
+            url: Source URL
+            job_id: Associated job ID
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            collection = self._get_collection()
+
+            raw = text.encode("utf-8")
+            compressed = zlib.compress(raw, 6)
+            await collection.insert_one(
+                {
+                    "document_id": document_id,
+                    "url": url,
+                    "job_id": job_id,
+                    "encoding": "zlib",
+                    "length": len(text),
+                    "content": Binary(compressed),
+                }
+            )
+            page_cache.put(document_id, text)
+            print(
+                f"🗜️ Stored document {document_id} ({len(raw)} → {len(compressed)} bytes)"
+            )
+            return True
+        except Exception as e:
+            print(f"❌ Failed to add document to database: {str(e)}")
+            return False
+
+    async def get_documents(self, document_ids: List[str]) -> Dict[str, str]:
+        """
+        Get decompressed page markdown, served from the page LRU when possible
+
+        Args:
+            document_ids: Document IDs to retrieve
+
+        Returns:
+            Dictionary mapping document_id to markdown (missing IDs are omitted)
+        """
+        documents = {}
+        missing = []
+        for document_id in dict.fromkeys(document_ids):
+            text = page_cache.get(document_id)
+            if text is None:
+                missing.append(document_id)
+            else:
+                documents[document_id] = text
+
+        if not missing:
+            return documents
+
+        try:
+            collection = self._get_collection()
+            cursor = collection.find(
+                {"document_id": {"$in": missing}},
+                {"_id": 0, "document_id": 1, "content": 1},
+            )
+            async for document in cursor:
+                text = zlib.decompress(document["content"]).decode("utf-8")
+                page_cache.put(document["document_id"], text)
+                documents[document["document_id"]] = text
+        except Exception as e:
+            print(f"❌ Failed to get documents from database: {str(e)}")
+
+        return documents
+
+    async def get_document(self, document_id: str) -> Optional[str]:
+        """Get the decompressed markdown of a single document"""
+        documents = await self.get_documents([document_id])
+        return documents.get(document_id)
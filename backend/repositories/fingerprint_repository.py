@@ -0,0 +1,87 @@
+from typing import List
+
+from backend.config.database import mongodb_database
+from backend.config.settings import settings
+
+
+class FingerprintRepository:
+    """Repository for the persistent SimHash LSH index of stored chunks"""
+
+    def __init__(self):
+        pass
+
+    def _get_collection(self):
+        """Get the chunk_fingerprints collection, ensuring MongoDB is connected"""
+        if mongodb_database.mongodb_client is None:
+            mongodb_database.connect()
+        return mongodb_database.mongodb_client[settings.MONGODB_DB_NAME][
+            "chunk_fingerprints"
+        ]
+
+    async def find_candidates(self, bands: List[str], exclude_url: str) -> List[dict]:
+        """
+        Find fingerprints sharing at least one LSH band
+
+        Args:
+            bands: Band keys to look up
+            exclude_url: Fingerprints of this URL are ignored (re-ingestion)
+
+        Returns:
+            List of dictionaries with chunk_id and fingerprint
+        """
+        if not bands:
+            return []
+
+        try:
+            collection = self._get_collection()
+            cursor = collection.find(
+                {"bands": {"$in": bands}, "url": {"$ne": exclude_url}},
+                {"_id": 0, "chunk_id": 1, "fingerprint": 1, "bands": 1},
+            )
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            print(f"❌ Failed to find fingerprint candidates: {str(e)}")
+            return []
+
+    async def add_fingerprints(self, fingerprints: List[dict]) -> bool:
+        """
+        Add fingerprints of canonical chunks to the index
+
+        Args:
+            fingerprints: List of dictionaries with chunk_id, fingerprint, bands,
+                url and job_id
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not fingerprints:
+            return True
+
+        try:
+            collection = self._get_collection()
+            await collection.insert_many(fingerprints, ordered=False)
+            return True
+        except Exception as e:
+            print(f"❌ Failed to add fingerprints to database: {str(e)}")
+            return False
+
+    async def delete_previous_jobs(self, url: str, job_id: str) -> int:
+        """
+        Delete fingerprints of a URL's earlier ingest jobs
+
+        Args:
+            url: Re-ingested URL
+            job_id: Job ID of the current ingest, whose fingerprints are kept
+
+        Returns:
+            Number of fingerprints deleted
+        """
+        try:
+            collection = self._get_collection()
+            result = await collection.delete_many(
+                {"url": url, "job_id": {"$ne": job_id}}
+            )
+            return result.deleted_count
+        except Exception as e:
+            print(f"❌ Failed to delete previous fingerprints of {url}: {str(e)}")
+            return 0
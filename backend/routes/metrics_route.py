@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+
+from backend.controllers.metrics_controller import MetricsController
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics(
+    metrics_controller: MetricsController = Depends(MetricsController),
+):
+    """
+    Runtime statistics of this API process (cache hit/miss counters, latencies)
+    """
+    return await metrics_controller.get_metrics()
@@ -1,11 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Any, AsyncIterator, Dict, Tuple
 
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from backend.config.settings import settings
 from backend.controllers.query_controller import QueryController
-from backend.models.schemas.query_schema import QueryRequest, QueryResponse
+from backend.models.schemas.query_schema import (
+    BatchQueryRequest,
+    QueryRequest,
+    QueryResponse,
+)
 
 router = APIRouter()
 
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _sse_stream(
+    events: AsyncIterator[Tuple[str, Dict[str, Any]]], http_request: Request
+) -> AsyncIterator[str]:
+    """Relay query events as SSE until the stream ends or the client leaves"""
+    try:
+        async for event, data in events:
+            if await http_request.is_disconnected():
+                print("⚠️ Client disconnected from query stream")
+                break
+            yield _sse_event(event, data)
+    finally:
+        await events.aclose()
+
+
+async def _ndjson_stream(
+    results: AsyncIterator[Dict[str, Any]], http_request: Request
+) -> AsyncIterator[str]:
+    """Relay batch results as NDJSON until done or the client leaves"""
+    try:
+        async for result in results:
+            if await http_request.is_disconnected():
+                print("⚠️ Client disconnected from batch query")
+                break
+            yield json.dumps(result, default=str) + "\n"
+    finally:
+        await results.aclose()
+
+
 @router.post("/query", response_model=QueryResponse)
 async def query_documents(
     request: QueryRequest, query_controller: QueryController = Depends(QueryController)
@@ -14,15 +56,75 @@ async def query_documents(
     Query the RAG system with optional chat session for conversation history
 
     Args:
-        request: QueryRequest with query, optional session_id, and top_k
+        request: QueryRequest with query, optional session_id, top_k and
+            scope filters (url_prefix, domains, job_ids, ingested_after)
 
     Returns:
         QueryResponse with answer and cited sources
     """
     try:
         result = await query_controller.query_documents(
-            request.query, request.session_id, request.top_k
+            request.query, request.session_id, request.top_k, request.filters
         )
         return QueryResponse(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
+
+
+@router.post("/query/stream")
+async def stream_query(
+    request: QueryRequest,
+    http_request: Request,
+    query_controller: QueryController = Depends(QueryController),
+):
+    """
+    Query the RAG system and stream the answer as server-sent events
+
+    Args:
+        request: Same body as /query
+
+    Returns:
+        text/event-stream of "sources", then "token" events, then "done"
+        (or "error")
+    """
+    events = query_controller.stream_query(
+        request.query, request.session_id, request.top_k, request.filters
+    )
+    return StreamingResponse(
+        _sse_stream(events, http_request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/query/batch")
+async def query_batch(
+    request: BatchQueryRequest,
+    http_request: Request,
+    query_controller: QueryController = Depends(QueryController),
+):
+    """
+    Run many stateless queries in one request (evaluation, offline workloads)
+
+    Args:
+        request: BatchQueryRequest with queries, top_k, filters and
+            retrieval_only
+
+    Returns:
+        application/x-ndjson stream with one result per query, in completion
+        order; each carries the "index" of its query
+    """
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="No queries given")
+    if len(request.queries) > settings.QUERY_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.QUERY_BATCH_MAX_QUERIES} queries per batch",
+        )
+
+    results = query_controller.query_batch(
+        request.queries, request.top_k, request.filters, request.retrieval_only
+    )
+    return StreamingResponse(
+        _ndjson_stream(results, http_request), media_type="application/x-ndjson"
+    )
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from backend.controllers.search_controller import SearchController
+from backend.models.schemas.search_schema import SearchRequest, SearchResponse
+
+router = APIRouter()
+
+
+@router.post("/search", response_model=SearchResponse)
+async def search(
+    request: SearchRequest,
+    search_controller: SearchController = Depends(SearchController),
+):
+    """
+    Retrieve relevant chunks without generating an answer
+
+    Args:
+        request: SearchRequest with query, page size (top_k), optional
+            min_score, scope filters and the cursor of the previous page
+
+    Returns:
+        SearchResponse with scored chunks and the cursor of the next page
+    """
+    try:
+        result = await search_controller.search(
+            request.query,
+            request.top_k,
+            request.min_score,
+            request.filters,
+            request.cursor,
+        )
+        return SearchResponse(**result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching: {str(e)}")
@@ -0,0 +1,196 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.config.redis import redis_client
+from backend.config.settings import settings
+from backend.services.metrics_service import metrics_service
+
+URL_VERSION_KEY = "answer_cache:url_version:{url}"
+# Bumped with every URL version; tells a query whether any re-ingest
+# finished while it was retrieving and generating
+INGEST_EPOCH_KEY = "answer_cache:ingest_epoch"
+
+
+async def bump_url_version(url: str):
+    """Invalidate cached answers built from a URL (called after re-ingest)"""
+    try:
+        pipeline = redis_client.get_async_redis_client().pipeline(transaction=True)
+        pipeline.incr(URL_VERSION_KEY.format(url=url))
+        pipeline.incr(INGEST_EPOCH_KEY)
+        await pipeline.execute()
+    except Exception as e:
+        print(f"⚠️ Failed to bump answer cache version for {url}: {str(e)}")
+
+
+async def get_ingest_epoch() -> Optional[str]:
+    """Current re-ingest counter, or None if Redis is unavailable"""
+    try:
+        epoch = await redis_client.get_async_redis_client().get(INGEST_EPOCH_KEY)
+        return epoch or "0"
+    except Exception as e:
+        print(f"⚠️ Failed to read answer cache ingest epoch: {str(e)}")
+        return None
+
+
+async def get_url_versions(urls: List[str]) -> Optional[Dict[str, str]]:
+    """Current ingest version of each URL, or None if Redis is unavailable"""
+    if not urls:
+        return {}
+    try:
+        values = await redis_client.get_async_redis_client().mget(
+            [URL_VERSION_KEY.format(url=url) for url in urls]
+        )
+        return {url: value or "0" for url, value in zip(urls, values)}
+    except Exception as e:
+        print(f"⚠️ Failed to read answer cache versions: {str(e)}")
+        return None
+
+
+class SemanticAnswerCache:
+    """
+    Cache of generated answers looked up by query-embedding similarity
+    Entries live in a fixed-size in-process matrix of unit query vectors
+    (oldest slot replaced first). A hit needs cosine similarity above the
+    threshold, the same retrieval scope (filters, top_k) and unchanged
+    ingest versions of every source URL; versions are Redis counters bumped
+    by the worker, so re-ingesting a URL invalidates answers in all replicas.
+    """
+
+    def __init__(self, max_size: int, threshold: float, ttl: int):
+        self.max_size = max_size
+        self.threshold = threshold
+        self.ttl = ttl
+        self.vectors = np.zeros((max_size, settings.EMBEDDING_DIMENSION), np.float32)
+        self.entries: List[Optional[Dict[str, Any]]] = [None] * max_size
+        self.scope_hashes = np.zeros(max_size, dtype=np.int64)
+        self.created_at = np.full(max_size, -np.inf)
+        self.next_slot = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    async def get(self, query_embedding: Sequence[float], scope: str) -> Optional[dict]:
+        """
+        Find a cached answer for a similar query
+
+        Args:
+            query_embedding: Embedding of the new query
+            scope: Retrieval scope key (filters and top_k)
+
+        Returns:
+            {"answer", "sources"} or None
+        """
+        if self.max_size <= 0:
+            return None
+
+        query = self._normalize(query_embedding)
+        now = time.time()
+        with self._lock:
+            similarity = self.vectors @ query
+            valid = (self.scope_hashes == hash(scope)) & (
+                self.created_at >= now - self.ttl
+            )
+            similarity[~valid] = -np.inf
+            slot = int(np.argmax(similarity))
+            entry = self.entries[slot]
+            if (
+                similarity[slot] < self.threshold
+                or entry is None
+                or entry["scope"] != scope
+            ):
+                self.misses += 1
+                return None
+
+        versions = await get_url_versions(list(entry["url_versions"]))
+        with self._lock:
+            if versions != entry["url_versions"]:
+                if self.entries[slot] is entry:
+                    self.entries[slot] = None
+                    self.created_at[slot] = -np.inf
+                self.stale += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        print(f"✅ Answer cache hit (similarity {similarity[slot]:.3f})")
+        return {"answer": entry["answer"], "sources": entry["sources"]}
+
+    async def put(
+        self,
+        query_embedding: Sequence[float],
+        scope: str,
+        answer: str,
+        sources: List[Dict[str, Any]],
+        ingest_epoch: Optional[str],
+    ):
+        """
+        Cache an answer with the current versions of its source URLs
+
+        Args:
+            query_embedding: Embedding of the query
+            scope: Retrieval scope key (filters and top_k)
+            answer: Generated answer
+            sources: Cited sources
+            ingest_epoch: get_ingest_epoch() read before retrieval; the
+                answer is dropped if any URL was re-ingested since, as its
+                chunks may predate the versions read now
+        """
+        if self.max_size <= 0 or ingest_epoch is None:
+            return
+
+        urls = sorted({source["url"] for source in sources if source.get("url")})
+        try:
+            # One read, so the versions and the epoch come from the same moment
+            epoch, *values = await redis_client.get_async_redis_client().mget(
+                [INGEST_EPOCH_KEY, *(URL_VERSION_KEY.format(url=url) for url in urls)]
+            )
+        except Exception as e:
+            print(f"⚠️ Failed to read answer cache versions: {str(e)}")
+            return
+        if (epoch or "0") != ingest_epoch:
+            print("⚠️ Not caching answer: sources were re-ingested meanwhile")
+            return
+        versions = {url: value or "0" for url, value in zip(urls, values)}
+
+        with self._lock:
+            slot = self.next_slot
+            self.next_slot = (slot + 1) % self.max_size
+            self.vectors[slot] = self._normalize(query_embedding)
+            self.scope_hashes[slot] = hash(scope)
+            self.created_at[slot] = time.time()
+            self.entries[slot] = {
+                "scope": scope,
+                "answer": answer,
+                "sources": sources,
+                "url_versions": versions,
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            "size": int(np.isfinite(self.created_at).sum()),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+answer_cache = SemanticAnswerCache(
+    max_size=settings.ANSWER_CACHE_SIZE,
+    threshold=settings.ANSWER_CACHE_THRESHOLD,
+    ttl=settings.ANSWER_CACHE_TTL,
+)
+metrics_service.register("answer_cache", answer_cache.stats)
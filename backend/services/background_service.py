@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Coroutine, Dict, Optional, Set
+
+from backend.services.metrics_service import metrics_service
+
+
+class BackgroundService:
+    """
+    Tracks fire-and-forget tasks scheduled on the event loop
+    Holds a reference to every pending task (the loop only keeps weak ones),
+    logs failures, and lets shutdown wait for writes still in flight.
+    """
+
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+        self.failed = 0
+
+    def _on_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.failed += 1
+            print(f"❌ Background task {task.get_name()} failed: {str(error)}")
+
+    def spawn(
+        self, coro: Coroutine[Any, Any, Any], name: Optional[str] = None
+    ) -> asyncio.Task:
+        """Schedule a coroutine without awaiting it"""
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._on_done)
+        return task
+
+    async def drain(self, timeout: float = 10.0):
+        """Wait for pending tasks, cancelling whatever is left after the timeout"""
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"⚠️ Cancelled {len(pending)} background tasks at shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pending and failed task counts"""
+        return {"pending": len(self._tasks), "failed": self.failed}
+
+
+background_service = BackgroundService()
+metrics_service.register("background_tasks", background_service.stats)
@@ -0,0 +1,106 @@
+import base64
+import hashlib
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from backend.config.redis import redis_client
+from backend.config.settings import settings
+from backend.services.cache_service import LRUCache
+from backend.services.metrics_service import metrics_service
+
+
+class EmbeddingCacheService:
+    """
+    Cache of query embeddings keyed by model name and normalized query text
+    A bounded in-process LRU, optionally backed by Redis so replicas share
+    vectors. Values are float32 vectors.
+    """
+
+    def __init__(self, max_size: int, use_redis: bool = False, ttl: int = 86400):
+        self.local_cache = LRUCache(max_size)
+        self.use_redis = use_redis
+        self.ttl = ttl
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse whitespace so trivially different spellings share an entry"""
+        return " ".join(text.split())
+
+    def _redis_key(self, model: str, text: str) -> str:
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return f"query_embedding:{model}:{digest}"
+
+    async def get(self, text: str, model: str) -> Optional[np.ndarray]:
+        """
+        Get a cached query embedding
+
+        Args:
+            text: Query text
+            model: Embedding model name
+
+        Returns:
+            float32 vector, or None on a miss
+        """
+        text = self.normalize(text)
+        vector = self.local_cache.get((model, text))
+        if vector is not None:
+            self.hits += 1
+            return vector
+
+        if self.use_redis:
+            try:
+                cached = await redis_client.get_async_redis_client().get(
+                    self._redis_key(model, text)
+                )
+                if cached:
+                    vector = np.frombuffer(base64.b64decode(cached), dtype="<f4")
+                    self.local_cache.put((model, text), vector)
+                    self.hits += 1
+                    self.redis_hits += 1
+                    return vector
+            except Exception as e:
+                print(f"⚠️ Query embedding cache Redis lookup failed: {str(e)}")
+
+        self.misses += 1
+        return None
+
+    async def put(self, text: str, model: str, vector: np.ndarray):
+        """Cache a query embedding"""
+        text = self.normalize(text)
+        vector = np.ascontiguousarray(vector, dtype="<f4")
+        vector.setflags(write=False)
+        self.local_cache.put((model, text), vector)
+
+        if self.use_redis:
+            try:
+                await redis_client.get_async_redis_client().set(
+                    self._redis_key(model, text),
+                    base64.b64encode(vector.tobytes()).decode("ascii"),
+                    ex=self.ttl,
+                )
+            except Exception as e:
+                print(f"⚠️ Query embedding cache Redis write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit and miss counters"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self.local_cache),
+            "max_size": self.local_cache.max_size,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+query_embedding_cache = EmbeddingCacheService(
+    settings.QUERY_EMBEDDING_CACHE_SIZE,
+    use_redis=settings.QUERY_EMBEDDING_CACHE_REDIS,
+    ttl=settings.QUERY_EMBEDDING_CACHE_TTL,
+)
+metrics_service.register("query_embedding_cache", query_embedding_cache.stats)
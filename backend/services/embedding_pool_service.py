@@ -0,0 +1,132 @@
+import math
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from backend.config.settings import settings
+
+# Model loaded once per pool worker process
+_worker_model = None
+
+
+def _available_cores() -> List[int]:
+    """Cores this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _init_worker(model_name: str, cores: List[int], processes: int, slot_counter):
+    """Pin the worker to its share of cores, tune torch threads and load the model"""
+    global _worker_model
+
+    with slot_counter.get_lock():
+        slot = slot_counter.value
+        slot_counter.value += 1
+
+    share = max(1, len(cores) // processes)
+    my_cores = cores[slot * share : (slot + 1) * share] or cores
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, my_cores)
+
+    # Spawned workers re-import the main module, so torch is usually loaded
+    # already and OMP_NUM_THREADS/MKL_NUM_THREADS would be ignored;
+    # set_num_threads resizes the OpenMP and MKL pools at runtime instead.
+    # Tokenizers read their variable on first use.
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(len(my_cores))
+    torch.set_num_interop_threads(1)
+
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+    print(f"🧠 Embedding worker {slot} ready on cores {my_cores}")
+
+
+def _encode_shard(texts: List[str], batch_size: int) -> np.ndarray:
+    return np.asarray(
+        _worker_model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        ),
+        dtype=np.float32,
+    )
+
+
+class EmbeddingPoolService:
+    """
+    Pool of embedding worker processes for bulk ingest
+    Each worker is pinned to an equal share of the available cores with
+    matching torch thread counts. Batches are sharded into contiguous
+    slices and gathered back in order.
+    """
+
+    def __init__(self, processes: int, model_name: str = settings.EMBEDDING_MODEL):
+        self.processes = processes
+        self.model_name = model_name
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        """Start the worker processes"""
+        if self.executor is not None:
+            return
+
+        print(f"🚀 Starting embedding pool with {self.processes} processes...")
+        context = mp.get_context("spawn")
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(
+                self.model_name,
+                _available_cores(),
+                self.processes,
+                context.Value("i", 0),
+            ),
+        )
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Encode texts across the pool
+
+        Args:
+            texts: Texts to embed
+            batch_size: Model batch size inside each worker
+
+        Returns:
+            float32 matrix with one row per text, in input order
+        """
+        if not texts:
+            return np.zeros((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+
+        self.start()
+
+        shard_size = math.ceil(len(texts) / self.processes)
+        shards = [texts[i : i + shard_size] for i in range(0, len(texts), shard_size)]
+        results = self.executor.map(_encode_shard, shards, [batch_size] * len(shards))
+        return np.ascontiguousarray(np.vstack(list(results)), dtype=np.float32)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+
+_embedding_pool: Optional[EmbeddingPoolService] = None
+
+
+def get_embedding_pool() -> EmbeddingPoolService:
+    """Get the process-wide embedding pool"""
+    global _embedding_pool
+    if _embedding_pool is None:
+        _embedding_pool = EmbeddingPoolService(settings.EMBEDDING_POOL_PROCESSES)
+    return _embedding_pool
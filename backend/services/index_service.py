@@ -0,0 +1,210 @@
+from typing import Any, Dict, List, Tuple
+
+from pymongo import ASCENDING, IndexModel
+
+from backend.config.database import mongodb_database
+from backend.config.settings import settings
+
+
+def index_specs() -> Dict[str, List[IndexModel]]:
+    """Secondary indexes required by the repositories, per collection"""
+    chat_session_indexes = [
+        IndexModel([("session_id", ASCENDING)], name="session_id_unique", unique=True)
+    ]
+    if settings.CHAT_SESSION_TTL_SECONDS > 0:
+        # Idle-session sweep; messages are deleted with their session
+        chat_session_indexes.append(
+            IndexModel([("updated_at", ASCENDING)], name="updated_at")
+        )
+
+    return {
+        settings.MONGODB_URLS_COLLECTION: [
+            IndexModel([("job_id", ASCENDING)], name="job_id_unique", unique=True),
+        ],
+        "chunks": [
+            IndexModel([("chunk_id", ASCENDING)], name="chunk_id_unique", unique=True),
+            IndexModel([("metadata.job_id", ASCENDING)], name="metadata_job_id"),
+            IndexModel([("metadata.url", ASCENDING)], name="metadata_url"),
+        ],
+        "chat_sessions": chat_session_indexes,
+        "chat_messages": [
+            IndexModel(
+                [("session_id", ASCENDING), ("seq", ASCENDING)],
+                name="session_id_seq_unique",
+                unique=True,
+            )
+        ],
+        "documents": [
+            IndexModel(
+                [("document_id", ASCENDING)], name="document_id_unique", unique=True
+            ),
+        ],
+        "chunk_fingerprints": [
+            IndexModel([("bands", ASCENDING)], name="bands"),
+            IndexModel([("url", ASCENDING)], name="url"),
+            IndexModel([("job_id", ASCENDING)], name="job_id"),
+        ],
+        "bm25_postings": [
+            IndexModel(
+                [("term", ASCENDING), ("job_id", ASCENDING)],
+                name="term_job_id_unique",
+                unique=True,
+            ),
+            IndexModel([("job_id", ASCENDING)], name="job_id"),
+        ],
+        "bm25_documents": [
+            IndexModel([("job_id", ASCENDING)], name="job_id_unique", unique=True),
+            IndexModel([("url", ASCENDING)], name="url"),
+        ],
+    }
+
+
+def obsolete_indexes() -> Dict[str, List[str]]:
+    """Indexes created by older versions that must be dropped, per collection"""
+    # TTL indexes deleted old messages of active sessions on their own
+    return {
+        "chat_sessions": ["updated_at_ttl"],
+        "chat_messages": ["timestamp_ttl"],
+    }
+
+
+def hot_queries() -> List[Tuple[str, str, Dict[str, Any]]]:
+    """(name, collection, filter) of lookups that must be served by an index"""
+    probe = "__index_probe__"
+    return [
+        ("chunks.by_chunk_ids", "chunks", {"chunk_id": {"$in": [probe]}}),
+        ("chunks.by_job_id", "chunks", {"metadata.job_id": probe}),
+        ("chunks.by_url", "chunks", {"metadata.url": probe}),
+        ("urls.by_job_id", settings.MONGODB_URLS_COLLECTION, {"job_id": probe}),
+        ("chat_sessions.by_session_id", "chat_sessions", {"session_id": probe}),
+        ("chat_messages.by_session_id", "chat_messages", {"session_id": probe}),
+        ("documents.by_ids", "documents", {"document_id": {"$in": [probe]}}),
+        (
+            "chunk_fingerprints.by_bands",
+            "chunk_fingerprints",
+            {"bands": {"$in": [probe]}, "url": {"$ne": probe}},
+        ),
+        ("bm25_postings.by_terms", "bm25_postings", {"term": {"$in": [probe]}}),
+        ("bm25_documents.by_job_ids", "bm25_documents", {"job_id": {"$in": [probe]}}),
+        ("bm25_documents.by_url", "bm25_documents", {"url": probe}),
+    ]
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """All stage names in an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+    return stages
+
+
+class IndexService:
+    """
+    Declares, creates and verifies MongoDB secondary indexes
+    Missing indexes are created at startup; existing ones (matched by name
+    or key pattern) are left alone and obsolete ones are dropped.
+    Verification runs explain() on the hot lookups and reports any that
+    would scan the whole collection.
+    """
+
+    def _get_database(self):
+        if mongodb_database.mongodb_client is None:
+            mongodb_database.connect()
+        return mongodb_database.mongodb_client[settings.MONGODB_DB_NAME]
+
+    async def ensure_indexes(self) -> Dict[str, List[str]]:
+        """
+        Create declared indexes that do not exist yet
+
+        Returns:
+            Collection name -> names of the indexes created
+        """
+        database = self._get_database()
+        created: Dict[str, List[str]] = {}
+
+        for collection_name, indexes in index_specs().items():
+            collection = database[collection_name]
+            try:
+                information = await collection.index_information()
+            except Exception:
+                information = {}  # Collection does not exist yet
+
+            for name in obsolete_indexes().get(collection_name, []):
+                if name not in information:
+                    continue
+                try:
+                    await collection.drop_index(name)
+                    del information[name]
+                    print(f"✅ Dropped obsolete index {collection_name}.{name}")
+                except Exception as e:
+                    print(f"❌ Failed to drop index {collection_name}.{name}: {str(e)}")
+            existing_names = set(information)
+            existing_keys = {
+                tuple((field, int(direction)) for field, direction in info["key"])
+                for info in information.values()
+            }
+
+            # An index on the same keys under another name also counts
+            missing = [
+                index
+                for index in indexes
+                if index.document["name"] not in existing_names
+                and tuple(index.document["key"].items()) not in existing_keys
+            ]
+            for index in missing:
+                name = index.document["name"]
+                try:
+                    await collection.create_indexes([index])
+                    created.setdefault(collection_name, []).append(name)
+                    print(f"✅ Created index {collection_name}.{name}")
+                except Exception as e:
+                    # e.g. duplicates blocking a unique index; keep going
+                    print(
+                        f"❌ Failed to create index {collection_name}.{name}: {str(e)}"
+                    )
+
+        return created
+
+    async def verify_indexes(self) -> Dict[str, List[str]]:
+        """
+        Explain the hot lookups
+
+        Returns:
+            Query name -> stages of its winning plan
+        """
+        database = self._get_database()
+        report = {}
+
+        for name, collection_name, query in hot_queries():
+            try:
+                explain = await database[collection_name].find(query).explain()
+                stages = _plan_stages(
+                    explain.get("queryPlanner", {}).get("winningPlan")
+                )
+                report[name] = stages
+                if "COLLSCAN" in stages:
+                    print(f"⚠️ {name} is not using an index (COLLSCAN)")
+            except Exception as e:
+                print(f"⚠️ Failed to explain {name}: {str(e)}")
+                report[name] = []
+
+        scans = [name for name, stages in report.items() if "COLLSCAN" in stages]
+        if not scans:
+            print(f"✅ Verified index usage of {len(report)} hot queries")
+        return report
+
+    async def bootstrap(self):
+        """Create missing indexes, then verify the hot queries use them"""
+        if not settings.INDEX_BOOTSTRAP_ENABLED:
+            return
+        try:
+            await self.ensure_indexes()
+            await self.verify_indexes()
+        except Exception as e:
+            print(f"❌ Index bootstrap failed: {str(e)}")
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict
+
+import numpy as np
+
+# Latency samples kept per metric for percentiles
+LATENCY_WINDOW = 1000
+
+
+class MetricsService:
+    """Process-wide registry of runtime statistics exposed by /metrics"""
+
+    def __init__(self):
+        self._providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, provider: Callable[[], Dict[str, Any]]):
+        """Register a callable returning a statistics dictionary"""
+        self._providers[name] = provider
+
+    def observe(self, name: str, seconds: float):
+        """Record one latency sample"""
+        with self._lock:
+            if name not in self._latencies:
+                self._latencies[name] = deque(maxlen=LATENCY_WINDOW)
+                self._counts[name] = 0
+            self._latencies[name].append(seconds)
+            self._counts[name] += 1
+
+    @contextmanager
+    def timer(self, name: str):
+        """Record the latency of the wrapped block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def latency_stats(self) -> Dict[str, Any]:
+        """Count and millisecond percentiles over the recent window"""
+        with self._lock:
+            samples = {name: list(values) for name, values in self._latencies.items()}
+            counts = dict(self._counts)
+
+        stats = {}
+        for name, values in samples.items():
+            values_ms = np.array(values) * 1000
+            stats[name] = {
+                "count": counts[name],
+                "mean_ms": round(float(values_ms.mean()), 3),
+                "p50_ms": round(float(np.percentile(values_ms, 50)), 3),
+                "p95_ms": round(float(np.percentile(values_ms, 95)), 3),
+                "max_ms": round(float(values_ms.max()), 3),
+            }
+        return stats
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Collect the current statistics of every registered provider"""
+        snapshot = {name: provider() for name, provider in self._providers.items()}
+        snapshot["latency"] = self.latency_stats()
+        return snapshot
+
+
+metrics_service = MetricsService()
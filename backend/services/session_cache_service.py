@@ -0,0 +1,372 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from backend.config.redis import redis_client
+from backend.config.settings import settings
+from backend.repositories.chat_session_repository import ChatSessionRepository
+from backend.services.metrics_service import metrics_service
+
+META_KEY = "chat_session:{session_id}:meta"
+MESSAGES_KEY = "chat_session:{session_id}:messages"
+# Messages accepted in write-behind mode and not yet written to MongoDB
+PENDING_KEY = "chat_session:{session_id}:pending"
+# Sessions with a non-empty pending list
+PENDING_SESSIONS_KEY = "chat_session:pending_sessions"
+# Sessions whose pending messages are read in one flush round trip
+FLUSH_SESSION_GROUP = 100
+
+# Assigns the next seq and appends the message, only to an existing entry.
+# The message arrives JSON-encoded without its seq, which is spliced in here.
+# KEYS: meta, messages, pending, pending sessions
+# ARGV: message, cached messages, TTL, write-behind flag, session id
+APPEND_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+local seq = redis.call('HINCRBY', KEYS[1], 'message_count', 1)
+local message = string.sub(ARGV[1], 1, -2) .. ',"seq":' .. seq .. '}'
+redis.call('RPUSH', KEYS[2], message)
+redis.call('LTRIM', KEYS[2], -tonumber(ARGV[2]), -1)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+if ARGV[4] == '1' then
+    redis.call('RPUSH', KEYS[3], message)
+    redis.call('SADD', KEYS[4], ARGV[5])
+end
+return seq
+"""
+
+# Creates an entry unless a concurrent miss already did
+# KEYS: meta, messages
+# ARGV: TTL, session id, summary, summarized_count, message_count, messages...
+REBUILD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('DEL', KEYS[2])
+redis.call('HSET', KEYS[1], 'session_id', ARGV[2], 'summary', ARGV[3],
+    'summarized_count', ARGV[4], 'message_count', ARGV[5])
+for i = 6, #ARGV do
+    redis.call('RPUSH', KEYS[2], ARGV[i])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+# Removes written messages from the head of a pending list; a concurrent
+# flusher that already removed them finds a different head and stops
+# KEYS: pending, pending sessions
+# ARGV: session id, written messages...
+ACK_SCRIPT = """
+local removed = 0
+for i = 2, #ARGV do
+    if redis.call('LINDEX', KEYS[1], 0) ~= ARGV[i] then
+        break
+    end
+    redis.call('LPOP', KEYS[1])
+    removed = removed + 1
+end
+if redis.call('LLEN', KEYS[1]) == 0 then
+    redis.call('SREM', KEYS[2], ARGV[1])
+end
+return removed
+"""
+
+
+def _encode_message(message: Dict[str, Any]) -> str:
+    timestamp = message.get("timestamp")
+    if isinstance(timestamp, datetime):
+        message = {**message, "timestamp": timestamp.isoformat()}
+    return json.dumps(message, default=str)
+
+
+def _decode_message(data: str) -> Dict[str, Any]:
+    message = json.loads(data)
+    if message.get("timestamp"):
+        message["timestamp"] = datetime.fromisoformat(message["timestamp"])
+    return message
+
+
+class SessionCacheService:
+    """
+    Redis cache of active chat sessions
+    Each cached session is a hash of its state (message_count, summary,
+    summarized_count) plus a list of its last SESSION_CACHE_MESSAGES
+    messages, both expiring SESSION_CACHE_TTL seconds after the last access.
+    Sequence numbers are assigned in Redis by a Lua script that only appends
+    to an existing entry, so a turn needs no MongoDB round trip. With
+    SESSION_WRITE_MODE=write_through (the default) messages are written to
+    MongoDB before the call returns; with write_behind they are queued per
+    session and written in batches by the flusher task, and only removed
+    from the queue once stored. A missing entry is rebuilt from MongoDB
+    after that session's queued messages are written; concurrent misses
+    create it once.
+    """
+
+    def __init__(self):
+        self.chat_session_repository = ChatSessionRepository()
+        self.hits = 0
+        self.misses = 0
+        self.flushed = 0
+        self.flush_failures = 0
+        self.pending_sessions = 0
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.SESSION_CACHE_ENABLED
+
+    @property
+    def write_behind(self) -> bool:
+        return settings.SESSION_WRITE_MODE == "write_behind"
+
+    def _client(self):
+        return redis_client.get_async_redis_client()
+
+    def _keys(self, session_id: str):
+        return (
+            META_KEY.format(session_id=session_id),
+            MESSAGES_KEY.format(session_id=session_id),
+        )
+
+    def _pending_key(self, session_id: str) -> str:
+        return PENDING_KEY.format(session_id=session_id)
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Cached session state (TTL refreshed), or None on a miss"""
+        meta_key, messages_key = self._keys(session_id)
+        pipe = self._client().pipeline(transaction=False)
+        pipe.hgetall(meta_key)
+        pipe.expire(meta_key, settings.SESSION_CACHE_TTL)
+        pipe.expire(messages_key, settings.SESSION_CACHE_TTL)
+        meta = (await pipe.execute())[0]
+        if not meta:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return {
+            "session_id": session_id,
+            "summary": meta.get("summary", ""),
+            "summarized_count": int(meta.get("summarized_count", 0)),
+            "message_count": int(meta.get("message_count", 0)),
+        }
+
+    async def load_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get or create a session, rebuilding its cache entry from MongoDB on a miss
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Session state or None if MongoDB is unavailable
+        """
+        cached = await self.get_session(session_id)
+        if cached is not None:
+            return cached
+
+        # This session's queued messages must reach MongoDB before it is
+        # used as the source
+        if not await self.flush_session(session_id):
+            raise RuntimeError(f"Queued messages of session {session_id} not written")
+        session = await self.chat_session_repository.get_or_create_session(session_id)
+        if session is None:
+            return None
+        messages = await self.chat_session_repository.get_recent_messages(
+            session_id, settings.SESSION_CACHE_MESSAGES
+        )
+
+        rebuild = self._client().register_script(REBUILD_SCRIPT)
+        await rebuild(
+            keys=list(self._keys(session_id)),
+            args=[
+                settings.SESSION_CACHE_TTL,
+                session_id,
+                session.get("summary", ""),
+                session.get("summarized_count", 0),
+                session.get("message_count", 0),
+                *[_encode_message(m) for m in messages],
+            ],
+        )
+        return session
+
+    async def add_message(self, message: Dict[str, Any]) -> bool:
+        """
+        Append a message to a cached session and persist it
+
+        Args:
+            message: Message with "session_id", "role", "content",
+                "timestamp" and optional "sources"; "seq" is assigned here
+
+        Returns:
+            True if the message was accepted
+        """
+        session_id = message["session_id"]
+        append = self._client().register_script(APPEND_SCRIPT)
+        keys = [*self._keys(session_id), self._pending_key(session_id)]
+        args = [
+            _encode_message(message),
+            settings.SESSION_CACHE_MESSAGES,
+            settings.SESSION_CACHE_TTL,
+            "1" if self.write_behind else "0",
+            session_id,
+        ]
+
+        seq = None
+        for _ in range(2):
+            seq = await append(keys=keys + [PENDING_SESSIONS_KEY], args=args)
+            if seq is not None:
+                break
+            # Missing or just expired: rebuild the entry, then append again
+            await self.load_session(session_id)
+        if seq is None:
+            raise RuntimeError(f"Session {session_id} could not be cached")
+
+        if self.write_behind:
+            return True
+        return await self.chat_session_repository.insert_messages(
+            [{**message, "seq": int(seq)}]
+        )
+
+    async def get_messages(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        """Last `limit` cached messages, most recent last"""
+        if limit <= 0:
+            return []
+        _, messages_key = self._keys(session_id)
+        return [
+            _decode_message(data)
+            for data in await self._client().lrange(messages_key, -limit, -1)
+        ]
+
+    async def set_summary(self, session_id: str, summary: str, summarized_count: int):
+        """Mirror a new running summary into the cached session"""
+        meta_key, _ = self._keys(session_id)
+        if await self._client().exists(meta_key):
+            await self._client().hset(
+                meta_key,
+                mapping={"summary": summary, "summarized_count": summarized_count},
+            )
+
+    async def evict(self, session_id: str):
+        """Drop a session from the cache"""
+        await self._client().delete(*self._keys(session_id))
+
+    async def _flush_sessions(self, session_ids: List[str]) -> Optional[int]:
+        """
+        Write up to SESSION_FLUSH_BATCH_SIZE queued messages of each session
+
+        Args:
+            session_ids: Sessions to flush
+
+        Returns:
+            Number of messages written, or None if MongoDB rejected them
+            (they stay queued for the next attempt)
+        """
+        client = self._client()
+        pipe = client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.lrange(
+                self._pending_key(session_id),
+                0,
+                settings.SESSION_FLUSH_BATCH_SIZE - 1,
+            )
+        queued = dict(zip(session_ids, await pipe.execute()))
+
+        messages = [
+            _decode_message(data) for batch in queued.values() for data in batch
+        ]
+        batch_size = settings.SESSION_FLUSH_BATCH_SIZE
+        for start in range(0, len(messages), batch_size):
+            batch = messages[start : start + batch_size]
+            if not await self.chat_session_repository.insert_messages(batch):
+                self.flush_failures += 1
+                return None
+
+        # Only stored messages leave the queue
+        ack = client.register_script(ACK_SCRIPT)
+        for session_id, batch in queued.items():
+            await ack(
+                keys=[self._pending_key(session_id), PENDING_SESSIONS_KEY],
+                args=[session_id, *batch],
+            )
+        self.flushed += len(messages)
+        return len(messages)
+
+    async def flush_session(self, session_id: str) -> bool:
+        """
+        Write every queued message of one session to MongoDB
+
+        Returns:
+            True if nothing of the session is left queued
+        """
+        while True:
+            written = await self._flush_sessions([session_id])
+            if written is None:
+                return False
+            if written == 0:
+                return True
+
+    async def flush(self) -> int:
+        """
+        Write queued messages of all sessions to MongoDB in batches
+
+        Returns:
+            Number of messages written
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        written = 0
+        async with self._flush_lock:
+            session_ids = sorted(await self._client().smembers(PENDING_SESSIONS_KEY))
+            self.pending_sessions = len(session_ids)
+            for start in range(0, len(session_ids), FLUSH_SESSION_GROUP):
+                count = await self._flush_sessions(
+                    session_ids[start : start + FLUSH_SESSION_GROUP]
+                )
+                if count is None:
+                    break
+                written += count
+        return written
+
+    async def run_flusher(self):
+        """Flush queued messages every SESSION_FLUSH_INTERVAL seconds"""
+        if not (self.enabled and self.write_behind):
+            return
+        print("🔄 Chat session flusher started")
+        try:
+            while True:
+                await asyncio.sleep(settings.SESSION_FLUSH_INTERVAL)
+                try:
+                    await self.flush()
+                except Exception as e:
+                    print(f"❌ Failed to flush chat messages: {str(e)}")
+        finally:
+            # Final flush at shutdown so accepted messages are not left behind
+            try:
+                written = await self.flush()
+                if written:
+                    print(f"✅ Flushed {written} chat messages at shutdown")
+            except Exception as e:
+                print(f"❌ Failed to flush chat messages at shutdown: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss and write-behind counters"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            # Sessions with queued messages at the last flush
+            "pending_sessions": self.pending_sessions,
+            "flushed": self.flushed,
+            "flush_failures": self.flush_failures,
+        }
+
+
+session_cache = SessionCacheService()
+metrics_service.register("session_cache", session_cache.stats)
@@ -0,0 +1,73 @@
+import asyncio
+from typing import Dict
+
+from backend.config.settings import settings
+from backend.services.vector_stores.base import VectorStore
+
+_vector_stores: Dict[str, VectorStore] = {}
+
+
+def get_vector_store(backend: str = None) -> VectorStore:
+    """
+    Get the process-wide vector store for a backend
+
+    Args:
+        backend: 'pinecone', 'hnsw', 'flat' or 'binary' (default: settings.VECTOR_STORE_BACKEND)
+    """
+    backend = backend or settings.VECTOR_STORE_BACKEND
+
+    if backend not in _vector_stores:
+        if backend == "pinecone":
+            from backend.services.vector_stores.pinecone_store import (
+                PineconeVectorStore,
+            )
+
+            _vector_stores[backend] = PineconeVectorStore()
+        elif backend == "hnsw":
+            from backend.services.vector_stores.hnsw_store import HNSWVectorStore
+
+            _vector_stores[backend] = HNSWVectorStore()
+        elif backend == "flat":
+            from backend.services.vector_stores.flat_store import FlatVectorStore
+
+            _vector_stores[backend] = FlatVectorStore()
+        elif backend == "binary":
+            from backend.services.vector_stores.binary_store import (
+                BinaryQuantizedVectorStore,
+            )
+
+            _vector_stores[backend] = BinaryQuantizedVectorStore()
+        else:
+            raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {backend}")
+
+    return _vector_stores[backend]
+
+
+def flush_vector_stores(force: bool = True):
+    """
+    Persist pending writes of local vector stores
+
+    Args:
+        force: Save even if VECTOR_STORE_SAVE_INTERVAL has not passed since
+            the last save
+    """
+    for store in list(_vector_stores.values()):
+        if hasattr(store, "flush"):
+            store.flush(force=force)
+
+
+async def run_vector_store_flusher():
+    """Save dirty local vector stores every VECTOR_STORE_SAVE_INTERVAL seconds"""
+    try:
+        while True:
+            await asyncio.sleep(max(settings.VECTOR_STORE_SAVE_INTERVAL, 1.0))
+            try:
+                await asyncio.to_thread(flush_vector_stores, False)
+            except Exception as e:
+                print(f"❌ Failed to save vector store: {str(e)}")
+    finally:
+        # Final save at shutdown so accepted writes are not lost
+        try:
+            await asyncio.to_thread(flush_vector_stores)
+        except Exception as e:
+            print(f"❌ Failed to save vector store at shutdown: {str(e)}")
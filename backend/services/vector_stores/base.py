@@ -0,0 +1,295 @@
+import fcntl
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+
+import numpy as np
+
+
+def url_domain(url: str) -> Optional[str]:
+    """Lowercase host of a URL without a leading 'www.'"""
+    host = urlparse(url if "://" in url else f"//{url}").hostname
+    if not host:
+        return None
+    return host[4:] if host.startswith("www.") else host
+
+
+def url_prefixes(url: str) -> List[str]:
+    """
+    Path prefixes of a URL on segment boundaries, shortest first
+    e.g. https://www.example.com/docs/api -> ["example.com",
+    "example.com/docs", "example.com/docs/api"]
+    """
+    domain = url_domain(url)
+    if not domain:
+        return []
+
+    prefixes = [domain]
+    path = urlparse(url if "://" in url else f"//{url}").path
+    for segment in path.split("/"):
+        if segment:
+            prefixes.append(f"{prefixes[-1]}/{segment}")
+    return prefixes
+
+
+def scope_metadata(url: Optional[str], ingested_at: Optional[int]) -> Dict[str, Any]:
+    """Metadata that query scope filters match on"""
+    metadata: Dict[str, Any] = {}
+    if url:
+        metadata["domain"] = url_domain(url)
+        metadata["url_prefixes"] = url_prefixes(url)
+    if ingested_at:
+        metadata["ingested_at"] = ingested_at
+    return {k: v for k, v in metadata.items() if v}
+
+
+def vector_metadata(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract essential metadata for retrieval (no content)"""
+    chunk_metadata = chunk.get("metadata", {})
+    metadata = {
+        "chunk_id": chunk.get("id"),
+        "url": chunk_metadata.get("url"),
+        "job_id": chunk_metadata.get("job_id"),
+        **scope_metadata(chunk_metadata.get("url"), chunk_metadata.get("ingested_at")),
+    }
+
+    # Remove empty metadata fields
+    return {k: v for k, v in metadata.items() if v}
+
+
+def _match_condition(value: Any, condition: Any) -> bool:
+    if not isinstance(condition, dict):
+        condition = {"$eq": condition}
+
+    # List-valued metadata matches when any element matches
+    values = value if isinstance(value, list) else [value]
+
+    for operator, operand in condition.items():
+        if operator == "$eq":
+            ok = operand in values
+        elif operator == "$ne":
+            ok = operand not in values
+        elif operator == "$in":
+            ok = any(v in operand for v in values)
+        elif operator == "$nin":
+            ok = not any(v in operand for v in values)
+        elif operator in ("$gt", "$gte", "$lt", "$lte"):
+            ok = any(
+                v is not None
+                and isinstance(v, (int, float))
+                and {
+                    "$gt": v > operand,
+                    "$gte": v >= operand,
+                    "$lt": v < operand,
+                    "$lte": v <= operand,
+                }[operator]
+                for v in values
+            )
+        elif operator == "$exists":
+            ok = (value is not None) == bool(operand)
+        else:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+        if not ok:
+            return False
+    return True
+
+
+def matches_filter(metadata: Dict[str, Any], filter_dict: Optional[Dict]) -> bool:
+    """
+    Evaluate a Pinecone-style metadata filter against a metadata dictionary
+    Supports $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte, $exists, $and, $or.
+    """
+    if not filter_dict:
+        return True
+
+    for key, condition in filter_dict.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, sub) for sub in condition):
+                return False
+        elif not _match_condition(metadata.get(key), condition):
+            return False
+    return True
+
+
+class MetadataIndex:
+    """
+    Precomputed row sets over vector metadata for local indexes
+    Categorical fields keep a posting array of rows per value; numeric
+    fields keep a column. Filters on these fields compile to a boolean row
+    mask with vectorized operations instead of a per-row Python check.
+    """
+
+    CATEGORICAL_FIELDS = ("job_id", "url", "domain", "url_prefixes")
+    NUMERIC_FIELDS = ("ingested_at",)
+
+    def __init__(self):
+        self.size = 0
+        self.postings: Dict[str, Dict[Any, array]] = {
+            field: {} for field in self.CATEGORICAL_FIELDS
+        }
+        self.columns: Dict[str, array] = {
+            field: array("d") for field in self.NUMERIC_FIELDS
+        }
+
+    def add(self, row: int, metadata: Dict[str, Any]):
+        """Index the metadata of a row"""
+        for field, postings in self.postings.items():
+            value = metadata.get(field)
+            for v in value if isinstance(value, list) else [value]:
+                if v is not None:
+                    postings.setdefault(v, array("q")).append(row)
+
+        if row >= self.size:
+            for column in self.columns.values():
+                column.extend([float("nan")] * (row + 1 - self.size))
+            self.size = row + 1
+        for field, column in self.columns.items():
+            value = metadata.get(field)
+            if isinstance(value, (int, float)):
+                column[row] = float(value)
+
+    def _rows(self, field: str, values: List[Any], size: int) -> np.ndarray:
+        mask = np.zeros(size, dtype=bool)
+        for value in values:
+            rows = self.postings[field].get(value)
+            if rows:
+                mask[np.frombuffer(rows, dtype=np.int64)] = True
+        return mask
+
+    def _condition_mask(
+        self, field: str, condition: Any, size: int
+    ) -> Optional[np.ndarray]:
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        mask = np.ones(size, dtype=bool)
+        for operator, operand in condition.items():
+            if field in self.postings:
+                if operator == "$eq":
+                    mask &= self._rows(field, [operand], size)
+                elif operator == "$in":
+                    mask &= self._rows(field, list(operand), size)
+                elif operator == "$ne":
+                    mask &= ~self._rows(field, [operand], size)
+                elif operator == "$nin":
+                    mask &= ~self._rows(field, list(operand), size)
+                else:
+                    return None
+            elif field in self.columns and operator in ("$gt", "$gte", "$lt", "$lte"):
+                column = np.frombuffer(self.columns[field], dtype=np.float64)[:size]
+                with np.errstate(invalid="ignore"):
+                    mask[: len(column)] &= {
+                        "$gt": column > operand,
+                        "$gte": column >= operand,
+                        "$lt": column < operand,
+                        "$lte": column <= operand,
+                    }[operator]
+                mask[len(column) :] = False
+            else:
+                return None
+        return mask
+
+    def mask(self, filter_dict: Dict, size: int) -> Optional[np.ndarray]:
+        """
+        Compile a Pinecone-style filter to a mask over the first size rows
+
+        Returns:
+            Boolean mask, or None if the filter uses fields or operators that
+            are not indexed (callers fall back to matches_filter)
+        """
+        mask = np.ones(size, dtype=bool)
+        for key, condition in filter_dict.items():
+            if key in ("$and", "$or"):
+                masks = [self.mask(sub, size) for sub in condition]
+                if any(m is None for m in masks):
+                    return None
+                combined = np.logical_and if key == "$and" else np.logical_or
+                sub_mask = (
+                    combined.reduce(masks)
+                    if masks
+                    else np.full(size, key == "$and", dtype=bool)
+                )
+            else:
+                sub_mask = self._condition_mask(key, condition, size)
+                if sub_mask is None:
+                    return None
+            mask &= sub_mask
+        return mask
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive advisory lock shared by every process on the host"""
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class ReadWriteLock:
+    """Lock allowing concurrent readers and a single exclusive writer"""
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class VectorStore(ABC):
+    """Interface of a vector index holding chunk embeddings"""
+
+    @abstractmethod
+    async def upsert_embeddings(self, embedded_chunks: List[Dict[str, Any]]) -> bool:
+        """Insert or replace the embeddings of chunks with 'id' and 'embedding'"""
+
+    @abstractmethod
+    async def search_similar(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int = 5,
+        filter_dict: Optional[Dict] = None,
+        include_values: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return up to top_k {id, score, metadata} matches, best first
+        With include_values each match also carries its stored vector as "values".
+        """
+
+    @abstractmethod
+    async def delete_by_job_id(self, job_id: str) -> bool:
+        """Delete all vectors for a specific job"""
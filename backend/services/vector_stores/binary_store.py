@@ -0,0 +1,121 @@
+import os
+from typing import List
+
+import numpy as np
+
+from backend.config.settings import settings
+from backend.services.vector_stores.flat_store import FlatVectorStore
+
+# Popcount of every byte value, for NumPy versions without bitwise_count
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(codes: np.ndarray) -> np.ndarray:
+    """Per-row number of set bits of a uint8 code matrix"""
+    if hasattr(np, "bitwise_count"):
+        bits = np.bitwise_count(codes)
+    else:
+        bits = POPCOUNT_TABLE[codes]
+    return bits.sum(axis=1, dtype=np.int32)
+
+
+class BinaryQuantizedVectorStore(FlatVectorStore):
+    """
+    Flat vector store with a 1-bit sign-code first pass
+    Each row keeps a packed sign code (dimension / 8 bytes, 48 bytes for
+    MiniLM) in RAM, persisted in flat_<gen>.codes next to the float file.
+    Search ranks all rows by Hamming distance, over-fetches
+    top_k * BINARY_RESCORE_MULTIPLIER candidates and re-scores them
+    exactly against the memory-mapped float32 vectors. A larger multiplier
+    trades speed for recall.
+    """
+
+    def __init__(self, path: str = settings.VECTOR_STORE_PATH):
+        self.code_bytes = (settings.EMBEDDING_DIMENSION + 7) // 8
+        self.rescore_multiplier = settings.BINARY_RESCORE_MULTIPLIER
+        super().__init__(path)
+
+    def _codes_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"flat_{generation}.codes")
+
+    def _generation_files(self, generation: int) -> List[str]:
+        return super()._generation_files(generation) + [self._codes_path(generation)]
+
+    def _reset(self):
+        super()._reset()
+        self.codes = np.zeros((0, self.code_bytes), dtype=np.uint8)
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.packbits(np.asarray(vectors) > 0, axis=1)
+
+    def _append_vectors(self, generation: int, vectors: np.ndarray):
+        super()._append_vectors(generation, vectors)
+        with open(self._codes_path(generation), "ab") as f:
+            f.write(self._encode(vectors).tobytes())
+            f.flush()
+
+    def _map_vectors(self):
+        super()._map_vectors()
+
+        rows = len(self.ids)
+        have = len(self.codes)
+        if rows <= have:
+            return
+
+        # Load codes appended since the last refresh
+        path = self._codes_path(self.generation)
+        stored = os.path.getsize(path) // self.code_bytes if os.path.exists(path) else 0
+        new_codes = []
+        if stored > have:
+            end = min(stored, rows)
+            with open(path, "rb") as f:
+                f.seek(have * self.code_bytes)
+                data = f.read((end - have) * self.code_bytes)
+            new_codes.append(
+                np.frombuffer(data, dtype=np.uint8).reshape(-1, self.code_bytes)
+            )
+            have = end
+
+        # Index written by the plain flat backend: derive missing codes
+        for start in range(have, rows, self.block_rows):
+            new_codes.append(
+                self._encode(self.vectors[start : min(start + self.block_rows, rows)])
+            )
+
+        self.codes = np.concatenate([self.codes] + new_codes)
+
+    def _top_k(self, query: np.ndarray, top_k: int, mask: np.ndarray):
+        """Hamming shortlist, then exact float re-scoring: (rows, scores)"""
+        shortlist_size = max(top_k, top_k * self.rescore_multiplier)
+        query_code = self._encode(query.reshape(1, -1))[0]
+        invalid = self.code_bytes * 8 + 1
+
+        candidate_rows, candidate_distances = [], []
+        for start in range(0, len(mask), self.block_rows):
+            block_mask = mask[start : start + self.block_rows]
+            if not block_mask.any():
+                continue
+
+            codes = self.codes[start : start + len(block_mask)]
+            distances = popcount(np.bitwise_xor(codes, query_code))
+            distances = np.where(block_mask, distances, invalid)
+
+            k = min(shortlist_size, len(distances))
+            best = np.argpartition(distances, k - 1)[:k]
+            best = best[distances[best] < invalid]
+            candidate_rows.append(best + start)
+            candidate_distances.append(distances[best])
+
+        if not candidate_rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        rows = np.concatenate(candidate_rows)
+        distances = np.concatenate(candidate_distances)
+        if len(rows) > shortlist_size:
+            rows = rows[np.argpartition(distances, shortlist_size - 1)[:shortlist_size]]
+
+        # Sorted rows keep the re-scoring reads sequential on disk
+        rows = np.sort(rows)
+        scores = np.asarray(self.vectors[rows]) @ query
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return rows[order], scores[order]
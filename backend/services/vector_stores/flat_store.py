@@ -0,0 +1,409 @@
+import asyncio
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.config.settings import settings
+from backend.services.vector_stores.base import (
+    MetadataIndex,
+    ReadWriteLock,
+    VectorStore,
+    file_lock,
+    matches_filter,
+    vector_metadata,
+)
+
+MANIFEST_FILE = "flat_manifest.json"
+LOCK_FILE = "flat.lock"
+
+
+class FlatVectorStore(VectorStore):
+    """
+    Exact on-disk vector index: an append-only, memory-mapped float32 matrix
+    Files (per compaction generation) in VECTOR_STORE_PATH:
+    - flat_<gen>.f32: unit-normalized float32 rows, appended in place
+    - flat_<gen>.jsonl: append-only log of row entries ({"row", "id",
+      "metadata"}) and tombstones ({"deleted": [rows]})
+    - flat_manifest.json: current generation, replaced atomically on compaction
+    Search is a blocked matrix-vector product over the memory map with an
+    argpartition top-k per block, so the matrix is never loaded into RAM and
+    cold start only replays the sidecar log. Readers in other processes pick
+    up appended rows incrementally. Writes hold a file lock (flat.lock), so
+    several processes on one host can write: each catches up with the log
+    before assigning rows. Metadata filters on indexed fields are resolved
+    to a row mask from precomputed postings.
+    """
+
+    def __init__(self, path: str = settings.VECTOR_STORE_PATH):
+        self.path = path
+        self.dimension = settings.EMBEDDING_DIMENSION
+        self.block_rows = settings.FLAT_SEARCH_BLOCK_ROWS
+        self.lock = ReadWriteLock()
+
+        os.makedirs(self.path, exist_ok=True)
+        with self.lock.write():
+            self._load()
+
+    # ---- files ----
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.path, MANIFEST_FILE)
+
+    def _lock_path(self) -> str:
+        return os.path.join(self.path, LOCK_FILE)
+
+    def _vectors_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"flat_{generation}.f32")
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"flat_{generation}.jsonl")
+
+    def _generation_files(self, generation: int) -> List[str]:
+        return [self._vectors_path(generation), self._log_path(generation)]
+
+    def _manifest_version(self) -> Optional[int]:
+        try:
+            return os.stat(self._manifest_path()).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _write_manifest(self, generation: int):
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"generation": generation, "dimension": self.dimension}, f)
+        os.replace(tmp, self._manifest_path())
+        self.manifest_version = self._manifest_version()
+
+    # ---- state ----
+
+    def _reset(self):
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.alive = np.zeros(0, dtype=bool)
+        self.id_to_row: Dict[str, int] = {}
+        self.metadata_index = MetadataIndex()
+        self.deleted_count = 0
+        self.log_offset = 0
+        self.vectors = None
+
+    def _load(self):
+        """Load the current generation (caller holds the write lock)"""
+        self._reset()
+        self.manifest_version = self._manifest_version()
+        if self.manifest_version is None:
+            self.generation = 0
+            for path in self._generation_files(0):
+                open(path, "ab").close()
+            self._write_manifest(0)
+        else:
+            with open(self._manifest_path()) as f:
+                self.generation = json.load(f)["generation"]
+
+        self._read_log()
+        self._map_vectors()
+        print(
+            f"✅ Loaded flat vector index with {len(self.id_to_row)} vectors from {self.path}"
+        )
+
+    def _read_log(self):
+        """Apply log entries appended since the last read"""
+        with open(self._log_path(self.generation), "rb") as f:
+            f.seek(self.log_offset)
+            data = f.read()
+
+        # Only consume complete lines; a writer may be mid-append
+        complete = data[: data.rfind(b"\n") + 1]
+        self.log_offset += len(complete)
+
+        new_alive = []
+        for line in complete.splitlines():
+            entry = json.loads(line)
+            if "deleted" in entry:
+                self._apply_delete(entry["deleted"], new_alive)
+                continue
+
+            row = entry["row"]
+            self.ids.append(entry["id"])
+            self.metadata.append(entry["metadata"])
+            self.metadata_index.add(row, entry["metadata"])
+            new_alive.append(True)
+            previous = self.id_to_row.get(entry["id"])
+            if previous is not None:
+                self._apply_delete([previous], new_alive)
+            self.id_to_row[entry["id"]] = row
+
+        if new_alive:
+            self.alive = np.concatenate([self.alive, np.array(new_alive, dtype=bool)])
+
+    def _apply_delete(self, rows: List[int], pending_alive: List[bool]):
+        base = len(self.alive)
+        for row in rows:
+            if row >= base:
+                if pending_alive[row - base]:
+                    pending_alive[row - base] = False
+                    self.deleted_count += 1
+            elif self.alive[row]:
+                self.alive[row] = False
+                self.deleted_count += 1
+            if self.id_to_row.get(self.ids[row]) == row:
+                del self.id_to_row[self.ids[row]]
+
+    def _map_vectors(self):
+        rows = len(self.ids)
+        if rows == 0:
+            self.vectors = None
+            return
+        self.vectors = np.memmap(
+            self._vectors_path(self.generation),
+            dtype=np.float32,
+            mode="r",
+            shape=(rows, self.dimension),
+        )
+
+    def _refresh(self):
+        """Pick up rows appended or a compaction done by another process"""
+        if self._manifest_version() != self.manifest_version:
+            with self.lock.write():
+                if self._manifest_version() != self.manifest_version:
+                    self._load()
+            return
+
+        try:
+            size = os.stat(self._log_path(self.generation)).st_size
+        except FileNotFoundError:
+            return
+        if size > self.log_offset:
+            with self.lock.write():
+                self._read_log()
+                self._map_vectors()
+
+    # ---- writes ----
+
+    def _append_vectors(self, generation: int, vectors: np.ndarray):
+        """Append unit-normalized rows to a generation's vector file"""
+        with open(self._vectors_path(generation), "ab") as f:
+            f.write(np.asarray(vectors, dtype="<f4").tobytes())
+            f.flush()
+
+    def _append_log(self, entries: List[Dict[str, Any]]):
+        with open(self._log_path(self.generation), "ab") as f:
+            f.write(b"".join(json.dumps(e).encode("utf-8") + b"\n" for e in entries))
+            f.flush()
+
+    def _upsert(self, embedded_chunks: List[Dict[str, Any]]):
+        vectors = np.asarray(
+            [chunk["embedding"] for chunk in embedded_chunks], dtype=np.float32
+        )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        # Other processes append rows too: catch up and append under one lock
+        with file_lock(self._lock_path()), self.lock.write():
+            self._refresh_locked()
+
+            # Vectors are appended before the log rows that reference them
+            self._append_vectors(self.generation, vectors)
+
+            start = len(self.ids)
+            self._append_log(
+                [
+                    {
+                        "row": start + i,
+                        "id": chunk["id"],
+                        "metadata": vector_metadata(chunk),
+                    }
+                    for i, chunk in enumerate(embedded_chunks)
+                ]
+            )
+            self._read_log()
+            self._map_vectors()
+            self._maybe_compact()
+
+    def _refresh_locked(self):
+        """Catch up with the log before writing (caller holds the write lock)"""
+        if self._manifest_version() != self.manifest_version:
+            self._load()
+        else:
+            self._read_log()
+
+    def _delete_rows(self, rows: List[int]):
+        if rows:
+            self._append_log([{"deleted": rows}])
+            self._read_log()
+
+    def _delete_by_job_id(self, job_id: str) -> int:
+        with file_lock(self._lock_path()), self.lock.write():
+            self._refresh_locked()
+            rows = [
+                row
+                for row in self.id_to_row.values()
+                if self.metadata[row].get("job_id") == job_id
+            ]
+            self._delete_rows(rows)
+            self._maybe_compact()
+            return len(rows)
+
+    def _maybe_compact(self):
+        """Compact once tombstones exceed FLAT_COMPACT_RATIO of the rows"""
+        rows = len(self.ids)
+        if rows and self.deleted_count / rows >= settings.FLAT_COMPACT_RATIO:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite live rows into a new generation (caller holds the write lock)"""
+        live_rows = np.flatnonzero(self.alive)
+        generation = self.generation + 1
+        print(
+            f"🧹 Compacting flat vector index: {len(live_rows)}/{len(self.ids)} live rows"
+        )
+
+        # Leftovers of an interrupted compaction
+        for path in self._generation_files(generation):
+            if os.path.exists(path):
+                os.remove(path)
+
+        for start in range(0, len(live_rows), self.block_rows):
+            block = live_rows[start : start + self.block_rows]
+            self._append_vectors(generation, self.vectors[block])
+
+        with open(self._log_path(generation), "wb") as f:
+            for new_row, row in enumerate(live_rows.tolist()):
+                entry = {
+                    "row": new_row,
+                    "id": self.ids[row],
+                    "metadata": self.metadata[row],
+                }
+                f.write(json.dumps(entry).encode("utf-8") + b"\n")
+
+        old_generation = self.generation
+        self._write_manifest(generation)
+        self._load()
+
+        # Readers still mapping the old files keep them alive until remapped
+        for path in self._generation_files(old_generation):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def compact(self):
+        """Force a compaction"""
+        with file_lock(self._lock_path()), self.lock.write():
+            self._refresh_locked()
+            self._compact()
+
+    async def upsert_embeddings(self, embedded_chunks: List[Dict[str, Any]]) -> bool:
+        if not embedded_chunks:
+            print("⚠️ No embedded chunks to upsert")
+            return False
+
+        try:
+            print(f"Upserting {len(embedded_chunks)} embeddings to flat index...")
+            await asyncio.to_thread(self._upsert, embedded_chunks)
+            print(f"✅ Successfully upserted {len(embedded_chunks)} vectors")
+            return True
+        except Exception as e:
+            print(f"❌ Error upserting to flat index: {str(e)}")
+            return False
+
+    async def delete_by_job_id(self, job_id: str) -> bool:
+        try:
+            print(f"🗑️ Deleting vectors for job: {job_id}")
+            deleted = await asyncio.to_thread(self._delete_by_job_id, job_id)
+            print(f"✅ Deleted {deleted} vectors for job: {job_id}")
+            return True
+        except Exception as e:
+            print(f"❌ Error deleting vectors: {str(e)}")
+            return False
+
+    # ---- search ----
+
+    def _filter_mask(self, filter_dict: Optional[Dict]) -> np.ndarray:
+        """Rows that are alive and pass the metadata filter"""
+        if not filter_dict:
+            return self.alive
+        mask = self.metadata_index.mask(filter_dict, len(self.alive))
+        if mask is not None:
+            return mask & self.alive
+
+        # Filter on fields without a precomputed index
+        mask = self.alive.copy()
+        for row in np.flatnonzero(mask).tolist():
+            if not matches_filter(self.metadata[row], filter_dict):
+                mask[row] = False
+        return mask
+
+    def _top_k(self, query: np.ndarray, top_k: int, mask: np.ndarray):
+        """Blocked exact top-k: returns (rows, scores) best first"""
+        candidate_rows, candidate_scores = [], []
+        for start in range(0, len(mask), self.block_rows):
+            block_mask = mask[start : start + self.block_rows]
+            if not block_mask.any():
+                continue
+
+            scores = self.vectors[start : start + len(block_mask)] @ query
+            scores = np.where(block_mask, scores, -np.inf)
+
+            k = min(top_k, len(scores))
+            best = np.argpartition(-scores, k - 1)[:k]
+            candidate_rows.append(best + start)
+            candidate_scores.append(scores[best])
+
+        if not candidate_rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        rows = np.concatenate(candidate_rows)
+        scores = np.concatenate(candidate_scores)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        rows, scores = rows[order], scores[order]
+        keep = np.isfinite(scores)
+        return rows[keep], scores[keep]
+
+    def _search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        filter_dict: Optional[Dict],
+        include_values: bool = False,
+    ) -> List[Dict[str, Any]]:
+        self._refresh()
+
+        with self.lock.read():
+            if self.vectors is None or top_k <= 0:
+                return []
+
+            rows, scores = self._top_k(query, top_k, self._filter_mask(filter_dict))
+            results = [
+                {
+                    "id": self.ids[row],
+                    "score": float(score),
+                    "metadata": self.metadata[row],
+                }
+                for row, score in zip(rows.tolist(), scores.tolist())
+            ]
+            if include_values and results:
+                for result, values in zip(results, np.asarray(self.vectors[rows])):
+                    result["values"] = values.tolist()
+            return results
+
+    async def search_similar(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int = 5,
+        filter_dict: Optional[Dict] = None,
+        include_values: bool = False,
+    ) -> List[Dict[str, Any]]:
+        try:
+            query = np.asarray(query_embedding, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm:
+                query = query / norm
+            # The blocked scan and any log replay run off the event loop
+            return await asyncio.to_thread(
+                self._search, query, top_k, filter_dict, include_values
+            )
+        except Exception as e:
+            print(f"❌ Error searching flat index: {str(e)}")
+            return []
@@ -0,0 +1,547 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.config.settings import settings
+from backend.services.vector_stores.base import (
+    MetadataIndex,
+    ReadWriteLock,
+    VectorStore,
+    matches_filter,
+    vector_metadata,
+)
+
+INDEX_FILE = "hnsw_index.bin"
+MANIFEST_FILE = "hnsw_manifest.json"
+# Held for life by the one process allowed to write the index
+WRITER_LOCK_FILE = "hnsw_writer.lock"
+# Single JSON sidecar written by earlier versions, converted on the next save
+LEGACY_SIDECAR_FILE = "hnsw_sidecar.json"
+# Label log entries beyond this multiple of the live labels trigger a rewrite
+LOG_REWRITE_RATIO = 2
+
+
+class HNSWVectorStore(VectorStore):
+    """
+    Local in-process HNSW index (hnswlib, cosine space) persisted to disk
+    Files in VECTOR_STORE_PATH:
+    - hnsw_index.bin: hnswlib snapshot
+    - hnsw_labels_<gen>.jsonl: append-only log of label entries ({"label",
+      "id", "metadata"}) and tombstones ({"deleted": [labels]})
+    - hnsw_manifest.json: generation, capacity and the log length covered
+      by the snapshot, replaced atomically last
+    Writes update memory and are saved at most every
+    VECTOR_STORE_SAVE_INTERVAL seconds (and on flush): a save appends only
+    the log entries since the previous one; the log is rewritten once it
+    holds LOG_REWRITE_RATIO times more entries than live labels. Searches
+    share a read lock; writes are exclusive. A single process writes: the
+    first write takes a file lock on hnsw_writer.lock for the life of the
+    process, and writes from any other process fail. Processes that only
+    read (the API) rebuild a newer saved index in the background of their
+    search thread and swap it in, at most every VECTOR_STORE_RELOAD_INTERVAL
+    seconds; an hnswlib snapshot cannot be patched, so each reload briefly
+    holds two copies of the index.
+    """
+
+    def __init__(self, path: str = settings.VECTOR_STORE_PATH):
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError(
+                "VECTOR_STORE_BACKEND=hnsw requires the 'hnswlib' package"
+            ) from e
+
+        self._hnswlib = hnswlib
+        self.path = path
+        self.dimension = settings.EMBEDDING_DIMENSION
+        self.lock = ReadWriteLock()
+        self.reload_lock = threading.Lock()
+
+        self.last_save = 0.0
+        self.last_reload = float("-inf")
+        self.writer_lock = None  # open lock file once this process writes
+        self.dirty = False
+        self.pending: List[Dict[str, Any]] = []  # log entries not saved yet
+
+        os.makedirs(self.path, exist_ok=True)
+        with self.lock.write():
+            self._apply_state(self._read_state())
+
+    def _index_path(self) -> str:
+        return os.path.join(self.path, INDEX_FILE)
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.path, MANIFEST_FILE)
+
+    def _log_path(self, generation: int) -> str:
+        return os.path.join(self.path, f"hnsw_labels_{generation}.jsonl")
+
+    def _legacy_sidecar_path(self) -> str:
+        return os.path.join(self.path, LEGACY_SIDECAR_FILE)
+
+    def _writer_lock_path(self) -> str:
+        return os.path.join(self.path, WRITER_LOCK_FILE)
+
+    def _acquire_writer(self):
+        """Become the only process writing the index (caller holds the write lock)"""
+        if self.writer_lock is not None:
+            return
+        lock_file = open(self._writer_lock_path(), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(
+                f"HNSW index at {self.path} is written by another process"
+            )
+        self.writer_lock = lock_file
+        # A previous writer may have saved since this process loaded
+        if self._disk_version() != self.loaded_version:
+            self._apply_state(self._read_state())
+
+    def close(self):
+        """Save pending writes and let another process become the writer"""
+        self.flush()
+        with self.lock.write():
+            if self.writer_lock is not None:
+                self.writer_lock.close()
+                self.writer_lock = None
+
+    def _disk_version(self) -> Optional[int]:
+        for path in (self._manifest_path(), self._legacy_sidecar_path()):
+            try:
+                return os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return None
+
+    def _new_index(self, max_elements: int):
+        index = self._hnswlib.Index(space="cosine", dim=self.dimension)
+        index.init_index(
+            max_elements=max_elements,
+            ef_construction=settings.HNSW_EF_CONSTRUCTION,
+            M=settings.HNSW_M,
+            allow_replace_deleted=True,
+        )
+        index.set_ef(settings.HNSW_EF_SEARCH)
+        return index
+
+    def _read_state(self) -> Dict[str, Any]:
+        """Load the saved index and labels without touching the live state"""
+        version = self._disk_version()
+        state = {
+            "version": version,
+            "generation": 0,
+            "log_bytes": 0,
+            "log_entries": 0,
+            "next_label": 0,
+            "labels": {},
+            "legacy": False,
+        }
+        if version is None:
+            state["index"] = self._new_index(settings.HNSW_INITIAL_CAPACITY)
+            return state
+
+        if os.path.exists(self._manifest_path()):
+            with open(self._manifest_path()) as f:
+                manifest = json.load(f)
+            with open(self._log_path(manifest["generation"]), "rb") as f:
+                data = f.read(manifest["log_bytes"])
+
+            labels: Dict[int, tuple] = {}
+            ids: Dict[str, int] = {}
+            lines = data.splitlines()
+            for line in lines:
+                entry = json.loads(line)
+                if "deleted" in entry:
+                    for label in entry["deleted"]:
+                        chunk_id, _ = labels.pop(label, (None, None))
+                        if ids.get(chunk_id) == label:
+                            del ids[chunk_id]
+                    continue
+                previous = ids.get(entry["id"])
+                if previous is not None:
+                    labels.pop(previous, None)
+                labels[entry["label"]] = (entry["id"], entry["metadata"])
+                ids[entry["id"]] = entry["label"]
+
+            state.update(
+                generation=manifest["generation"],
+                log_bytes=manifest["log_bytes"],
+                log_entries=len(lines),
+                next_label=manifest["next_label"],
+                labels=labels,
+            )
+            max_elements = manifest["max_elements"]
+        else:
+            with open(self._legacy_sidecar_path()) as f:
+                sidecar = json.load(f)
+            state.update(
+                next_label=sidecar["next_label"],
+                labels={
+                    int(label): (chunk_id, metadata)
+                    for label, (chunk_id, metadata) in sidecar["labels"].items()
+                },
+                legacy=True,
+            )
+            max_elements = sidecar["max_elements"]
+
+        index = self._hnswlib.Index(space="cosine", dim=self.dimension)
+        index.load_index(
+            self._index_path(),
+            max_elements=max_elements,
+            allow_replace_deleted=True,
+        )
+        index.set_ef(settings.HNSW_EF_SEARCH)
+        state["index"] = index
+
+        metadata_index = MetadataIndex()
+        for label in sorted(state["labels"]):
+            metadata_index.add(label, state["labels"][label][1])
+        state["metadata_index"] = metadata_index
+        return state
+
+    def _apply_state(self, state: Dict[str, Any]):
+        """Swap in a loaded state (caller holds the write lock)"""
+        self.index = state["index"]
+        self.labels: Dict[int, tuple] = state["labels"]  # label -> (id, metadata)
+        self.ids: Dict[str, int] = {
+            chunk_id: label for label, (chunk_id, _) in self.labels.items()
+        }
+        self.metadata_index = state.get("metadata_index") or MetadataIndex()
+        self.next_label = state["next_label"]
+        # Live labels; the metadata index still lists replaced and deleted ones
+        self.alive = np.zeros(max(self.next_label, 1), dtype=bool)
+        self.alive[list(self.labels)] = True
+        self.generation = state["generation"]
+        self.log_bytes = state["log_bytes"]
+        self.log_entries = state["log_entries"]
+        self.legacy = state["legacy"]
+        self.loaded_version = state["version"]
+        if state["version"] is not None:
+            print(
+                f"✅ Loaded HNSW index with {len(self.labels)} vectors from {self.path}"
+            )
+
+    def _set_alive(self, labels: List[int], alive: bool):
+        """Mark labels live or dead (caller holds the write lock)"""
+        if not labels:
+            return
+        needed = max(labels) + 1
+        if needed > len(self.alive):
+            grown = np.zeros(max(needed, 2 * len(self.alive)), dtype=bool)
+            grown[: len(self.alive)] = self.alive
+            self.alive = grown
+        self.alive[labels] = alive
+
+    def _maybe_reload(self):
+        """Pick up a newer index saved by the writer process"""
+        if (
+            self.writer_lock is not None
+            or time.monotonic() - self.last_reload
+            < settings.VECTOR_STORE_RELOAD_INTERVAL
+            or self._disk_version() == self.loaded_version
+        ):
+            return
+        # One thread rebuilds; concurrent searches keep using the current index
+        if not self.reload_lock.acquire(blocking=False):
+            return
+        try:
+            if self._disk_version() == self.loaded_version:
+                return
+            self.last_reload = time.monotonic()
+            try:
+                state = self._read_state()
+            except FileNotFoundError:
+                return  # Replaced mid-read by a save; retried on a later search
+            with self.lock.write():
+                if self.writer_lock is None:
+                    self._apply_state(state)
+        finally:
+            self.reload_lock.release()
+
+    def _write_log(self) -> Optional[int]:
+        """
+        Persist pending label entries (caller holds the write lock)
+
+        Returns:
+            Previous generation if the log was rewritten into a new one
+        """
+        if self.legacy or self.log_entries + len(self.pending) > (
+            LOG_REWRITE_RATIO * len(self.labels) + 1024
+        ):
+            generation = self.generation + 1
+            entries = [
+                {"label": label, "id": chunk_id, "metadata": metadata}
+                for label, (chunk_id, metadata) in sorted(self.labels.items())
+            ]
+            with open(self._log_path(generation), "wb") as f:
+                f.write(
+                    b"".join(json.dumps(e).encode("utf-8") + b"\n" for e in entries)
+                )
+                self.log_bytes = f.tell()
+            self.log_entries = len(entries)
+            previous, self.generation = self.generation, generation
+            return previous
+
+        # Bytes past log_bytes are left over from an interrupted save
+        mode = "r+b" if os.path.exists(self._log_path(self.generation)) else "wb"
+        with open(self._log_path(self.generation), mode) as f:
+            f.truncate(self.log_bytes)
+            f.seek(self.log_bytes)
+            f.write(
+                b"".join(json.dumps(e).encode("utf-8") + b"\n" for e in self.pending)
+            )
+            self.log_bytes = f.tell()
+        self.log_entries += len(self.pending)
+        return None
+
+    def _save(self, force: bool = False):
+        """Persist index, label log and manifest (caller holds the write lock)"""
+        if not force and (
+            time.monotonic() - self.last_save < settings.VECTOR_STORE_SAVE_INTERVAL
+        ):
+            self.dirty = True
+            return
+
+        index_tmp = self._index_path() + ".tmp"
+        self.index.save_index(index_tmp)
+        previous_generation = self._write_log()
+        os.replace(index_tmp, self._index_path())
+
+        # Manifest is replaced last: its mtime is the version readers watch
+        manifest_tmp = self._manifest_path() + ".tmp"
+        with open(manifest_tmp, "w") as f:
+            json.dump(
+                {
+                    "generation": self.generation,
+                    "dimension": self.dimension,
+                    "max_elements": self.index.get_max_elements(),
+                    "next_label": self.next_label,
+                    "log_bytes": self.log_bytes,
+                },
+                f,
+            )
+        os.replace(manifest_tmp, self._manifest_path())
+
+        stale = [self._legacy_sidecar_path()] if self.legacy else []
+        if previous_generation is not None:
+            stale.append(self._log_path(previous_generation))
+        for path in stale:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+        self.loaded_version = self._disk_version()
+        self.legacy = False
+        self.pending = []
+        self.last_save = time.monotonic()
+        self.dirty = False
+
+    def flush(self, force: bool = True):
+        """Persist pending writes (only once the save interval passed unless forced)"""
+        if self.dirty:
+            with self.lock.write():
+                if self.dirty:
+                    self._save(force=force)
+
+    def _upsert(self, embedded_chunks: List[Dict[str, Any]]):
+        with self.lock.write():
+            self._acquire_writer()
+            vectors = np.asarray(
+                [chunk["embedding"] for chunk in embedded_chunks], dtype=np.float32
+            )
+
+            # Replaced chunks get a fresh label; their old slot is reused
+            replaced = []
+            for chunk in embedded_chunks:
+                old_label = self.ids.pop(chunk["id"], None)
+                if old_label is not None:
+                    self.index.mark_deleted(old_label)
+                    del self.labels[old_label]
+                    replaced.append(old_label)
+            self._set_alive(replaced, False)
+
+            labels = np.arange(self.next_label, self.next_label + len(embedded_chunks))
+            self.next_label += len(embedded_chunks)
+
+            needed = self.index.get_current_count() + len(embedded_chunks)
+            if needed > self.index.get_max_elements():
+                self.index.resize_index(max(needed, 2 * self.index.get_max_elements()))
+
+            self.index.add_items(vectors, labels, replace_deleted=True)
+            self._set_alive(labels.tolist(), True)
+            for label, chunk in zip(labels.tolist(), embedded_chunks):
+                metadata = vector_metadata(chunk)
+                self.labels[label] = (chunk["id"], metadata)
+                self.ids[chunk["id"]] = label
+                self.metadata_index.add(label, metadata)
+                self.pending.append(
+                    {"label": label, "id": chunk["id"], "metadata": metadata}
+                )
+
+            self._save()
+
+    async def upsert_embeddings(self, embedded_chunks: List[Dict[str, Any]]) -> bool:
+        if not embedded_chunks:
+            print("⚠️ No embedded chunks to upsert")
+            return False
+
+        try:
+            print(f"Upserting {len(embedded_chunks)} embeddings to HNSW index...")
+            await asyncio.to_thread(self._upsert, embedded_chunks)
+            print(f"✅ Successfully upserted {len(embedded_chunks)} vectors")
+            return True
+        except Exception as e:
+            print(f"❌ Error upserting to HNSW index: {str(e)}")
+            return False
+
+    def _label_filter(self, filter_dict: Dict, mask: Optional[np.ndarray]):
+        """Label predicate for a metadata filter, from the precomputed mask if any"""
+        if mask is not None:
+            size = len(mask)
+            return lambda label: label < size and bool(mask[label])
+
+        labels = self.labels
+
+        def label_filter(label: int) -> bool:
+            entry = labels.get(label)
+            return entry is not None and matches_filter(entry[1], filter_dict)
+
+        return label_filter
+
+    def _with_values(
+        self, results: List[Dict[str, Any]], include_values: bool
+    ) -> List[Dict[str, Any]]:
+        """Drop internal labels, attaching stored vectors if requested"""
+        labels = [result.pop("label") for result in results]
+        if include_values and results:
+            for result, values in zip(results, self.index.get_items(labels)):
+                result["values"] = [float(value) for value in values]
+        return results
+
+    def _exact_search(
+        self, query: np.ndarray, top_k: int, candidates: np.ndarray
+    ) -> List[Dict[str, Any]]:
+        """Brute-force cosine over a small filtered candidate set"""
+        if not len(candidates):
+            return []
+        candidates = candidates.tolist()
+        vectors = np.asarray(self.index.get_items(candidates), dtype=np.float32)
+        norm = np.linalg.norm(query)
+        scores = vectors @ (query[0] / norm if norm else query[0])
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [
+            {
+                "id": self.labels[candidates[i]][0],
+                "score": float(scores[i]),
+                "metadata": self.labels[candidates[i]][1],
+                "label": candidates[i],
+            }
+            for i in order.tolist()
+        ]
+
+    def _search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        filter_dict: Optional[Dict],
+        include_values: bool = False,
+    ) -> List[Dict[str, Any]]:
+        self._maybe_reload()
+
+        with self.lock.read():
+            k = min(top_k, len(self.labels))
+            if k == 0:
+                return []
+
+            label_filter, allowed = None, None
+            if filter_dict:
+                mask = self.metadata_index.mask(filter_dict, self.next_label)
+                if mask is not None:
+                    mask &= self.alive[: len(mask)]
+                    allowed = int(np.count_nonzero(mask))
+                    # Selective filters: scoring the few matches beats graph search
+                    if allowed <= settings.HNSW_FILTER_EXACT_THRESHOLD:
+                        results = self._exact_search(query, k, np.flatnonzero(mask))
+                        return self._with_values(results, include_values)
+                label_filter = self._label_filter(filter_dict, mask)
+
+            try:
+                found, distances = self.index.knn_query(query, k=k, filter=label_filter)
+            except RuntimeError:
+                # Fewer than k vectors pass the filter: ask for exactly those
+                if label_filter is None:
+                    raise
+                if allowed is None:
+                    allowed = sum(1 for label in self.labels if label_filter(label))
+                k = min(k, allowed)
+                if k == 0:
+                    return []
+                found, distances = self.index.knn_query(query, k=k, filter=label_filter)
+
+            results = []
+            for label, distance in zip(found[0].tolist(), distances[0].tolist()):
+                entry = self.labels.get(label)
+                if entry is None:
+                    continue
+                results.append(
+                    {
+                        "id": entry[0],
+                        "score": 1.0 - distance,
+                        "metadata": entry[1],
+                        "label": label,
+                    }
+                )
+            return self._with_values(results, include_values)
+
+    async def search_similar(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int = 5,
+        filter_dict: Optional[Dict] = None,
+        include_values: bool = False,
+    ) -> List[Dict[str, Any]]:
+        try:
+            query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+            return await asyncio.to_thread(
+                self._search, query, top_k, filter_dict, include_values
+            )
+        except Exception as e:
+            print(f"❌ Error searching HNSW index: {str(e)}")
+            return []
+
+    def _delete_by_job_id(self, job_id: str) -> int:
+        with self.lock.write():
+            self._acquire_writer()
+            labels = [
+                label
+                for label, (_, metadata) in self.labels.items()
+                if metadata.get("job_id") == job_id
+            ]
+            for label in labels:
+                self.index.mark_deleted(label)
+                chunk_id, _ = self.labels.pop(label)
+                self.ids.pop(chunk_id, None)
+            self._set_alive(labels, False)
+            if labels:
+                self.pending.append({"deleted": labels})
+                self._save()
+            return len(labels)
+
+    async def delete_by_job_id(self, job_id: str) -> bool:
+        try:
+            print(f"🗑️ Deleting vectors for job: {job_id}")
+            deleted = await asyncio.to_thread(self._delete_by_job_id, job_id)
+            print(f"✅ Deleted {deleted} vectors for job: {job_id}")
+            return True
+        except Exception as e:
+            print(f"❌ Error deleting vectors: {str(e)}")
+            return False
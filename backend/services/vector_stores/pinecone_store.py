@@ -0,0 +1,130 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from pinecone import Pinecone, ServerlessSpec
+
+from backend.config.settings import settings
+from backend.services.vector_stores.base import VectorStore, vector_metadata
+
+
+class PineconeVectorStore(VectorStore):
+    """Managed Pinecone serverless index"""
+
+    def __init__(self):
+        self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+        self.index_name = settings.PINECONE_INDEX_NAME
+        self.index = None
+
+    def _get_index(self):
+        """Get or create Pinecone index"""
+        if self.index is None:
+            try:
+                # Check if index exists
+                if self.index_name not in self.pc.list_indexes().names():
+                    print(f"Creating Pinecone index: {self.index_name}")
+                    self.pc.create_index(
+                        name=self.index_name,
+                        dimension=settings.EMBEDDING_DIMENSION,
+                        metric="cosine",
+                        spec=ServerlessSpec(
+                            cloud="aws", region=settings.PINECONE_ENVIRONMENT
+                        ),
+                    )
+                    print(f"✅ Created index: {self.index_name}")
+
+                self.index = self.pc.Index(self.index_name)
+                print(f"✅ Connected to index: {self.index_name}")
+            except Exception as e:
+                print(f"❌ Error connecting to Pinecone: {str(e)}")
+                raise e
+
+        return self.index
+
+    async def upsert_embeddings(self, embedded_chunks: List[Dict[str, Any]]) -> bool:
+        if not embedded_chunks:
+            print("⚠️ No embedded chunks to upsert")
+            return False
+
+        try:
+            print(f"Upserting {len(embedded_chunks)} embeddings to Pinecone...")
+
+            # Prepare vectors for Pinecone
+            vectors = []
+            for chunk in embedded_chunks:
+                # Pinecone's client only accepts plain lists
+                values = chunk.get("embedding")
+                if hasattr(values, "tolist"):
+                    values = values.tolist()
+
+                vectors.append(
+                    {
+                        "id": chunk.get("id"),
+                        "values": values,
+                        "metadata": vector_metadata(chunk),
+                    }
+                )
+
+            # Upsert to Pinecone
+            index = self._get_index()
+            index.upsert(vectors=vectors)
+
+            print(f"✅ Successfully upserted {len(vectors)} vectors to Pinecone")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error upserting to Pinecone: {str(e)}")
+            return False
+
+    async def search_similar(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int = 5,
+        filter_dict: Optional[Dict] = None,
+        include_values: bool = False,
+    ) -> List[Dict[str, Any]]:
+        try:
+            print(f"🔍 Searching Pinecone for top {top_k} similar vectors...")
+
+            if hasattr(query_embedding, "tolist"):
+                query_embedding = query_embedding.tolist()
+
+            index = self._get_index()
+            results = index.query(
+                vector=query_embedding,
+                top_k=top_k,
+                include_metadata=True,
+                include_values=include_values,
+                filter=filter_dict,
+            )
+
+            # Format results
+            search_results = []
+            for match in results.matches:
+                result = {
+                    "id": match.id,
+                    "score": match.score,
+                    "metadata": match.metadata,
+                }
+                if include_values:
+                    result["values"] = match.values
+                search_results.append(result)
+
+            print(f"✅ Found {len(search_results)} similar vectors")
+            return search_results
+
+        except Exception as e:
+            print(f"❌ Error searching Pinecone: {str(e)}")
+            return []
+
+    async def delete_by_job_id(self, job_id: str) -> bool:
+        try:
+            print(f"🗑️ Deleting vectors for job: {job_id}")
+
+            index = self._get_index()
+            index.delete(filter={"job_id": job_id})
+
+            print(f"✅ Deleted vectors for job: {job_id}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error deleting vectors: {str(e)}")
+            return False
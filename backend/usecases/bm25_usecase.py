@@ -0,0 +1,230 @@
+import asyncio
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.config.settings import settings
+from backend.repositories.bm25_repository import BM25Repository
+from backend.services.vector_stores.base import scope_metadata
+
+TOKEN_PATTERN = re.compile(r"\w+(?:[.\-]\w+)*")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how i in is it its of on "
+    "or that the this to was were what when where which who why will with you".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens without stopwords
+    Dotted and hyphenated compounds ("v2.1", "rate-limit") are kept whole
+    and also emitted as their parts.
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        if token not in STOPWORDS:
+            tokens.append(token)
+        if "." in token or "-" in token:
+            tokens.extend(
+                part
+                for part in re.split(r"[.\-]", token)
+                if part and part not in STOPWORDS
+            )
+    return tokens
+
+
+class BM25Usecase:
+    """
+    Usecase for lexical retrieval with Okapi BM25
+    The index is built incrementally: each ingest job adds one posting block
+    per term, and corpus statistics are kept as running totals. Re-ingesting
+    a URL replaces the index of its earlier jobs. Queries read block headers
+    first, then score jobs in order of their score upper bound, in batches of
+    BM25_JOB_BATCH_SIZE, and stop once no remaining job can beat the current
+    top_k (at most BM25_MAX_SCORED_JOBS jobs are scored).
+    """
+
+    def __init__(self):
+        self.bm25_repository = BM25Repository()
+
+    async def index_chunks(
+        self, chunks: List[Dict[str, Any]], url: str, job_id: str
+    ) -> bool:
+        """
+        Add chunks of one ingest job to the BM25 index
+
+        Args:
+            chunks: Stored chunks with "id" and "content"
+            url: Source URL of the chunks
+            job_id: Job ID of the chunks
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not chunks:
+            return False
+
+        postings: Dict[str, List[tuple]] = {}
+        lengths = []
+        for position, chunk in enumerate(chunks):
+            tokens = tokenize(chunk["content"])
+            lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                postings.setdefault(term, []).append((position, frequency))
+
+        indexed = await self.bm25_repository.add_job_index(
+            job_id,
+            url,
+            [chunk["id"] for chunk in chunks],
+            lengths,
+            postings,
+            scope_metadata(url, chunks[0].get("metadata", {}).get("ingested_at")),
+        )
+        if indexed:
+            print(f"✅ Indexed {len(chunks)} chunks ({len(postings)} terms) for BM25")
+            # Stale copies of a re-ingested page must not compete in ranking
+            removed = await self.bm25_repository.delete_previous_jobs(url, job_id)
+            if removed:
+                print(f"✅ Removed BM25 index of {removed} earlier jobs of {url}")
+        return indexed
+
+    def _block_bound(self, header: Dict[str, Any], average_length: float) -> float:
+        """Highest term-frequency factor any chunk of a posting block reaches"""
+        k1, b = settings.BM25_K1, settings.BM25_B
+        max_tf, min_length = header.get("max_tf"), header.get("min_length")
+        if max_tf is None or min_length is None:
+            return k1 + 1  # Limit for tf -> infinity
+        norm = k1 * (1 - b + b * min_length / average_length)
+        return max_tf * (k1 + 1) / (max_tf + norm)
+
+    async def search(
+        self, query: str, top_k: int = 5, filter_dict: Optional[Dict] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Score chunks containing query terms with BM25
+
+        Args:
+            query: Search query
+            top_k: Number of results to return
+            filter_dict: Optional metadata filter, applied per job (all of a
+                job's chunks share url, domain and ingest time)
+
+        Returns:
+            List of matches (same shape as vector search results)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or top_k <= 0:
+            return []
+
+        try:
+            stats, headers = await asyncio.gather(
+                self.bm25_repository.get_stats(),
+                self.bm25_repository.get_block_headers(terms),
+            )
+            if filter_dict:
+                # Scope the jobs before ranking them, so that the cap below
+                # is not spent on jobs the filter drops anyway
+                in_scope = set(await self.bm25_repository.get_job_ids(filter_dict))
+                scoped_headers = [h for h in headers if h["job_id"] in in_scope]
+            else:
+                scoped_headers = headers
+            corpus_size = stats.get("document_count", 0)
+            if corpus_size <= 0 or not scoped_headers:
+                return []
+
+            k1, b = settings.BM25_K1, settings.BM25_B
+            average_length = max(stats.get("total_length", 0) / corpus_size, 1e-9)
+
+            document_frequency: Counter = Counter()
+            for header in headers:
+                document_frequency[header["term"]] += int(header["count"])
+            idf = {
+                term: math.log(1 + (corpus_size - frequency + 0.5) / (frequency + 0.5))
+                for term, frequency in document_frequency.items()
+            }
+
+            # Upper bound of the best chunk score of each job, from headers only
+            bounds: Dict[str, float] = {}
+            for header in scoped_headers:
+                bounds[header["job_id"]] = bounds.get(header["job_id"], 0.0) + idf[
+                    header["term"]
+                ] * self._block_bound(header, average_length)
+            jobs = sorted(bounds, key=bounds.get, reverse=True)
+            jobs = jobs[: settings.BM25_MAX_SCORED_JOBS]
+
+            # Min-heap of the best (score, job_id, position) so far
+            best: List[tuple] = []
+            documents: Dict[str, dict] = {}
+            batch_size = max(settings.BM25_JOB_BATCH_SIZE, 1)
+            for start in range(0, len(jobs), batch_size):
+                batch = jobs[start : start + batch_size]
+                # Jobs are in bound order: none of the rest can enter the top_k
+                if len(best) >= top_k and bounds[batch[0]] <= best[0][0]:
+                    break
+
+                batch_documents, postings = await asyncio.gather(
+                    self.bm25_repository.get_documents(batch, filter_dict),
+                    self.bm25_repository.get_postings(terms, batch),
+                )
+                documents.update(batch_documents)
+
+                job_scores = {
+                    job_id: np.zeros(len(document["chunk_ids"]), dtype=np.float32)
+                    for job_id, document in batch_documents.items()
+                }
+                for term, blocks in postings.items():
+                    for job_id, entries in blocks:
+                        if job_id not in job_scores:
+                            continue
+                        positions = entries[:, 0]
+                        frequency = entries[:, 1].astype(np.float32)
+                        lengths = batch_documents[job_id]["lengths"][positions]
+                        norm = k1 * (1 - b + b * lengths / average_length)
+                        job_scores[job_id][positions] += (
+                            idf[term] * frequency * (k1 + 1) / (frequency + norm)
+                        )
+
+                for job_id, scores in job_scores.items():
+                    k = min(top_k, len(scores))
+                    if k == 0:
+                        continue
+                    for position in np.argpartition(-scores, k - 1)[:k].tolist():
+                        score = float(scores[position])
+                        if score <= 0:
+                            continue
+                        candidate = (score, job_id, position)
+                        if len(best) < top_k:
+                            heapq.heappush(best, candidate)
+                        elif candidate > best[0]:
+                            heapq.heapreplace(best, candidate)
+
+            results = []
+            for score, job_id, position in sorted(best, reverse=True):
+                document = documents[job_id]
+                chunk_id = document["chunk_ids"][position]
+                results.append(
+                    {
+                        "id": chunk_id,
+                        "score": score,
+                        "metadata": {
+                            "chunk_id": chunk_id,
+                            "url": document["url"],
+                            "job_id": job_id,
+                        },
+                    }
+                )
+            return results
+
+        except Exception as e:
+            print(f"❌ Error in BM25 search: {str(e)}")
+            return []
+
+    async def backfill_scope_metadata(self, job_id: Optional[str] = None) -> int:
+        """Add scope filter fields to jobs indexed before they existed"""
+        return await self.bm25_repository.backfill_scope_metadata(job_id)
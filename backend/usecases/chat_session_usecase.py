@@ -1,12 +1,43 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
 from fastapi import Depends
 
+from backend.config.settings import settings
 from backend.repositories.chat_session_repository import ChatSessionRepository
+from backend.services.session_cache_service import session_cache
+
+# Seconds between sweeps of idle sessions, and sessions deleted per batch
+SESSION_EXPIRY_INTERVAL = 3600
+SESSION_EXPIRY_BATCH = 1000
+
+
+async def run_session_expiry():
+    """Delete sessions idle for CHAT_SESSION_TTL_SECONDS, with their messages"""
+    if settings.CHAT_SESSION_TTL_SECONDS <= 0:
+        return
+    repository = ChatSessionRepository()
+    while True:
+        idle_before = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.CHAT_SESSION_TTL_SECONDS
+        )
+        deleted = await repository.delete_idle_sessions(
+            idle_before, SESSION_EXPIRY_BATCH
+        )
+        if deleted:
+            print(f"✅ Expired {deleted} idle chat sessions")
+        # A full batch means more are waiting
+        if deleted < SESSION_EXPIRY_BATCH:
+            await asyncio.sleep(SESSION_EXPIRY_INTERVAL)
 
 
 class ChatSessionUsecase:
-    """Usecase for managing chat sessions"""
+    """
+    Usecase for managing chat sessions
+    Active sessions are served from the Redis session cache when
+    SESSION_CACHE_ENABLED; any Redis failure falls back to MongoDB.
+    """
 
     def __init__(
         self,
@@ -24,13 +55,35 @@ class ChatSessionUsecase:
         Returns:
             Session data
         """
-        session = await self.chat_session_repository.get_session(session_id)
+        if session_cache.enabled:
+            try:
+                session = await session_cache.load_session(session_id)
+                if session is not None:
+                    return session
+            except Exception as e:
+                print(f"⚠️ Session cache unavailable, using MongoDB: {str(e)}")
+        return await self.chat_session_repository.get_or_create_session(session_id)
 
-        if not session:
-            await self.chat_session_repository.create_session(session_id)
-            session = await self.chat_session_repository.get_session(session_id)
-
-        return session
+    async def _add_message(
+        self, session_id: str, role: str, content: str, sources: Optional[List] = None
+    ) -> bool:
+        if session_cache.enabled:
+            message = {
+                "session_id": session_id,
+                "role": role,
+                "content": content,
+                "timestamp": datetime.utcnow(),
+            }
+            # Add sources only for assistant messages
+            if role == "assistant" and sources:
+                message["sources"] = sources
+            try:
+                return await session_cache.add_message(message)
+            except Exception as e:
+                print(f"⚠️ Session cache unavailable, using MongoDB: {str(e)}")
+        return await self.chat_session_repository.add_message(
+            session_id=session_id, role=role, content=content, sources=sources
+        )
 
     async def add_user_message(self, session_id: str, message: str) -> bool:
         """
@@ -43,9 +96,7 @@ class ChatSessionUsecase:
         Returns:
             True if successful
         """
-        return await self.chat_session_repository.add_message(
-            session_id=session_id, role="user", content=message
-        )
+        return await self._add_message(session_id, "user", message)
 
     async def add_assistant_message(
         self, session_id: str, message: str, sources: Optional[List] = None
@@ -61,9 +112,7 @@ class ChatSessionUsecase:
         Returns:
             True if successful
         """
-        return await self.chat_session_repository.add_message(
-            session_id=session_id, role="assistant", content=message, sources=sources
-        )
+        return await self._add_message(session_id, "assistant", message, sources)
 
     async def get_chat_history(self, session_id: str, limit: int = 10) -> List[dict]:
         """
@@ -76,8 +125,90 @@ class ChatSessionUsecase:
         Returns:
             List of recent messages
         """
+        if session_cache.enabled:
+            try:
+                if await session_cache.get_session(session_id) is not None:
+                    return await session_cache.get_messages(session_id, limit)
+            except Exception as e:
+                print(f"⚠️ Session cache unavailable, using MongoDB: {str(e)}")
         return await self.chat_session_repository.get_recent_messages(session_id, limit)
 
+    async def get_memory(self, session_id: str) -> dict:
+        """
+        Get the conversation memory used in the prompt
+
+        In "summary" mode this is the running summary plus the messages it
+        does not cover yet; in "window" mode only the last messages.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            {"summary", "summarized_count", "messages"} with messages (each
+            with its "seq") most recent last
+        """
+        if settings.SESSION_MEMORY_MODE != "summary":
+            messages = await self.get_chat_history(
+                session_id, limit=settings.SESSION_HISTORY_MESSAGES
+            )
+            return {"summary": "", "summarized_count": 0, "messages": messages}
+
+        if session_cache.enabled:
+            try:
+                session = await session_cache.get_session(session_id)
+                if session is not None:
+                    messages = await session_cache.get_messages(
+                        session_id, settings.SESSION_CACHE_MESSAGES
+                    )
+                    return {
+                        "summary": session["summary"],
+                        "summarized_count": session["summarized_count"],
+                        "messages": [
+                            m
+                            for m in messages
+                            if m["seq"] > session["summarized_count"]
+                        ],
+                    }
+            except Exception as e:
+                print(f"⚠️ Session cache unavailable, using MongoDB: {str(e)}")
+
+        memory = await self.chat_session_repository.get_memory(session_id)
+        return {
+            "summary": memory["summary"],
+            "summarized_count": memory["summarized_count"],
+            "messages": memory["messages"],
+        }
+
+    async def update_summary(
+        self,
+        session_id: str,
+        summary: str,
+        summarized_count: int,
+        previous_count: int,
+    ) -> bool:
+        """
+        Replace the running summary if no other refresh moved it meanwhile
+
+        Args:
+            session_id: Session identifier
+            summary: New summary text
+            summarized_count: Sequence number of the last message covered
+            previous_count: summarized_count the new summary was built from
+
+        Returns:
+            True if the summary was replaced
+        """
+        updated = await self.chat_session_repository.update_summary(
+            session_id, summary, summarized_count, previous_count
+        )
+        if updated and session_cache.enabled:
+            try:
+                await session_cache.set_summary(session_id, summary, summarized_count)
+            except Exception as e:
+                # The entry is rebuilt from MongoDB on its next miss
+                print(f"⚠️ Failed to cache session summary: {str(e)}")
+        return updated
+
     def format_chat_history_for_llm(self, messages: List[dict]) -> str:
         """
         Format chat history for LLM context
@@ -113,6 +244,13 @@ class ChatSessionUsecase:
         Returns:
             True if successful
         """
+        if session_cache.enabled:
+            try:
+                # Queued writes must land before the session is wiped
+                await session_cache.flush_session(session_id)
+                await session_cache.evict(session_id)
+            except Exception as e:
+                print(f"⚠️ Session cache unavailable: {str(e)}")
         return await self.chat_session_repository.clear_session(session_id)
 
     async def delete_session(self, session_id: str) -> bool:
@@ -125,4 +263,11 @@ class ChatSessionUsecase:
         Returns:
             True if successful
         """
+        if session_cache.enabled:
+            try:
+                # Queued writes must land before the session is wiped
+                await session_cache.flush_session(session_id)
+                await session_cache.evict(session_id)
+            except Exception as e:
+                print(f"⚠️ Session cache unavailable: {str(e)}")
         return await self.chat_session_repository.delete_session(session_id)
@@ -1,12 +1,21 @@
+import time
 import uuid
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from langchain_text_splitters import (
     MarkdownHeaderTextSplitter,
     RecursiveCharacterTextSplitter,
 )
 
+from backend.config.settings import settings
 from backend.repositories.chunk_repository import ChunkRepository
+from backend.repositories.document_repository import DocumentRepository
+from backend.usecases.bm25_usecase import BM25Usecase
+from backend.usecases.dedup_usecase import DedupUsecase
+from backend.usecases.embedding_usecase import EmbeddingUsecase
+
+# Separator between header sections in the stored page markdown
+SECTION_SEPARATOR = "\n\n"
 
 
 class ChunkingUsecase:
@@ -20,6 +29,10 @@ class ChunkingUsecase:
     def __init__(self):
         # Initialize repository
         self.chunk_repository = ChunkRepository()
+        self.document_repository = DocumentRepository()
+        self.dedup_usecase = DedupUsecase()
+        self.bm25_usecase = BM25Usecase()
+        self.embedding_usecase = EmbeddingUsecase()
 
         # Stage 1: Markdown header splitter
         self.headers_to_split_on = [
@@ -53,10 +66,13 @@ class ChunkingUsecase:
 
             # Stage 2: Further split large sections
             final_chunks = []
+            sections = []
+            section_start = 0
             for i, doc in enumerate(md_header_splits):
                 page_content = (
                     doc.page_content if hasattr(doc, "page_content") else str(doc)
                 )
+                sections.append(page_content)
                 doc_metadata = doc.metadata if hasattr(doc, "metadata") else {}
 
                 clean_metadata = {}
@@ -68,10 +84,16 @@ class ChunkingUsecase:
 
                 if len(page_content) > self.recursive_splitter._chunk_size:
                     sub_chunks = self.recursive_splitter.split_text(page_content)
+                    offsets = self._locate_chunks(page_content, sub_chunks)
                     for j, sub_chunk in enumerate(sub_chunks):
                         final_chunks.append(
                             {
                                 "content": sub_chunk,
+                                "start": (
+                                    section_start + offsets[j]
+                                    if offsets[j] is not None
+                                    else None
+                                ),
                                 "metadata": {
                                     **clean_metadata,
                                     "url": url,
@@ -87,6 +109,7 @@ class ChunkingUsecase:
                     final_chunks.append(
                         {
                             "content": page_content,
+                            "start": section_start,
                             "metadata": {
                                 **clean_metadata,
                                 "url": url,
@@ -98,24 +121,17 @@ class ChunkingUsecase:
                         }
                     )
 
+                section_start += len(page_content) + len(SECTION_SEPARATOR)
+
             print(f"✅ Stage 2: Final chunks created: {len(final_chunks)}")
             print(
                 f"📊 Average chunk size: {sum(c['metadata']['chunk_size'] for c in final_chunks) // len(final_chunks)} characters"
             )
 
             # Store chunks in MongoDB
-            print(f"Storing {len(final_chunks)} chunks in database...")
-            stored_count = 0
-            for chunk in final_chunks:
-                chunk_id = str(uuid.uuid4())
-                chunk["id"] = chunk_id
-                success = await self.chunk_repository.add_chunk(chunk_id, chunk)
-                if success:
-                    stored_count += 1
-
-            print(f"✅ Stored {stored_count}/{len(final_chunks)} chunks in MongoDB")
-
-            return final_chunks
+            return await self._store_chunks(
+                final_chunks, url, job_id, SECTION_SEPARATOR.join(sections)
+            )
 
         except Exception as e:
             print(f"❌ Error chunking markdown: {str(e)}")
@@ -131,9 +147,11 @@ class ChunkingUsecase:
         print("⚠️ Using fallback chunking strategy")
         try:
             chunks = self.recursive_splitter.split_text(content)
+            offsets = self._locate_chunks(content, chunks)
             final_chunks = [
                 {
                     "content": chunk,
+                    "start": offsets[i],
                     "metadata": {
                         "url": url,
                         "job_id": job_id,
@@ -146,20 +164,80 @@ class ChunkingUsecase:
             ]
 
             # Store fallback chunks in MongoDB
-            print(f"💾 Storing {len(final_chunks)} fallback chunks in database...")
-            stored_count = 0
-            for chunk in final_chunks:
-                chunk_id = str(uuid.uuid4())
-                chunk["id"] = chunk_id
-                success = await self.chunk_repository.add_chunk(chunk_id, chunk)
-                if success:
-                    stored_count += 1
-
-            print(
-                f"✅ Stored {stored_count}/{len(final_chunks)} fallback chunks in MongoDB"
-            )
-
-            return final_chunks
+            return await self._store_chunks(final_chunks, url, job_id, content)
         except Exception as e:
             print(f"❌ Fallback chunking also failed: {str(e)}")
             return []
+
+    def _locate_chunks(self, text: str, pieces: List[str]) -> List[Optional[int]]:
+        """
+        Find the start offset of each split piece in its source text
+        Pieces are searched in order, so overlapping pieces resolve to the
+        occurrence right after the previous piece.
+        """
+        offsets = []
+        cursor = 0
+        for piece in pieces:
+            offset = text.find(piece, cursor)
+            if offset == -1:
+                offset = text.find(piece)
+            offsets.append(offset if offset != -1 else None)
+            if offset != -1:
+                cursor = offset + 1
+        return offsets
+
+    async def _store_chunks(
+        self,
+        final_chunks: List[Dict[str, Any]],
+        url: str,
+        job_id: str,
+        document_text: str,
+    ) -> List[Dict[str, Any]]:
+        """
+        Assign chunk IDs, drop or link near-duplicates, embed and store chunks
+        In 'offsets' storage mode the page markdown is stored compressed once
+        and chunks only keep (document_id, start, end). Canonical chunks are
+        embedded before the insert, so each is written with its packed
+        embedding in one round trip, and added to the BM25 index.
+
+        Returns:
+            Canonical chunks with 'embedding' (near-duplicates are never
+            embedded)
+        """
+        ingested_at = int(time.time())
+        for chunk in final_chunks:
+            chunk["id"] = str(uuid.uuid4())
+            chunk["metadata"]["ingested_at"] = ingested_at
+
+        if settings.CHUNK_STORAGE_MODE == "offsets":
+            document_id = str(uuid.uuid4())
+            stored = await self.document_repository.add_document(
+                document_id, document_text, url, job_id
+            )
+            for chunk in final_chunks:
+                start = chunk.get("start")
+                if stored and start is not None:
+                    chunk["document_id"] = document_id
+                    chunk["end"] = start + len(chunk["content"])
+
+        canonical_chunks, duplicate_chunks = await self.dedup_usecase.deduplicate(
+            final_chunks, url
+        )
+        canonical_chunks = await self.embedding_usecase.generate_embeddings(
+            canonical_chunks
+        )
+
+        # Linked duplicates are kept in MongoDB for provenance only
+        chunks_to_store = list(canonical_chunks)
+        if settings.DEDUP_MODE == "link":
+            chunks_to_store.extend(duplicate_chunks)
+
+        print(f"Storing {len(chunks_to_store)} chunks in database...")
+        stored_count = await self.chunk_repository.add_chunks(chunks_to_store)
+
+        print(f"✅ Stored {stored_count}/{len(chunks_to_store)} chunks in MongoDB")
+
+        await self.dedup_usecase.register(canonical_chunks, url, job_id)
+        await self.bm25_usecase.index_chunks(canonical_chunks, url, job_id)
+
+        return canonical_chunks
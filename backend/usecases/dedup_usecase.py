@@ -0,0 +1,176 @@
+import hashlib
+import re
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from backend.config.settings import settings
+from backend.repositories.fingerprint_repository import FingerprintRepository
+
+FINGERPRINT_BITS = 64
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class DedupUsecase:
+    """
+    Usecase for near-duplicate chunk detection
+    Chunks are fingerprinted with a 64-bit SimHash over word shingles.
+    The fingerprint is split into (threshold + 1) bands, so any two
+    fingerprints within the Hamming threshold share at least one band;
+    the bands form a persistent LSH index in MongoDB.
+    """
+
+    def __init__(self):
+        self.fingerprint_repository = FingerprintRepository()
+        self.mode = settings.DEDUP_MODE
+        self.threshold = settings.DEDUP_HAMMING_THRESHOLD
+        self.shingle_size = settings.DEDUP_SHINGLE_SIZE
+        self.num_bands = self.threshold + 1
+        self.band_bits = FINGERPRINT_BITS // self.num_bands
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("drop", "link")
+
+    def fingerprint(self, text: str) -> int:
+        """
+        Compute the SimHash fingerprint of a text
+
+        Args:
+            text: Text to fingerprint
+
+        Returns:
+            64-bit fingerprint (0 for texts without tokens)
+        """
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        if not tokens:
+            return 0
+
+        if len(tokens) <= self.shingle_size:
+            shingles = Counter([" ".join(tokens)])
+        else:
+            shingles = Counter(
+                " ".join(tokens[i : i + self.shingle_size])
+                for i in range(len(tokens) - self.shingle_size + 1)
+            )
+
+        weights = [0] * FINGERPRINT_BITS
+        for shingle, count in shingles.items():
+            digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+            shingle_hash = int.from_bytes(digest, "big")
+            for bit in range(FINGERPRINT_BITS):
+                if shingle_hash >> bit & 1:
+                    weights[bit] += count
+                else:
+                    weights[bit] -= count
+
+        fingerprint = 0
+        for bit, weight in enumerate(weights):
+            if weight > 0:
+                fingerprint |= 1 << bit
+        return fingerprint
+
+    def bands(self, fingerprint: int) -> List[str]:
+        """Split a fingerprint into LSH band keys"""
+        keys = []
+        for i in range(self.num_bands):
+            start = i * self.band_bits
+            width = (
+                self.band_bits if i < self.num_bands - 1 else FINGERPRINT_BITS - start
+            )
+            value = (fingerprint >> start) & ((1 << width) - 1)
+            keys.append(f"{i}:{value:x}")
+        return keys
+
+    async def deduplicate(
+        self, chunks: List[Dict[str, Any]], url: str
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split chunks into canonical chunks and near-duplicates
+        Chunks are compared against the corpus (other URLs) and against
+        earlier chunks of the same batch. Duplicates get 'duplicate_of'
+        and 'duplicate_distance' added to their metadata.
+
+        Args:
+            chunks: List of chunk dictionaries with 'id' and 'content'
+            url: Source URL of the chunks
+
+        Returns:
+            Tuple of (canonical chunks, duplicate chunks)
+        """
+        if not self.enabled or not chunks:
+            return chunks, []
+
+        fingerprints = [self.fingerprint(chunk.get("content", "")) for chunk in chunks]
+        chunk_bands = [self.bands(fp) for fp in fingerprints]
+
+        # One round trip for the whole batch
+        all_bands = sorted({band for bands in chunk_bands for band in bands})
+        candidates = await self.fingerprint_repository.find_candidates(all_bands, url)
+
+        band_index: Dict[str, List[Tuple[int, str]]] = {}
+        for candidate in candidates:
+            entry = (int(candidate["fingerprint"], 16), candidate["chunk_id"])
+            for band in candidate.get("bands", []):
+                band_index.setdefault(band, []).append(entry)
+
+        canonical, duplicates = [], []
+        for chunk, fingerprint, bands in zip(chunks, fingerprints, chunk_bands):
+            match = None
+            if fingerprint:
+                for band in bands:
+                    for other_fingerprint, other_id in band_index.get(band, []):
+                        distance = (fingerprint ^ other_fingerprint).bit_count()
+                        if distance <= self.threshold and (
+                            match is None or distance < match[1]
+                        ):
+                            match = (other_id, distance)
+
+            chunk["fingerprint"] = fingerprint
+            if match:
+                chunk["metadata"]["duplicate_of"] = match[0]
+                chunk["metadata"]["duplicate_distance"] = match[1]
+                duplicates.append(chunk)
+                continue
+
+            canonical.append(chunk)
+            if fingerprint:
+                for band in bands:
+                    band_index.setdefault(band, []).append((fingerprint, chunk["id"]))
+
+        if duplicates:
+            print(
+                f"🧬 Found {len(duplicates)}/{len(chunks)} near-duplicate chunks for {url}"
+            )
+        return canonical, duplicates
+
+    async def register(self, chunks: List[Dict[str, Any]], url: str, job_id: str):
+        """
+        Add canonical chunks to the persistent LSH index
+
+        Args:
+            chunks: Canonical chunks returned by deduplicate()
+            url: Source URL of the chunks
+            job_id: Job ID of the chunks
+        """
+        if not self.enabled:
+            return False
+
+        fingerprints = [
+            {
+                "chunk_id": chunk["id"],
+                "fingerprint": f"{chunk['fingerprint']:016x}",
+                "bands": self.bands(chunk["fingerprint"]),
+                "url": url,
+                "job_id": job_id,
+            }
+            for chunk in chunks
+            if chunk.get("fingerprint")
+        ]
+        if not await self.fingerprint_repository.add_fingerprints(fingerprints):
+            return False
+
+        # Chunks of earlier ingests of this URL must not be linked to anymore
+        deleted = await self.fingerprint_repository.delete_previous_jobs(url, job_id)
+        if deleted:
+            print(f"🧬 Removed {deleted} fingerprints of earlier ingests of {url}")
+        return True
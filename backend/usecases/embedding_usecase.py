@@ -1,8 +1,22 @@
+import asyncio
+from functools import lru_cache
 from typing import Any, Dict, List
 
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from backend.config.settings import settings
+from backend.services.embedding_cache_service import query_embedding_cache
+from backend.services.embedding_pool_service import get_embedding_pool
+
+
+@lru_cache(maxsize=None)
+def _load_model(model_name: str) -> SentenceTransformer:
+    """Load a sentence-transformers model once per process"""
+    print("🧠 Loading MiniLM embedding model...")
+    model = SentenceTransformer(model_name)
+    print("✅ MiniLM model loaded successfully")
+    return model
 
 
 class EmbeddingUsecase:
@@ -12,10 +26,12 @@ class EmbeddingUsecase:
     """
 
     def __init__(self):
-        # Load MiniLM model
-        print("🧠 Loading MiniLM embedding model...")
-        self.model = SentenceTransformer(settings.EMBEDDING_MODEL)
-        print("✅ MiniLM model loaded successfully")
+        self.model_name = settings.EMBEDDING_MODEL
+
+    @property
+    def model(self) -> SentenceTransformer:
+        # Loaded lazily so cached queries never touch the model
+        return _load_model(self.model_name)
 
     async def generate_embeddings(
         self, chunks: List[Dict[str, Any]]
@@ -27,7 +43,8 @@ class EmbeddingUsecase:
             chunks: List of chunk dictionaries with 'content' field
 
         Returns:
-            List of chunks with added 'embedding' field
+            List of chunks with added 'embedding' field (float32 rows of one
+            contiguous matrix)
         """
         if not chunks:
             print("⚠️ No chunks to embed")
@@ -40,17 +57,34 @@ class EmbeddingUsecase:
             chunk_contents = [chunk.get("content", "") for chunk in chunks]
 
             # Generate embeddings using MiniLM
-            embeddings = self.model.encode(
-                chunk_contents,
-                show_progress_bar=True,
-                convert_to_tensor=False,
-            )
-
-            # Add embeddings to chunks
+            if (
+                settings.EMBEDDING_POOL_PROCESSES > 1
+                and len(chunk_contents) >= settings.EMBEDDING_POOL_MIN_CHUNKS
+            ):
+                # Bulk ingest: shard across the multi-process pool
+                print(
+                    f"🧠 Using embedding pool ({settings.EMBEDDING_POOL_PROCESSES} processes)"
+                )
+                embeddings = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    get_embedding_pool().encode,
+                    chunk_contents,
+                    settings.EMBEDDING_BATCH_SIZE,
+                )
+            else:
+                embeddings = self.model.encode(
+                    chunk_contents,
+                    batch_size=settings.EMBEDDING_BATCH_SIZE,
+                    show_progress_bar=True,
+                    convert_to_numpy=True,
+                )
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+            # Add embeddings to chunks (row views, no per-float boxing)
             embedded_chunks = []
             for i, chunk in enumerate(chunks):
                 embedded_chunk = chunk.copy()
-                embedded_chunk["embedding"] = embeddings[i].tolist()
+                embedded_chunk["embedding"] = embeddings[i]
                 embedded_chunks.append(embedded_chunk)
 
             print(f"✅ Generated {len(embedded_chunks)} embeddings")
@@ -63,6 +97,8 @@ class EmbeddingUsecase:
     async def generate_single_embedding(self, text: str) -> List[float]:
         """
         Generate embedding for a single text
+        Served from the query embedding cache when the same normalized text
+        was embedded before.
 
         Args:
             text: Text to embed
@@ -71,8 +107,53 @@ class EmbeddingUsecase:
             List of embedding values
         """
         try:
-            embedding = self.model.encode([text], convert_to_tensor=False)
+            cached = await query_embedding_cache.get(text, self.model_name)
+            if cached is not None:
+                return cached.tolist()
+
+            embedding = self.model.encode([text], convert_to_numpy=True)
+            await query_embedding_cache.put(text, self.model_name, embedding[0])
             return embedding[0].tolist()
         except Exception as e:
             print(f"❌ Error generating single embedding: {str(e)}")
             return []
+
+    async def generate_query_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many queries with one model call
+        Cached queries are skipped; the rest are encoded together on a
+        worker thread.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding of each text in input order (empty on failure)
+        """
+        try:
+            embeddings: List[Any] = list(
+                await asyncio.gather(
+                    *(
+                        query_embedding_cache.get(text, self.model_name)
+                        for text in texts
+                    )
+                )
+            )
+            missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+            if missing:
+                encoded = await asyncio.to_thread(
+                    self.model.encode,
+                    [texts[i] for i in missing],
+                    batch_size=settings.EMBEDDING_BATCH_SIZE,
+                    show_progress_bar=False,
+                    convert_to_numpy=True,
+                )
+                for i, embedding in zip(missing, encoded):
+                    await query_embedding_cache.put(
+                        texts[i], self.model_name, embedding
+                    )
+                    embeddings[i] = embedding
+            return [embedding.tolist() for embedding in embeddings]
+        except Exception as e:
+            print(f"❌ Error generating query embeddings: {str(e)}")
+            return [[] for _ in texts]
@@ -1,15 +1,108 @@
-from groq import Groq
+import asyncio
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional
+
+from groq import AsyncGroq
 
 from backend.config.settings import settings
+from backend.services.metrics_service import metrics_service
+
+_llm_semaphore: Optional[asyncio.Semaphore] = None
+_in_flight = 0
+
+
+@lru_cache(maxsize=None)
+def get_groq_client() -> AsyncGroq:
+    """One async Groq client (and HTTP connection pool) per process"""
+    return AsyncGroq(
+        api_key=settings.GROQ_API_KEY,
+        timeout=settings.GROQ_TIMEOUT_SECONDS,
+        max_retries=settings.GROQ_MAX_RETRIES,
+    )
+
+
+async def close_groq_client():
+    """Close the shared client's connections (called at shutdown)"""
+    if get_groq_client.cache_info().currsize:
+        await get_groq_client().close()
+        get_groq_client.cache_clear()
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Created lazily so it belongs to the running event loop
+    global _llm_semaphore
+    if _llm_semaphore is None:
+        _llm_semaphore = asyncio.Semaphore(settings.GROQ_MAX_CONCURRENCY)
+    return _llm_semaphore
+
+
+def llm_stats() -> Dict[str, Any]:
+    """Get in-flight completions and the concurrency limit"""
+    return {"in_flight": _in_flight, "max_concurrency": settings.GROQ_MAX_CONCURRENCY}
+
+
+metrics_service.register("llm", llm_stats)
 
 
 class GroqUsecase:
+    """
+    Usecase for LLM completions through Groq
+    All instances share one AsyncGroq client, so HTTP connections are reused
+    and completions never block the event loop. At most GROQ_MAX_CONCURRENCY
+    completions run at once per process; further calls wait for a slot.
+    """
+
     def __init__(self):
-        self.groq = Groq(api_key=settings.GROQ_API_KEY)
+        self.groq = get_groq_client()
 
     async def generate_response(self, prompt: str):
-        response = self.groq.chat.completions.create(
-            model=settings.GROQ_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-        )
+        global _in_flight
+        async with _get_semaphore():
+            _in_flight += 1
+            try:
+                with metrics_service.timer("llm.completion"):
+                    response = await asyncio.wait_for(
+                        self.groq.chat.completions.create(
+                            model=settings.GROQ_MODEL,
+                            messages=[{"role": "user", "content": prompt}],
+                        ),
+                        timeout=settings.GROQ_TIMEOUT_SECONDS,
+                    )
+            finally:
+                _in_flight -= 1
         return response.choices[0].message.content
+
+    async def stream_response(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream a completion token by token
+
+        The concurrency slot is held until the stream ends. Closing this
+        generator early closes the upstream HTTP stream.
+
+        Args:
+            prompt: Prompt to complete
+
+        Yields:
+            Text deltas in order
+        """
+        global _in_flight
+        async with _get_semaphore():
+            _in_flight += 1
+            try:
+                with metrics_service.timer("llm.stream_start"):
+                    stream = await self.groq.chat.completions.create(
+                        model=settings.GROQ_MODEL,
+                        messages=[{"role": "user", "content": prompt}],
+                        stream=True,
+                    )
+                try:
+                    async for chunk in stream:
+                        delta = (
+                            chunk.choices[0].delta.content if chunk.choices else None
+                        )
+                        if delta:
+                            yield delta
+                finally:
+                    await stream.close()
+            finally:
+                _in_flight -= 1
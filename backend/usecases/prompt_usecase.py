@@ -0,0 +1,200 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from backend.config.settings import settings
+from backend.prompts.llm_prompt import RAG_PROMPT
+from backend.services.cache_service import LRUCache
+from backend.services.metrics_service import metrics_service
+
+# Rough characters per token, used without a tokenizer
+CHARS_PER_TOKEN = 4
+CONTEXT_SEPARATOR = "\n\n"
+
+# text -> token count; chunk contents and history turns recur across queries
+token_count_cache = LRUCache(settings.PROMPT_TOKEN_CACHE_SIZE)
+metrics_service.register("prompt_token_cache", token_count_cache.stats)
+
+
+@lru_cache(maxsize=None)
+def _load_tokenizer(name: str):
+    """Load a Hugging Face tokenizer once per process, or None if unavailable"""
+    if not name:
+        return None
+    try:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(name)
+        print(f"✅ Prompt tokenizer {name} loaded")
+        return tokenizer
+    except Exception as e:
+        print(f"⚠️ Failed to load prompt tokenizer {name}, estimating: {str(e)}")
+        return None
+
+
+def load_prompt_tokenizer() -> bool:
+    """
+    Load PROMPT_TOKENIZER up front (at startup) so no query waits for it
+
+    Returns:
+        True if token counts use the tokenizer, False if they are estimated
+    """
+    return _load_tokenizer(settings.PROMPT_TOKENIZER) is not None
+
+
+def count_tokens(text: str) -> int:
+    """Number of LLM tokens in a text"""
+    if not text:
+        return 0
+    cached = token_count_cache.get(text)
+    if cached is not None:
+        return cached
+
+    tokenizer = _load_tokenizer(settings.PROMPT_TOKENIZER)
+    if tokenizer is not None:
+        count = len(tokenizer.encode(text, add_special_tokens=False))
+    else:
+        count = -(-len(text) // CHARS_PER_TOKEN)
+    token_count_cache.put(text, count)
+    return count
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of a text that fits in max_tokens"""
+    if max_tokens <= 0:
+        return ""
+    tokenizer = _load_tokenizer(settings.PROMPT_TOKENIZER)
+    if tokenizer is None:
+        return text[: max_tokens * CHARS_PER_TOKEN]
+    token_ids = tokenizer.encode(text, add_special_tokens=False)
+    return tokenizer.decode(token_ids[:max_tokens])
+
+
+def format_history_message(message: Dict[str, Any]) -> Optional[str]:
+    """One chat turn as a prompt line"""
+    role = message.get("role")
+    if role == "user":
+        return f"User: {message.get('content', '')}"
+    if role == "assistant":
+        return f"Assistant: {message.get('content', '')}"
+    return None
+
+
+def format_context_chunk(chunk: Dict[str, Any], content: str) -> str:
+    """One retrieved chunk as a prompt block"""
+    url = chunk["metadata"].get("url", "Unknown URL")
+    return f"Source: {url}\nContent: {content}"
+
+
+class PromptUsecase:
+    """
+    Usecase for assembling the RAG prompt within a token budget
+    The instructions and query are always kept. Of the remaining
+    PROMPT_MAX_TOKENS, history gets up to PROMPT_HISTORY_SHARE (newest turns
+    first, oldest dropped) and context gets the rest, filled in rank order;
+    the first chunk that does not fit is truncated if at least
+    PROMPT_MIN_CHUNK_TOKENS remain, and it and every lower-ranked chunk are
+    dropped otherwise. A session summary, if any, leads the history section.
+    """
+
+    def build(
+        self,
+        query: str,
+        chunks: List[Dict[str, Any]],
+        chat_history: Optional[List[Dict[str, Any]]] = None,
+        summary: str = "",
+    ) -> Dict[str, Any]:
+        """
+        Build the prompt for a query
+
+        Args:
+            query: User query
+            chunks: Selected chunks with "content" and "metadata", best first
+            chat_history: Previous messages, oldest first
+            summary: Running summary of turns before chat_history
+
+        Returns:
+            {"prompt", "chunks" (kept chunks, content possibly truncated),
+            "usage" (token counts per section and what was dropped)}
+        """
+        chat_history = chat_history or []
+        separator_tokens = count_tokens(CONTEXT_SEPARATOR)
+
+        instruction_tokens = count_tokens(
+            RAG_PROMPT.format(chat_history="", context="", query="")
+        ) + count_tokens(query)
+        available = max(settings.PROMPT_MAX_TOKENS - instruction_tokens, 0)
+
+        # History: the summary, then newest turns first until its share is used
+        history_budget = int(available * settings.PROMPT_HISTORY_SHARE)
+        history_lines: List[str] = []
+        history_tokens = 0
+        summary_line = None
+        if summary:
+            summary_line = f"Summary of earlier conversation: {summary}"
+            if count_tokens(summary_line) + 1 > history_budget:
+                summary_line = truncate_to_tokens(summary_line, history_budget - 1)
+            if summary_line:
+                history_tokens = count_tokens(summary_line) + 1
+        for message in reversed(chat_history):
+            line = format_history_message(message)
+            if line is None:
+                continue
+            tokens = count_tokens(line) + 1  # newline
+            if history_tokens + tokens > history_budget:
+                break
+            history_lines.append(line)
+            history_tokens += tokens
+        history_lines.reverse()
+        history_message_count = len(history_lines)
+        if summary_line:
+            history_lines.insert(0, summary_line)
+
+        # Context: highest-ranked chunks first, with whatever history left
+        context_budget = available - history_tokens
+        context_blocks: List[str] = []
+        kept_chunks: List[Dict[str, Any]] = []
+        context_tokens = 0
+        truncated = 0
+        for chunk in chunks:
+            block = format_context_chunk(chunk, chunk["content"])
+            tokens = count_tokens(block) + (separator_tokens if context_blocks else 0)
+            if context_tokens + tokens <= context_budget:
+                context_blocks.append(block)
+                kept_chunks.append(chunk)
+                context_tokens += tokens
+                continue
+
+            remaining = context_budget - context_tokens
+            overhead = tokens - count_tokens(chunk["content"])
+            if remaining - overhead >= settings.PROMPT_MIN_CHUNK_TOKENS:
+                content = truncate_to_tokens(chunk["content"], remaining - overhead)
+                context_blocks.append(format_context_chunk(chunk, content))
+                kept_chunks.append({**chunk, "content": content})
+                context_tokens += overhead + count_tokens(content)
+                truncated = 1
+            break
+
+        prompt = RAG_PROMPT.format(
+            chat_history="\n".join(history_lines),
+            context=CONTEXT_SEPARATOR.join(context_blocks),
+            query=query,
+        )
+        usage = {
+            "prompt_tokens": instruction_tokens + history_tokens + context_tokens,
+            "budget_tokens": settings.PROMPT_MAX_TOKENS,
+            "instruction_tokens": instruction_tokens,
+            "history_tokens": history_tokens,
+            "context_tokens": context_tokens,
+            "history_messages": history_message_count,
+            "history_messages_dropped": len(chat_history) - history_message_count,
+            "history_summarized": bool(summary_line),
+            "chunks": len(kept_chunks),
+            "chunks_truncated": truncated,
+            "chunks_dropped": len(chunks) - len(kept_chunks),
+        }
+        if usage["chunks_dropped"] or usage["history_messages_dropped"]:
+            print(
+                f"Prompt budget dropped {usage['chunks_dropped']} chunks and "
+                f"{usage['history_messages_dropped']} history messages"
+            )
+        return {"prompt": prompt, "chunks": kept_chunks, "usage": usage}
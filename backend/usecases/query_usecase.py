@@ -1,141 +1,472 @@
-from typing import Optional
+import asyncio
+import copy
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from fastapi import Depends
 
-from backend.prompts.llm_prompt import RAG_PROMPT
+from backend.config.settings import settings
+from backend.models.schemas.query_schema import QueryFilters
 from backend.repositories.chunk_repository import ChunkRepository
+from backend.services.answer_cache_service import answer_cache, get_ingest_epoch
+from backend.services.background_service import background_service
+from backend.services.metrics_service import metrics_service
 from backend.usecases.chat_session_usecase import ChatSessionUsecase
-from backend.usecases.embedding_usecase import EmbeddingUsecase
 from backend.usecases.groq_usecase import GroqUsecase
-from backend.usecases.vectordb_usecase import VectorDBUsecase
+from backend.usecases.prompt_usecase import PromptUsecase
+from backend.usecases.rerank_usecase import RerankUsecase
+from backend.usecases.retrieval_usecase import RetrievalUsecase, build_filter
+from backend.usecases.selection_usecase import SelectionUsecase
+from backend.usecases.session_summary_usecase import SessionSummaryUsecase
+
+# Coalescing key -> pipeline run shared by identical stateless queries
+_in_flight: Dict[str, asyncio.Task] = {}
+_coalescing = {"leaders": 0, "followers": 0}
+
+
+def answer_cache_scope(filters: Optional[QueryFilters], top_k: int) -> str:
+    """Key of the retrieval scope a cached answer is valid for"""
+    return json.dumps(
+        {
+            "filters": filters.model_dump(mode="json") if filters else None,
+            "top_k": top_k,
+        },
+        sort_keys=True,
+    )
+
+
+def coalescing_key(request: str, top_k: int, filters: Optional[QueryFilters]) -> str:
+    """Key under which identical stateless queries share one pipeline run"""
+    return json.dumps(
+        {
+            "query": " ".join(request.lower().split()),
+            "scope": answer_cache_scope(filters, top_k),
+        },
+        sort_keys=True,
+    )
+
+
+def coalescing_stats() -> Dict[str, Any]:
+    """Get shared pipeline runs and the requests that joined one"""
+    return {**_coalescing, "in_flight": len(_in_flight)}
+
+
+metrics_service.register("query_coalescing", coalescing_stats)
+
+
+def cite_sources(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Source citations (with a content preview) for chunks used in an answer
+    "score" stays the cosine similarity whatever ranked the chunk (None for
+    BM25-only hybrid hits); the fused and rerank scores are added next to it.
+    """
+    sources = []
+    for chunk in chunks:
+        reranked = "retrieval_score" in chunk
+        retrieval_score = chunk["retrieval_score"] if reranked else chunk["score"]
+        source = {
+            "chunk_id": chunk["id"],
+            "url": chunk["metadata"].get("url", "Unknown URL"),
+            "content": (
+                chunk["content"][:200] + "..."
+                if len(chunk["content"]) > 200
+                else chunk["content"]
+            ),
+            "score": retrieval_score,
+            "metadata": chunk["metadata"],
+        }
+        if settings.HYBRID_SEARCH_ENABLED:
+            source["score"] = chunk.get("vector_score")
+            source["rrf_score"] = retrieval_score
+        if reranked:
+            source["rerank_score"] = chunk["score"]
+        sources.append(source)
+    return sources
 
 
 class QueryUsecase:
     def __init__(
         self,
-        embedding_usecase: EmbeddingUsecase = Depends(EmbeddingUsecase),
-        vectordb_usecase: VectorDBUsecase = Depends(VectorDBUsecase),
+        retrieval_usecase: RetrievalUsecase = Depends(RetrievalUsecase),
         chunk_repository: ChunkRepository = Depends(ChunkRepository),
         groq_usecase: GroqUsecase = Depends(GroqUsecase),
         chat_session_usecase: ChatSessionUsecase = Depends(ChatSessionUsecase),
+        rerank_usecase: RerankUsecase = Depends(RerankUsecase),
+        selection_usecase: SelectionUsecase = Depends(SelectionUsecase),
+        prompt_usecase: PromptUsecase = Depends(PromptUsecase),
+        session_summary_usecase: SessionSummaryUsecase = Depends(SessionSummaryUsecase),
     ):
-        self.embedding_usecase = embedding_usecase
-        self.vectordb_usecase = vectordb_usecase
+        self.retrieval_usecase = retrieval_usecase
         self.chunk_repository = chunk_repository
         self.groq_usecase = groq_usecase
         self.chat_session_usecase = chat_session_usecase
+        self.rerank_usecase = rerank_usecase
+        self.selection_usecase = selection_usecase
+        self.prompt_usecase = prompt_usecase
+        self.session_summary_usecase = session_summary_usecase
 
-    async def query_documents(
-        self, request: str, session_id: Optional[str] = None, top_k: int = 5
-    ):
+    async def _load_session(
+        self, session_id: str, request: str
+    ) -> Tuple[Dict[str, Any], Optional[asyncio.Task]]:
+        """
+        Prepare the chat session branch of a query
+
+        Args:
+            session_id: Session identifier
+            request: User query to record
+
+        Returns:
+            (memory {"summary", "messages"} with messages oldest first,
+            task persisting the user message)
+        """
         try:
-            # Step 0 - Handle chat session (if session_id provided)
-            chat_history_text = ""
-            if session_id:
-                await self.chat_session_usecase.get_or_create_session(session_id)
-                await self.chat_session_usecase.add_user_message(session_id, request)
-
-                chat_history = await self.chat_session_usecase.get_chat_history(
-                    session_id, limit=10
-                )
+            await self.chat_session_usecase.get_or_create_session(session_id)
 
-                if len(chat_history) > 1:
-                    chat_history_text = (
-                        self.chat_session_usecase.format_chat_history_for_llm(
-                            chat_history[:-1]
-                        )
-                    )
-                    print(f"Using chat history: {len(chat_history) - 1} messages")
+            # History is read before the new message is added, so the
+            # message write is not needed until the answer is persisted
+            memory = await self.chat_session_usecase.get_memory(session_id)
+            user_message_task = background_service.spawn(
+                self.chat_session_usecase.add_user_message(session_id, request),
+                name=f"user_message:{session_id}",
+            )
+        except Exception as e:
+            print(f"❌ Error loading chat session: {str(e)}")
+            return {"summary": "", "messages": []}, None
 
-            # Step 1 - Generate embedding for user query
-            print(f"🔍 Processing query: {request}")
-            query_embedding = await self.embedding_usecase.generate_single_embedding(
-                request
+        if memory["messages"] or memory["summary"]:
+            print(
+                f"Using chat history: {len(memory['messages'])} messages"
+                + (" and summary" if memory["summary"] else "")
             )
+        return memory, user_message_task
+
+    async def _persist_answer(
+        self,
+        session_id: str,
+        user_message_task: Optional[asyncio.Task],
+        answer: str,
+        sources: List[Dict[str, Any]],
+    ):
+        """Save the assistant message once the user message is stored"""
+        if user_message_task is not None:
+            await asyncio.wait([user_message_task])
+        await self.chat_session_usecase.add_assistant_message(
+            session_id, answer, sources
+        )
+
+        # Fold older turns into the running summary once they grow too long
+        await self.session_summary_usecase.refresh(session_id)
 
-            if not query_embedding:
-                return {
+    def _candidate_counts(self, top_k: int) -> Tuple[int, int]:
+        """(chunks kept for selection, matches fetched from search)"""
+        # Over-fetch candidates for MMR selection and the reranker
+        select_k = (
+            top_k * settings.MMR_FETCH_MULTIPLIER if settings.MMR_ENABLED else top_k
+        )
+        fetch_k = (
+            max(select_k, settings.RERANK_CANDIDATES)
+            if settings.RERANK_ENABLED
+            else select_k
+        )
+        return select_k, fetch_k
+
+    async def _rank_chunks(
+        self,
+        request: str,
+        similar_chunks: List[Dict[str, Any]],
+        hydrated: Dict[str, Dict[str, Any]],
+        top_k: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rerank and select hydrated search matches
+
+        Args:
+            request: User query
+            similar_chunks: Search matches with "id" and "score", best first
+            hydrated: Chunk id -> hydrated chunk
+            top_k: Number of chunks for the prompt
+
+        Returns:
+            Selected chunks in selection order
+        """
+        retrieved_chunks = [
+            {
+                **hydrated[chunk["id"]],
+                **{
+                    key: chunk[key]
+                    for key in ("vector_score", "values")
+                    if key in chunk
+                },
+                "score": chunk["score"],
+            }
+            for chunk in similar_chunks
+            if chunk["id"] in hydrated and hydrated[chunk["id"]]["content"] is not None
+        ]
+
+        # Rerank candidates, then drop weak and redundant hits
+        if settings.RERANK_ENABLED:
+            select_k, _ = self._candidate_counts(top_k)
+            retrieved_chunks = await self.rerank_usecase.rerank(
+                request, retrieved_chunks, select_k
+            )
+        return await self.selection_usecase.select(retrieved_chunks, top_k)
+
+    async def _retrieve_chunks(
+        self,
+        request: str,
+        top_k: int,
+        filters: Optional[QueryFilters],
+        query_embedding: Optional[List[float]] = None,
+    ) -> Tuple[List[float], int, List[Dict[str, Any]]]:
+        """
+        Retrieval branch of a query: search, hydrate, rerank and select
+
+        Args:
+            request: User query
+            top_k: Number of chunks for the prompt
+            filters: Optional scope filters
+            query_embedding: Query embedding if already computed
+
+        Returns:
+            (query embedding, number of search matches, selected chunks)
+        """
+        _, fetch_k = self._candidate_counts(top_k)
+        print(f"🔍 Searching for top {fetch_k} similar chunks...")
+        # MMR selection reuses the vector hits' stored vectors
+        query_embedding, similar_chunks = await self.retrieval_usecase.retrieve(
+            request,
+            top_k=fetch_k,
+            filter_dict=build_filter(filters),
+            query_embedding=query_embedding,
+            include_values=settings.MMR_ENABLED,
+        )
+        if not query_embedding or not similar_chunks:
+            return query_embedding, 0, []
+
+        print(f"Found {len(similar_chunks)} similar chunks")
+
+        # Retrieve chunk content from MongoDB in one round trip
+        with metrics_service.timer("query.hydration"):
+            hydrated = await self.chunk_repository.get_chunks(
+                [chunk["id"] for chunk in similar_chunks]
+            )
+        retrieved_chunks = await self._rank_chunks(
+            request,
+            similar_chunks,
+            {chunk["id"]: chunk for chunk in hydrated},
+            top_k,
+        )
+        return query_embedding, len(similar_chunks), retrieved_chunks
+
+    async def _prepare_answer(
+        self,
+        request: str,
+        session_id: Optional[str],
+        top_k: int,
+        filters: Optional[QueryFilters],
+    ) -> Dict[str, Any]:
+        """
+        Run every step of a query up to the LLM call
+
+        Args:
+            request: User query
+            session_id: Optional chat session identifier
+            top_k: Number of chunks for the prompt
+            filters: Optional scope filters
+
+        Returns:
+            {"response": ...} when no LLM call is needed (cache hit or
+            nothing retrieved), otherwise {"prompt", "usage", "sources",
+            "query_embedding", "cache_scope", "ingest_epoch",
+            "user_message_task"}
+        """
+        print(f"🔍 Processing query: {request}")
+
+        # Step 0 - Stateless paraphrases of recent queries reuse the cached answer
+        cache_scope, query_embedding, ingest_epoch = None, None, None
+        if settings.ANSWER_CACHE_ENABLED and not session_id:
+            cache_scope = answer_cache_scope(filters, top_k)
+            # Read before retrieval: a re-ingest from here on keeps the
+            # answer out of the cache
+            ingest_epoch, query_embedding = await asyncio.gather(
+                get_ingest_epoch(), self.retrieval_usecase.embed_query(request)
+            )
+            cached = (
+                await answer_cache.get(query_embedding, cache_scope)
+                if query_embedding
+                else None
+            )
+            if cached:
+                return {"response": {**cached, "query": request}}
+
+        # Step 1 - Session bookkeeping runs alongside retrieval; only the
+        # prompt needs both. The session task is tracked so it still
+        # finishes if retrieval fails or returns early.
+        session_task = None
+        if session_id:
+            session_task = background_service.spawn(
+                self._load_session(session_id, request),
+                name=f"session:{session_id}",
+            )
+
+        # Step 2 - Embed (unless the cache lookup did), search, hydrate,
+        # rerank and select chunks
+        query_embedding, match_count, retrieved_chunks = await self._retrieve_chunks(
+            request, top_k, filters, query_embedding
+        )
+
+        if not query_embedding:
+            return {
+                "response": {
                     "answer": "Sorry, I couldn't process your query. Please try again.",
                     "sources": [],
                     "query": request,
                 }
+            }
 
-            # Step 2 - Search vector database for similar chunks
-            print(f"🔍 Searching for top {top_k} similar chunks...")
-            similar_chunks = await self.vectordb_usecase.search_similar(
-                query_embedding, top_k=top_k
-            )
-            print(f"Found {len(similar_chunks)} similar chunks")
-
-            if not similar_chunks:
-                return {
+        if not match_count:
+            return {
+                "response": {
                     "answer": "I couldn't find any relevant information for your query.",
                     "sources": [],
                     "query": request,
                 }
+            }
 
-            # Step 3 - Retrieve chunk content from MongoDB and build context
-            context_chunks = []
-            cited_sources = []
-
-            for chunk in similar_chunks:
-                chunk_content = await self.chunk_repository.get_chunk(chunk["id"])
-
-                if chunk_content:
-                    # Add to context for LLM
-                    context_chunks.append(
-                        {
-                            "content": chunk_content["content"],
-                            "url": chunk_content["metadata"].get("url", "Unknown URL"),
-                            "score": chunk["score"],
-                        }
-                    )
+        # Step 3 - Join the session branch
+        memory, user_message_task = {"summary": "", "messages": []}, None
+        if session_task is not None:
+            memory, user_message_task = await session_task
 
-                    # Add to cited sources
-                    cited_sources.append(
-                        {
-                            "chunk_id": chunk["id"],
-                            "url": chunk_content["metadata"].get("url", "Unknown URL"),
-                            "content": chunk_content["content"][:200] + "..."
-                            if len(chunk_content["content"]) > 200
-                            else chunk_content["content"],
-                            "score": chunk["score"],
-                            "metadata": chunk_content["metadata"],
-                        }
-                    )
+        # Step 4 - Fit context and chat history into the prompt token budget
+        # (on a thread: tokenizing long contexts is CPU-bound)
+        built = await asyncio.to_thread(
+            self.prompt_usecase.build,
+            request,
+            retrieved_chunks,
+            memory["messages"],
+            memory["summary"],
+        )
+        prompt = built["prompt"]
 
-            if not context_chunks:
-                return {
+        if not built["chunks"]:
+            return {
+                "response": {
                     "answer": "I found similar chunks but couldn't retrieve their content.",
                     "sources": [],
                     "query": request,
                 }
+            }
+
+        # Step 5 - Cite the chunks that made it into the prompt
+        cited_sources = cite_sources(built["chunks"])
 
-            # Step 4 - Build prompt with context, chat history, and query
-            context_text = "\n\n".join(
-                [
-                    f"Source: {chunk['url']}\nContent: {chunk['content']}"
-                    for chunk in context_chunks
-                ]
+        return {
+            "prompt": prompt,
+            "usage": built["usage"],
+            "sources": cited_sources,
+            "query_embedding": query_embedding,
+            "cache_scope": cache_scope,
+            "ingest_epoch": ingest_epoch,
+            "user_message_task": user_message_task,
+        }
+
+    def _finish_answer(
+        self, session_id: Optional[str], prepared: Dict[str, Any], answer: str
+    ):
+        """Persist a generated answer to the session and the answer cache"""
+        # Save assistant response to session after returning
+        if session_id:
+            background_service.spawn(
+                self._persist_answer(
+                    session_id,
+                    prepared["user_message_task"],
+                    answer,
+                    prepared["sources"],
+                ),
+                name=f"assistant_message:{session_id}",
             )
 
-            # Use the RAG prompt from the prompts file
-            prompt = RAG_PROMPT.format(
-                chat_history=chat_history_text, context=context_text, query=request
+        if prepared["cache_scope"] is not None:
+            background_service.spawn(
+                answer_cache.put(
+                    prepared["query_embedding"],
+                    prepared["cache_scope"],
+                    answer,
+                    prepared["sources"],
+                    prepared["ingest_epoch"],
+                ),
+                name="answer_cache",
             )
 
-            # Step 5 - Send to LLM for answer generation
+    async def query_documents(
+        self,
+        request: str,
+        session_id: Optional[str] = None,
+        top_k: int = 5,
+        filters: Optional[QueryFilters] = None,
+    ):
+        """
+        Answer a query, sharing one run between identical stateless queries
+
+        Args:
+            request: User query
+            session_id: Optional chat session identifier
+            top_k: Number of chunks to retrieve
+            filters: Optional scope filters
+
+        Returns:
+            {"answer", "sources", "query", "usage"}
+        """
+        if session_id or not settings.QUERY_COALESCING_ENABLED:
+            return await self._answer_query(request, session_id, top_k, filters)
+
+        key = coalescing_key(request, top_k, filters)
+        task = _in_flight.get(key)
+        if task is None:
+            # The run is a task of its own so a disconnecting caller does not
+            # cancel it for the requests that joined it
+            task = asyncio.create_task(
+                self._answer_query(request, None, top_k, filters),
+                name="coalesced_query",
+            )
+            _in_flight[key] = task
+            task.add_done_callback(lambda _: _in_flight.pop(key, None))
+            _coalescing["leaders"] += 1
+        else:
+            _coalescing["followers"] += 1
+
+        result = await asyncio.shield(task)
+        # Every caller gets its own copy: responses must not share sources
+        return {**copy.deepcopy(result), "query": request}
+
+    async def _answer_query(
+        self,
+        request: str,
+        session_id: Optional[str],
+        top_k: int,
+        filters: Optional[QueryFilters],
+    ):
+        try:
+            # Steps 0-5 - Retrieve context and build the prompt
+            prepared = await self._prepare_answer(request, session_id, top_k, filters)
+            if "response" in prepared:
+                return prepared["response"]
+
+            # Step 6 - Send to LLM for answer generation
             print("Generating response with LLM...")
-            llm_response = await self.groq_usecase.generate_response(prompt)
+            llm_response = await self.groq_usecase.generate_response(prepared["prompt"])
 
-            # Step 6 - Save assistant response to session
-            if session_id:
-                await self.chat_session_usecase.add_assistant_message(
-                    session_id, llm_response, cited_sources
-                )
+            # Step 7 - Save assistant response to session and answer cache
+            self._finish_answer(session_id, prepared, llm_response)
 
-            # Step 7 - Return answer with cited sources
-            return {"answer": llm_response, "sources": cited_sources, "query": request}
+            # Step 8 - Return answer with cited sources
+            return {
+                "answer": llm_response,
+                "sources": prepared["sources"],
+                "query": request,
+                "usage": prepared["usage"],
+            }
 
         except Exception as e:
             print(f"❌ Error in query processing: {str(e)}")
@@ -144,3 +475,199 @@ class QueryUsecase:
                 "sources": [],
                 "query": request,
             }
+
+    async def stream_query(
+        self,
+        request: str,
+        session_id: Optional[str] = None,
+        top_k: int = 5,
+        filters: Optional[QueryFilters] = None,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Answer a query as a stream of events
+
+        Yields ("sources", {"sources", "query"}) once retrieval is done, then
+        ("token", {"text"}) per LLM delta and finally ("done", {"answer", "usage"}),
+        or ("error", {"detail"}) if the query fails. The answer is saved to
+        the session only if the stream completes; a client disconnect closes
+        this generator, which stops the upstream LLM stream.
+
+        Args:
+            request: User query
+            session_id: Optional chat session identifier
+            top_k: Number of chunks for the prompt
+            filters: Optional scope filters
+        """
+        prepared = None
+        answer_parts: List[str] = []
+        completed = False
+        try:
+            prepared = await self._prepare_answer(request, session_id, top_k, filters)
+            if "response" in prepared:
+                response = prepared["response"]
+                yield "sources", {"sources": response["sources"], "query": request}
+                yield "token", {"text": response["answer"]}
+                yield "done", {"answer": response["answer"]}
+                return
+
+            yield "sources", {"sources": prepared["sources"], "query": request}
+
+            print("Streaming response from LLM...")
+            tokens = self.groq_usecase.stream_response(prepared["prompt"])
+            try:
+                async for token in tokens:
+                    answer_parts.append(token)
+                    yield "token", {"text": token}
+            finally:
+                # Stops the upstream request when the client goes away
+                await tokens.aclose()
+
+            completed = True
+            yield "done", {"answer": "".join(answer_parts), "usage": prepared["usage"]}
+
+        except Exception as e:
+            print(f"❌ Error in streaming query: {str(e)}")
+            yield "error", {
+                "detail": f"Sorry, I encountered an error while processing your query: {str(e)}"
+            }
+
+        finally:
+            if completed:
+                self._finish_answer(session_id, prepared, "".join(answer_parts))
+            elif prepared is not None and "prompt" in prepared:
+                print(f"⚠️ Stream ended early after {len(answer_parts)} tokens")
+
+    async def _batch_item(
+        self,
+        index: int,
+        request: str,
+        top_k: int,
+        similar_chunks: List[Dict[str, Any]],
+        hydrated: Dict[str, Dict[str, Any]],
+        retrieval_only: bool,
+        llm_semaphore: asyncio.Semaphore,
+    ) -> Dict[str, Any]:
+        """Rank, and unless retrieval_only answer, one query of a batch"""
+        result: Dict[str, Any] = {"index": index, "query": request}
+        try:
+            chunks = await self._rank_chunks(request, similar_chunks, hydrated, top_k)
+            if retrieval_only:
+                result["sources"] = cite_sources(chunks)
+                return result
+
+            built = await asyncio.to_thread(self.prompt_usecase.build, request, chunks)
+            if not built["chunks"]:
+                result["answer"] = (
+                    "I couldn't find any relevant information for your query."
+                )
+                result["sources"] = []
+                return result
+
+            async with llm_semaphore:
+                result["answer"] = await self.groq_usecase.generate_response(
+                    built["prompt"]
+                )
+            result["sources"] = cite_sources(built["chunks"])
+            result["usage"] = built["usage"]
+        except Exception as e:
+            print(f"❌ Error in batch query {index}: {str(e)}")
+            result["error"] = str(e)
+        return result
+
+    async def query_batch(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[QueryFilters] = None,
+        retrieval_only: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Answer many stateless queries, yielding results as they finish
+
+        All queries are embedded with one model call, searched concurrently
+        (at most QUERY_BATCH_SEARCH_CONCURRENCY at once) and hydrated with a
+        single lookup of their combined chunk ids. LLM calls run at most
+        QUERY_BATCH_LLM_CONCURRENCY at once per batch. Closing the generator
+        cancels the unfinished queries.
+
+        Args:
+            queries: User queries
+            top_k: Number of chunks per query
+            filters: Optional scope filters applied to every query
+            retrieval_only: Return the selected sources without calling the LLM
+
+        Yields:
+            {"index", "query", "sources"} plus "answer" and "usage" unless
+            retrieval_only, or "error" if the query failed; in completion order
+        """
+        print(f"🔍 Processing batch of {len(queries)} queries")
+        filter_dict = build_filter(filters)
+        _, fetch_k = self._candidate_counts(top_k)
+
+        # Step 1 - One embedding call for the whole batch
+        embeddings = await self.retrieval_usecase.embed_queries(queries)
+
+        # Step 2 - Concurrent searches
+        search_semaphore = asyncio.Semaphore(settings.QUERY_BATCH_SEARCH_CONCURRENCY)
+
+        async def search(request: str, embedding: List[float]):
+            if not embedding:
+                return []
+            async with search_semaphore:
+                _, matches = await self.retrieval_usecase.retrieve(
+                    request,
+                    top_k=fetch_k,
+                    filter_dict=filter_dict,
+                    query_embedding=embedding,
+                    include_values=settings.MMR_ENABLED,
+                )
+            return matches
+
+        searches = await asyncio.gather(
+            *[search(q, e) for q, e in zip(queries, embeddings)],
+            return_exceptions=True,
+        )
+
+        # Step 3 - Hydrate every distinct chunk once
+        chunk_ids = list(
+            dict.fromkeys(
+                match["id"]
+                for matches in searches
+                if not isinstance(matches, BaseException)
+                for match in matches
+            )
+        )
+        with metrics_service.timer("query.hydration"):
+            hydrated = {
+                chunk["id"]: chunk
+                for chunk in await self.chunk_repository.get_chunks(chunk_ids)
+            }
+        print(f"Hydrated {len(hydrated)} distinct chunks for {len(queries)} queries")
+
+        # Step 4 - Rank and answer each query, streaming results as they finish
+        llm_semaphore = asyncio.Semaphore(settings.QUERY_BATCH_LLM_CONCURRENCY)
+        tasks = []
+        for index, (request, matches) in enumerate(zip(queries, searches)):
+            if isinstance(matches, BaseException):
+                print(f"❌ Error searching batch query {index}: {str(matches)}")
+                matches = []
+            tasks.append(
+                asyncio.create_task(
+                    self._batch_item(
+                        index,
+                        request,
+                        top_k,
+                        matches,
+                        hydrated,
+                        retrieval_only,
+                        llm_semaphore,
+                    )
+                )
+            )
+
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,71 @@
+from typing import Optional
+
+from backend.config.settings import settings
+from backend.repositories.chunk_repository import ChunkRepository
+from backend.usecases.bm25_usecase import BM25Usecase
+from backend.usecases.vectordb_usecase import VectorDBUsecase
+
+
+class ReindexUsecase:
+    """
+    Usecase for rebuilding the vector index from embeddings stored in MongoDB
+    No embedding model is loaded; vectors come from the packed binaries
+    persisted next to each chunk. Rebuilt vectors and older BM25 jobs get
+    the scope filter fields (domain, url_prefixes, ingested_at), so this
+    also backfills data ingested before scoped queries existed.
+    """
+
+    def __init__(self):
+        self.chunk_repository = ChunkRepository()
+        self.vectordb_usecase = VectorDBUsecase()
+        self.bm25_usecase = BM25Usecase()
+
+    async def reindex(self, batch_size: int = 500, job_id: Optional[str] = None):
+        """
+        Upsert every stored embedding into the configured vector index
+
+        Args:
+            batch_size: Number of vectors per upsert
+            job_id: Optional job ID to restrict the rebuild to
+
+        Returns:
+            Dictionary with upserted, skipped, failed and bm25_backfilled
+            counts
+        """
+        upserted, skipped, failed = 0, 0, 0
+
+        async for batch in self.chunk_repository.iter_embeddings(batch_size, job_id):
+            # Vectors from another model or dimension cannot share the index
+            valid = []
+            for chunk in batch:
+                model = chunk.get("embedding_model")
+                if (model and model != settings.EMBEDDING_MODEL) or len(
+                    chunk["embedding"]
+                ) != settings.EMBEDDING_DIMENSION:
+                    skipped += 1
+                else:
+                    valid.append(chunk)
+
+            if not valid:
+                continue
+
+            if await self.vectordb_usecase.upsert_embeddings(valid):
+                upserted += len(valid)
+            else:
+                failed += len(valid)
+            print(
+                f"🔁 Reindexed {upserted} vectors ({skipped} skipped, {failed} failed)"
+            )
+
+        backfilled = await self.bm25_usecase.backfill_scope_metadata(job_id)
+
+        print(
+            f"✅ Reindex finished: {upserted} upserted, {skipped} skipped, {failed} failed"
+            f", {backfilled} BM25 jobs backfilled"
+        )
+        return {
+            "upserted": upserted,
+            "skipped": skipped,
+            "failed": failed,
+            "bm25_backfilled": backfilled,
+        }
@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from sentence_transformers import CrossEncoder
+
+from backend.config.settings import settings
+from backend.services.cache_service import LRUCache
+from backend.services.embedding_cache_service import EmbeddingCacheService
+from backend.services.metrics_service import metrics_service
+
+# (model, query hash, chunk_id) -> relevance score
+rerank_score_cache = LRUCache(settings.RERANK_CACHE_SIZE)
+metrics_service.register("rerank_score_cache", rerank_score_cache.stats)
+
+
+@lru_cache(maxsize=None)
+def _load_cross_encoder(model_name: str) -> CrossEncoder:
+    """Load a cross-encoder once per process"""
+    print(f"🧠 Loading cross-encoder {model_name}...")
+    model = CrossEncoder(model_name, max_length=512, device="cpu")
+    print("✅ Cross-encoder loaded successfully")
+    return model
+
+
+class RerankUsecase:
+    """
+    Usecase for reranking retrieved chunks with a cross-encoder
+    Scores every (query, chunk) pair in one batched call on a worker thread.
+    Scores are in 0-1 (sigmoid over the model's logit) and cached per
+    (query, chunk) pair.
+    """
+
+    def __init__(self):
+        self.model_name = settings.RERANK_MODEL
+
+    def _query_key(self, query: str) -> str:
+        normalized = EmbeddingCacheService.normalize(query)
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    def _predict(self, pairs: List[List[str]]) -> List[float]:
+        scores = _load_cross_encoder(self.model_name).predict(
+            pairs,
+            batch_size=settings.RERANK_BATCH_SIZE,
+            show_progress_bar=False,
+        )
+        return [float(score) for score in scores]
+
+    async def rerank(
+        self, query: str, chunks: List[Dict[str, Any]], top_k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Order chunks by cross-encoder relevance and keep the best top_k
+
+        Args:
+            query: User query
+            chunks: Candidate chunks with "id", "content" and "score"
+            top_k: Number of chunks to keep
+
+        Returns:
+            Best chunks first; "score" is the rerank score and the retrieval
+            score is kept as "retrieval_score"
+        """
+        if not chunks:
+            return []
+
+        query_key = self._query_key(query)
+        scores: Dict[str, float] = {}
+        uncached = []
+        for chunk in chunks:
+            cached = rerank_score_cache.get((self.model_name, query_key, chunk["id"]))
+            if cached is None:
+                uncached.append(chunk)
+            else:
+                scores[chunk["id"]] = cached
+
+        try:
+            if uncached:
+                with metrics_service.timer("rerank"):
+                    predicted = await asyncio.to_thread(
+                        self._predict,
+                        [[query, chunk["content"]] for chunk in uncached],
+                    )
+                for chunk, score in zip(uncached, predicted):
+                    scores[chunk["id"]] = score
+                    rerank_score_cache.put(
+                        (self.model_name, query_key, chunk["id"]), score
+                    )
+        except Exception as e:
+            # Fall back to retrieval order rather than failing the query
+            print(f"❌ Error reranking chunks: {str(e)}")
+            return chunks[:top_k]
+
+        reranked = [
+            {**chunk, "retrieval_score": chunk["score"], "score": scores[chunk["id"]]}
+            for chunk in chunks
+        ]
+        reranked.sort(key=lambda chunk: chunk["score"], reverse=True)
+        print(f"✅ Reranked {len(chunks)} chunks ({len(uncached)} scored)")
+        return reranked[:top_k]
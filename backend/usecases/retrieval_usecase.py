@@ -0,0 +1,196 @@
+import asyncio
+from datetime import timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Depends
+
+from backend.config.settings import settings
+from backend.models.schemas.query_schema import QueryFilters
+from backend.services.metrics_service import metrics_service
+from backend.services.vector_stores.base import url_domain, url_prefixes
+from backend.usecases.bm25_usecase import BM25Usecase
+from backend.usecases.embedding_usecase import EmbeddingUsecase
+from backend.usecases.vectordb_usecase import VectorDBUsecase
+
+# Scope fields are missing from data indexed before they existed
+_scope_warning_logged = False
+
+
+def build_filter(filters: Optional[QueryFilters]) -> Optional[Dict]:
+    """
+    Translate query scope filters to a Pinecone-style metadata filter
+
+    Args:
+        filters: Scope filters from the query request
+
+    Returns:
+        Filter dictionary, or None if no condition is set
+    """
+    if filters is None:
+        return None
+
+    global _scope_warning_logged
+    if not _scope_warning_logged and (
+        filters.url_prefix or filters.domains or filters.ingested_after
+    ):
+        _scope_warning_logged = True
+        print(
+            "⚠️ Scoped query: vectors and BM25 jobs indexed before scope filters "
+            "existed have no domain/url_prefixes/ingested_at and never match; "
+            "run `python reindex.py` once to backfill them"
+        )
+
+    filter_dict: Dict[str, Any] = {}
+    if filters.url_prefix:
+        # Prefixes match on path segment boundaries ("/docs" not "/docs-old")
+        prefixes = url_prefixes(filters.url_prefix)
+        if prefixes:
+            filter_dict["url_prefixes"] = {"$eq": prefixes[-1]}
+    if filters.domains:
+        domains = [url_domain(domain) for domain in filters.domains]
+        filter_dict["domain"] = {"$in": [domain for domain in domains if domain]}
+    if filters.job_ids:
+        filter_dict["job_id"] = {"$in": filters.job_ids}
+    if filters.ingested_after:
+        ingested_after = filters.ingested_after
+        if ingested_after.tzinfo is None:
+            ingested_after = ingested_after.replace(tzinfo=timezone.utc)
+        filter_dict["ingested_at"] = {"$gte": int(ingested_after.timestamp())}
+
+    return filter_dict or None
+
+
+def reciprocal_rank_fusion(
+    result_lists: Dict[str, List[Dict[str, Any]]], top_k: int, k: int = 60
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with reciprocal rank fusion
+
+    Args:
+        result_lists: Retriever name -> ranked matches
+        top_k: Number of fused results to return
+        k: RRF rank constant
+
+    Returns:
+        Matches ordered by fused score; "score" is the RRF score and each
+        retriever's own score is kept as "<name>_score" (and a vector hit's
+        "values" are kept too)
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    for name, results in result_lists.items():
+        for rank, match in enumerate(results, start=1):
+            entry = fused.get(match["id"])
+            if entry is None:
+                entry = {"id": match["id"], "score": 0.0, "metadata": match["metadata"]}
+                fused[match["id"]] = entry
+            entry["score"] += 1.0 / (k + rank)
+            entry[f"{name}_score"] = match["score"]
+            if "values" in match:
+                entry["values"] = match["values"]
+
+    return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[
+        :top_k
+    ]
+
+
+class RetrievalUsecase:
+    """
+    Usecase for finding the chunks relevant to a query
+    Vector search and, when HYBRID_SEARCH_ENABLED, BM25 run concurrently;
+    their rankings are merged with reciprocal rank fusion.
+    """
+
+    def __init__(
+        self,
+        embedding_usecase: EmbeddingUsecase = Depends(EmbeddingUsecase),
+        vectordb_usecase: VectorDBUsecase = Depends(VectorDBUsecase),
+        bm25_usecase: BM25Usecase = Depends(BM25Usecase),
+    ):
+        self.embedding_usecase = embedding_usecase
+        self.vectordb_usecase = vectordb_usecase
+        self.bm25_usecase = bm25_usecase
+
+    async def embed_query(self, query: str) -> List[float]:
+        """Embed a query (served from the query embedding cache when possible)"""
+        with metrics_service.timer("retrieval.embedding"):
+            return await self.embedding_usecase.generate_single_embedding(query)
+
+    async def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed many queries with one model call"""
+        with metrics_service.timer("retrieval.embedding"):
+            return await self.embedding_usecase.generate_query_embeddings(queries)
+
+    async def _vector_search(
+        self,
+        query: str,
+        top_k: int,
+        filter_dict: Optional[Dict],
+        query_embedding: Optional[List[float]] = None,
+        include_values: bool = False,
+    ) -> Tuple[List[float], List[Dict[str, Any]]]:
+        if query_embedding is None:
+            query_embedding = await self.embed_query(query)
+        if not query_embedding:
+            return [], []
+
+        with metrics_service.timer("retrieval.vector"):
+            matches = await self.vectordb_usecase.search_similar(
+                query_embedding,
+                top_k=top_k,
+                filter_dict=filter_dict,
+                include_values=include_values,
+            )
+        return query_embedding, matches
+
+    async def _bm25_search(
+        self, query: str, top_k: int, filter_dict: Optional[Dict]
+    ) -> List[Dict[str, Any]]:
+        with metrics_service.timer("retrieval.bm25"):
+            return await self.bm25_usecase.search(
+                query, top_k=top_k, filter_dict=filter_dict
+            )
+
+    async def retrieve(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_dict: Optional[Dict] = None,
+        query_embedding: Optional[List[float]] = None,
+        include_values: bool = False,
+    ) -> Tuple[List[float], List[Dict[str, Any]]]:
+        """
+        Retrieve the top matching chunks for a query
+
+        Args:
+            query: User query
+            top_k: Number of matches to return
+            filter_dict: Optional metadata filter
+            query_embedding: Precomputed query embedding (embedded here if
+                not given)
+            include_values: Keep vector hits' stored vectors as "values"
+
+        Returns:
+            (query embedding, matches); the embedding is empty if the query
+            could not be embedded
+        """
+        if not settings.HYBRID_SEARCH_ENABLED:
+            return await self._vector_search(
+                query, top_k, filter_dict, query_embedding, include_values
+            )
+
+        fetch_k = top_k * settings.HYBRID_FETCH_MULTIPLIER
+        (query_embedding, vector_matches), bm25_matches = await asyncio.gather(
+            self._vector_search(
+                query, fetch_k, filter_dict, query_embedding, include_values
+            ),
+            self._bm25_search(query, fetch_k, filter_dict),
+        )
+        if not query_embedding:
+            return [], []
+
+        matches = reciprocal_rank_fusion(
+            {"vector": vector_matches, "bm25": bm25_matches},
+            top_k,
+            k=settings.RRF_K,
+        )
+        return query_embedding, matches
@@ -0,0 +1,159 @@
+import base64
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Depends
+
+from backend.config.settings import settings
+from backend.models.schemas.query_schema import QueryFilters
+from backend.repositories.chunk_repository import ChunkRepository
+from backend.services.metrics_service import metrics_service
+from backend.usecases.retrieval_usecase import RetrievalUsecase, build_filter
+
+
+def _search_key(query: str, filters: Optional[QueryFilters], min_score) -> str:
+    """Short hash tying a cursor to the search it was issued for"""
+    scope = json.dumps(
+        {
+            "query": query,
+            "filters": filters.model_dump(mode="json") if filters else None,
+            "min_score": min_score,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha1(scope.encode("utf-8")).hexdigest()[:16]
+
+
+def _rank_key(match: Dict[str, Any]) -> Tuple[float, str]:
+    """Total order of matches: best score first, ties broken by id"""
+    return (-match["score"], match["id"])
+
+
+def encode_cursor(last: Dict[str, Any], key: str) -> str:
+    """Opaque cursor pointing after the last match of a page"""
+    data = json.dumps({"score": last["score"], "id": last["id"], "key": key})
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, key: str) -> Tuple[float, str]:
+    """
+    Rank key of the last match before the page a cursor points at
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another search
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        after = _rank_key({"score": float(data["score"]), "id": str(data["id"])})
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if data.get("key") != key:
+        raise ValueError("Cursor does not belong to this search")
+    return after
+
+
+def similarity(match: Dict[str, Any]) -> Optional[float]:
+    """Cosine similarity of a match (None for BM25-only hybrid matches)"""
+    if "vector_score" in match:
+        return match["vector_score"]
+    if settings.HYBRID_SEARCH_ENABLED:
+        return None
+    return match["score"]
+
+
+class SearchUsecase:
+    """
+    Usecase for retrieval without an answer
+    Runs the same embedding and (hybrid) search as /query, then hydrates only
+    the requested page in one lookup. Every page ranks the same
+    SEARCH_MAX_DEPTH matches (the query embedding is cached), because
+    HNSW and RRF results shift with the requested depth. Pages are addressed
+    by a keyset cursor, the (score, id) of the last match returned, and a
+    page starts strictly after it, so no state is kept between pages and no
+    match is repeated.
+    """
+
+    def __init__(
+        self,
+        retrieval_usecase: RetrievalUsecase = Depends(RetrievalUsecase),
+        chunk_repository: ChunkRepository = Depends(ChunkRepository),
+    ):
+        self.retrieval_usecase = retrieval_usecase
+        self.chunk_repository = chunk_repository
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        min_score: Optional[float] = None,
+        filters: Optional[QueryFilters] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Find the chunks most relevant to a query
+
+        Args:
+            query: Search text
+            top_k: Results per page
+            min_score: Drop matches with a lower cosine similarity (BM25-only
+                hybrid matches are dropped too when it is set)
+            filters: Optional scope filters
+            cursor: next_cursor of the previous page
+
+        Returns:
+            {"query", "results", "next_cursor"}; results are best first with
+            "score" from the ranking stage
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        key = _search_key(query, filters, min_score)
+        after = decode_cursor(cursor, key) if cursor else None
+
+        query_embedding, matches = await self.retrieval_usecase.retrieve(
+            query, top_k=settings.SEARCH_MAX_DEPTH, filter_dict=build_filter(filters)
+        )
+        if not query_embedding:
+            return {"query": query, "results": [], "next_cursor": None}
+
+        if min_score is not None:
+            matches = [
+                match
+                for match in matches
+                if (similarity(match) or float("-inf")) >= min_score
+            ]
+
+        matches.sort(key=_rank_key)
+        if after is not None:
+            matches = [match for match in matches if _rank_key(match) > after]
+        page = matches[:top_k]
+        has_more = len(matches) > top_k
+        next_cursor = encode_cursor(page[-1], key) if has_more else None
+
+        with metrics_service.timer("search.hydration"):
+            hydrated = {
+                chunk["id"]: chunk
+                for chunk in await self.chunk_repository.get_chunks(
+                    [match["id"] for match in page]
+                )
+            }
+
+        results: List[Dict[str, Any]] = []
+        for match in page:
+            chunk = hydrated.get(match["id"])
+            if chunk is None or chunk["content"] is None:
+                continue
+            results.append(
+                {
+                    "chunk_id": match["id"],
+                    "url": chunk["metadata"].get("url", "Unknown URL"),
+                    "content": chunk["content"],
+                    "score": match["score"],
+                    "vector_score": match.get("vector_score"),
+                    "bm25_score": match.get("bm25_score"),
+                    "metadata": chunk["metadata"],
+                }
+            )
+
+        return {"query": query, "results": results, "next_cursor": next_cursor}
@@ -0,0 +1,176 @@
+import asyncio
+from typing import Any, Dict, List
+
+import numpy as np
+from fastapi import Depends
+
+from backend.config.settings import settings
+from backend.repositories.chunk_repository import ChunkRepository
+from backend.services.metrics_service import metrics_service
+from backend.usecases.embedding_usecase import EmbeddingUsecase
+
+
+def cutoff_key(chunks: List[Dict[str, Any]]) -> str:
+    """
+    Score field the cutoff compares
+    Rerank scores once reranked, otherwise cosine similarity. Fused RRF
+    scores sit in a narrow band (1/(k + rank)), so a ratio of the best one
+    never drops anything.
+    """
+    if any("retrieval_score" in chunk for chunk in chunks):
+        return "score"
+    return "vector_score" if settings.HYBRID_SEARCH_ENABLED else "score"
+
+
+def score_cutoff(
+    chunks: List[Dict[str, Any]], ratio: float, key: str = "score"
+) -> List[Dict[str, Any]]:
+    """
+    Drop chunks whose key score is below ratio * the best one
+    Chunks without that score (BM25-only hits have no cosine) are kept.
+    """
+    scored = [chunk[key] for chunk in chunks if chunk.get(key) is not None]
+    if ratio <= 0 or not scored:
+        return chunks
+    best = max(scored)
+    if best <= 0:
+        return chunks
+    return [
+        chunk
+        for chunk in chunks
+        if chunk.get(key) is None or chunk[key] >= best * ratio
+    ]
+
+
+def maximal_marginal_relevance(
+    relevance: np.ndarray, embeddings: np.ndarray, k: int, lambda_mult: float
+) -> List[int]:
+    """
+    Greedy MMR selection
+
+    Args:
+        relevance: Relevance of each candidate, higher is better
+        embeddings: Unit-normalized candidate embeddings, one row each
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+
+    Returns:
+        Indices of the selected candidates in selection order
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    similarity = embeddings @ embeddings.T
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+    return selected
+
+
+class SelectionUsecase:
+    """
+    Usecase for choosing which retrieved chunks go into the prompt
+    Drops hits far below the best one (SCORE_CUTOFF_RATIO), then picks
+    top_k with maximal marginal relevance so near-copies from overlapping
+    chunks do not crowd out other content.
+    """
+
+    def __init__(
+        self,
+        chunk_repository: ChunkRepository = Depends(ChunkRepository),
+        embedding_usecase: EmbeddingUsecase = Depends(EmbeddingUsecase),
+    ):
+        self.chunk_repository = chunk_repository
+        self.embedding_usecase = embedding_usecase
+
+    async def _candidate_embeddings(self, chunks: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Candidate vectors, taken from the vector search hits ("values")
+        Only hits without one (BM25-only matches) are looked up in MongoDB,
+        and any still missing are encoded off the event loop.
+        """
+        stored = {
+            chunk["id"]: chunk["values"]
+            for chunk in chunks
+            if chunk.get("values") is not None
+        }
+        missing = [chunk["id"] for chunk in chunks if chunk["id"] not in stored]
+        if missing:
+            stored.update(await self.chunk_repository.get_embeddings(missing))
+
+        missing = [chunk for chunk in chunks if chunk["id"] not in stored]
+        if missing:
+            encoded = await asyncio.to_thread(
+                self.embedding_usecase.model.encode,
+                [chunk.get("content") or "" for chunk in missing],
+                batch_size=settings.EMBEDDING_BATCH_SIZE,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+            )
+            for chunk, embedding in zip(missing, encoded):
+                stored[chunk["id"]] = embedding
+
+        embeddings = np.zeros(
+            (len(chunks), settings.EMBEDDING_DIMENSION), dtype=np.float32
+        )
+        for i, chunk in enumerate(chunks):
+            if chunk["id"] in stored:
+                embeddings[i] = stored[chunk["id"]]
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.where(norms == 0, 1, norms)
+
+    async def select(
+        self, chunks: List[Dict[str, Any]], top_k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Select up to top_k chunks for the prompt
+
+        Args:
+            chunks: Hydrated candidates with "id", "content" and "score",
+                best first; "vector_score" and "values" come from the vector
+                hit and "retrieval_score" is set once reranked
+            top_k: Maximum number of chunks to keep
+
+        Returns:
+            Selected chunks in selection order
+        """
+        candidates = score_cutoff(
+            chunks, settings.SCORE_CUTOFF_RATIO, cutoff_key(chunks)
+        )
+        if len(candidates) < len(chunks):
+            print(f"Score cutoff dropped {len(chunks) - len(candidates)} chunks")
+
+        if not settings.MMR_ENABLED or len(candidates) <= 1:
+            return candidates[:top_k]
+
+        try:
+            with metrics_service.timer("selection.mmr"):
+                embeddings = await self._candidate_embeddings(candidates)
+
+                # Relevance from the ranking stage's own score, scaled to 0-1
+                scores = np.array([c["score"] for c in candidates], dtype=np.float32)
+                spread = scores.max() - scores.min()
+                relevance = (
+                    (scores - scores.min()) / spread
+                    if spread > 0
+                    else np.ones_like(scores)
+                )
+
+                order = maximal_marginal_relevance(
+                    relevance, embeddings, top_k, settings.MMR_LAMBDA
+                )
+            return [candidates[i] for i in order]
+        except Exception as e:
+            print(f"❌ Error in MMR selection: {str(e)}")
+            return candidates[:top_k]
@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Set
+
+from fastapi import Depends
+
+from backend.config.settings import settings
+from backend.prompts.llm_prompt import SUMMARY_PROMPT
+from backend.usecases.chat_session_usecase import ChatSessionUsecase
+from backend.usecases.groq_usecase import GroqUsecase
+from backend.usecases.prompt_usecase import (
+    count_tokens,
+    format_history_message,
+    truncate_to_tokens,
+)
+
+# Sessions with a refresh running in this process
+_refreshing: Set[str] = set()
+
+
+class SessionSummaryUsecase:
+    """
+    Usecase for the rolling summary of long chat sessions
+    After each answer, once the messages not covered by the summary (minus
+    the most recent SESSION_SUMMARY_KEEP_MESSAGES) pass
+    SESSION_SUMMARY_TRIGGER_TOKENS, they are folded into the summary with one
+    LLM call. Prompts then carry the summary plus a short tail of turns.
+    """
+
+    def __init__(
+        self,
+        chat_session_usecase: ChatSessionUsecase = Depends(ChatSessionUsecase),
+        groq_usecase: GroqUsecase = Depends(GroqUsecase),
+    ):
+        self.chat_session_usecase = chat_session_usecase
+        self.groq_usecase = groq_usecase
+
+    def _to_summarize(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Unsummarized messages that are old enough to fold in"""
+        keep = settings.SESSION_SUMMARY_KEEP_MESSAGES
+        return messages[:-keep] if keep > 0 else messages
+
+    async def refresh(self, session_id: str) -> bool:
+        """
+        Fold older turns into the summary if they pass the token threshold
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if the summary was updated
+        """
+        if settings.SESSION_MEMORY_MODE != "summary" or session_id in _refreshing:
+            return False
+
+        _refreshing.add(session_id)
+        try:
+            memory = await self.chat_session_usecase.get_memory(session_id)
+            older = self._to_summarize(memory["messages"])
+            lines = [line for line in map(format_history_message, older) if line]
+            if sum(map(count_tokens, lines)) < settings.SESSION_SUMMARY_TRIGGER_TOKENS:
+                return False
+
+            # The summary covers every message up to the last one folded in
+            summarized_count = older[-1]["seq"]
+
+            prompt = SUMMARY_PROMPT.format(
+                summary=memory["summary"] or "None yet.",
+                messages="\n".join(lines),
+                max_words=int(settings.SESSION_SUMMARY_MAX_TOKENS * 0.75),
+            )
+            summary = await self.groq_usecase.generate_response(prompt)
+            summary = truncate_to_tokens(
+                (summary or "").strip(), settings.SESSION_SUMMARY_MAX_TOKENS
+            )
+            if not summary:
+                return False
+
+            updated = await self.chat_session_usecase.update_summary(
+                session_id, summary, summarized_count, memory["summarized_count"]
+            )
+            if updated:
+                print(f"✅ Summarized {len(older)} messages of session {session_id}")
+            return updated
+
+        except Exception as e:
+            print(f"❌ Failed to refresh session summary: {str(e)}")
+            return False
+        finally:
+            _refreshing.discard(session_id)
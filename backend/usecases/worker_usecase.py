@@ -4,8 +4,8 @@ import json
 from backend.config.redis import redis_client
 from backend.config.settings import settings
 from backend.repositories.url_repository import UrlRepository
+from backend.services.answer_cache_service import bump_url_version
 from backend.usecases.chunking_usecase import ChunkingUsecase
-from backend.usecases.embedding_usecase import EmbeddingUsecase
 from backend.usecases.scraping_usecase import ScrapingUsecase
 from backend.usecases.vectordb_usecase import VectorDBUsecase
 
@@ -15,7 +15,6 @@ class WorkerUsecase:
         self.url_repository = UrlRepository()
         self.scraping_usecase = ScrapingUsecase()
         self.chunking_usecase = ChunkingUsecase()
-        self.embedding_usecase = EmbeddingUsecase()
         self.vectordb_usecase = VectorDBUsecase()
 
     async def worker_loop(self):
@@ -93,32 +92,28 @@ class WorkerUsecase:
                 await self.url_repository.update_job_status(job_id, "failed")
                 return
 
-            # Step 3 - Chunk scraped markdown content
-            print("[3] Chunking markdown content")
-            chunks = await self.chunking_usecase.chunk_markdown(
+            # Step 3 - Chunk and embed scraped markdown content; chunks are
+            # stored with their packed embeddings so the vector index can be
+            # rebuilt without re-running the model
+            print("[3] Chunking and embedding markdown content")
+            embedded_chunks = await self.chunking_usecase.chunk_markdown(
                 scraped_content, url, job_id
             )
 
-            if not chunks:
+            if not embedded_chunks:
                 print(f"⚠️ No chunks created for job {job_id}")
                 await self.url_repository.update_job_status(job_id, "failed")
                 return
 
-            print(f"✅ Created {len(chunks)} chunks")
-
-            # Step 4 - Generate embeddings
-            print("[4] Generating embeddings")
-            embedded_chunks = await self.embedding_usecase.generate_embeddings(chunks)
-
-            if not embedded_chunks:
+            if any(chunk.get("embedding") is None for chunk in embedded_chunks):
                 print(f"⚠️ No embeddings generated for job {job_id}")
                 await self.url_repository.update_job_status(job_id, "failed")
                 return
 
-            print(f"✅ Generated embeddings for {len(embedded_chunks)} chunks")
+            print(f"✅ Created and embedded {len(embedded_chunks)} chunks")
 
-            # Step 5 - Store in vector database
-            print("[5] Storing in vector database")
+            # Step 4 - Store in vector database
+            print("[4] Storing in vector database")
             success = await self.vectordb_usecase.upsert_embeddings(embedded_chunks)
 
             if not success:
@@ -130,8 +125,11 @@ class WorkerUsecase:
 
             print(f"✅ Stored {len(embedded_chunks)} embeddings in Pinecone")
 
-            # Step 6 - Update job status to "completed" in MongoDB
-            print(f"[6] Updating job {job_id} status to 'completed'")
+            # Cached answers citing this URL may be outdated now
+            await bump_url_version(url)
+
+            # Step 5 - Update job status to "completed" in MongoDB
+            print(f"[5] Updating job {job_id} status to 'completed'")
             result = await self.url_repository.update_job_status(job_id, "completed")
             if result:
                 print(f"✅ Job {job_id} completed successfully and status updated")
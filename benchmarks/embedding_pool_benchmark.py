@@ -0,0 +1,88 @@
+"""
+Embedding throughput benchmark: chunks/sec against number of pool processes
+
+Usage:
+    python benchmarks/embedding_pool_benchmark.py --chunks 4000 --processes 1 2 4 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sentence_transformers import SentenceTransformer
+
+from backend.config.settings import settings
+from backend.services.embedding_pool_service import EmbeddingPoolService
+
+WORDS = (
+    "vector search retrieval embedding chunk markdown header section pinecone "
+    "mongodb redis queue worker scrape firecrawl token prompt answer context "
+    "session history model latency throughput index query score metadata"
+).split()
+
+
+def make_chunks(count: int, size: int) -> list:
+    """Synthetic chunks of roughly `size` characters"""
+    rng = random.Random(42)
+    chunks = []
+    for _ in range(count):
+        words = []
+        while sum(len(w) + 1 for w in words) < size:
+            words.append(rng.choice(WORDS))
+        chunks.append(" ".join(words))
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding pool benchmark")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--output", default=None, help="Append results to this file")
+    args = parser.parse_args()
+
+    texts = make_chunks(args.chunks, args.chunk_size)
+    results = []
+
+    # Baseline: one in-process encode call with default threading
+    model = SentenceTransformer(settings.EMBEDDING_MODEL, device="cpu")
+    model.encode(texts[: args.batch_size], batch_size=args.batch_size)  # warm-up
+    start = time.perf_counter()
+    model.encode(texts, batch_size=args.batch_size, show_progress_bar=False)
+    elapsed = time.perf_counter() - start
+    results.append(("in-process", len(texts) / elapsed))
+    del model
+
+    for processes in args.processes:
+        pool = EmbeddingPoolService(processes)
+        try:
+            # Warm-up starts the workers and loads the model in each
+            pool.encode(texts[: processes * args.batch_size], args.batch_size)
+            start = time.perf_counter()
+            pool.encode(texts, args.batch_size)
+            elapsed = time.perf_counter() - start
+            results.append((f"pool x{processes}", len(texts) / elapsed))
+        finally:
+            pool.shutdown()
+
+    lines = [
+        f"Embedding benchmark: {args.chunks} chunks x ~{args.chunk_size} chars, "
+        f"model={settings.EMBEDDING_MODEL}, cores={os.cpu_count()}",
+        f"{'mode':<12} {'chunks/sec':>12}",
+    ]
+    lines += [f"{mode:<12} {rate:>12.1f}" for mode, rate in results]
+    report = "\n".join(lines)
+    print(report)
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(report + "\n\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Local vector store benchmark: recall@k and search latency against the exact
+flat index
+
+Usage:
+    python benchmarks/vector_store_benchmark.py --vectors 200000 --queries 200 --backends hnsw binary
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from backend.config.settings import settings
+from backend.services.vector_stores.flat_store import FlatVectorStore
+
+
+def make_store(backend: str, path: str):
+    if backend == "flat":
+        return FlatVectorStore(path)
+    if backend == "hnsw":
+        from backend.services.vector_stores.hnsw_store import HNSWVectorStore
+
+        return HNSWVectorStore(path)
+    if backend == "binary":
+        from backend.services.vector_stores.binary_store import (
+            BinaryQuantizedVectorStore,
+        )
+
+        return BinaryQuantizedVectorStore(path)
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def make_vectors(count: int, dimension: int, clusters: int, seed: int = 42):
+    """Clustered synthetic vectors, closer to real embeddings than uniform noise"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    assignment = rng.integers(0, clusters, count)
+    noise = rng.standard_normal((count, dimension)).astype(np.float32)
+    return centers[assignment] + 0.5 * noise
+
+
+async def load(store, vectors: np.ndarray, batch_size: int = 10000):
+    for start in range(0, len(vectors), batch_size):
+        await store.upsert_embeddings(
+            [
+                {"id": str(start + i), "embedding": vector, "metadata": {}}
+                for i, vector in enumerate(vectors[start : start + batch_size])
+            ]
+        )
+
+
+async def run_queries(store, queries: np.ndarray, top_k: int):
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        matches = await store.search_similar(query, top_k=top_k)
+        latencies.append(time.perf_counter() - start)
+        results.append([match["id"] for match in matches])
+    return results, np.array(latencies)
+
+
+def recall_at_k(reference, candidate) -> float:
+    hits = sum(len(set(r) & set(c)) for r, c in zip(reference, candidate))
+    total = sum(len(r) for r in reference)
+    return hits / total if total else 0.0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Vector store benchmark")
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--backends", nargs="+", default=["hnsw"])
+    args = parser.parse_args()
+
+    dimension = settings.EMBEDDING_DIMENSION
+    vectors = make_vectors(args.vectors, dimension, args.clusters)
+    # Queries are perturbed corpus vectors, like paraphrases of indexed text
+    rng = np.random.default_rng(7)
+    queries = vectors[rng.integers(0, len(vectors), args.queries)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        reference_store = make_store("flat", os.path.join(workdir, "flat"))
+        await load(reference_store, vectors)
+        reference, latencies = await run_queries(reference_store, queries, args.top_k)
+
+        lines = [
+            f"Vector store benchmark: {args.vectors} x {dimension}, "
+            f"{args.queries} queries, top_k={args.top_k}",
+            f"{'backend':<10} {'recall@k':>9} {'p50 ms':>8} {'p95 ms':>8}",
+            f"{'flat':<10} {1.0:>9.4f} {np.percentile(latencies, 50) * 1000:>8.3f} "
+            f"{np.percentile(latencies, 95) * 1000:>8.3f}",
+        ]
+
+        for backend in args.backends:
+            store = make_store(backend, os.path.join(workdir, backend))
+            await load(store, vectors)
+            results, latencies = await run_queries(store, queries, args.top_k)
+            lines.append(
+                f"{backend:<10} {recall_at_k(reference, results):>9.4f} "
+                f"{np.percentile(latencies, 50) * 1000:>8.3f} "
+                f"{np.percentile(latencies, 95) * 1000:>8.3f}"
+            )
+
+    print("\n".join(lines))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "backend"))
+
+from backend.config.database import mongodb_database
+from backend.config.settings import settings
+from backend.usecases.reindex_usecase import ReindexUsecase
+
+
+async def main(batch_size: int, job_id: str = None):
+    print("🚀 Rebuilding vector index from MongoDB embeddings")
+    print(f"Source: {settings.MONGODB_DB_NAME} / model: {settings.EMBEDDING_MODEL}")
+
+    mongodb_database.connect()
+    try:
+        await ReindexUsecase().reindex(batch_size=batch_size, job_id=job_id)
+    finally:
+        mongodb_database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rebuild the vector index from embeddings stored in MongoDB"
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--job-id", default=None, help="Only reindex one job")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.batch_size, args.job_id))
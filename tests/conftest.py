@@ -0,0 +1,12 @@
+import os
+import sys
+
+# Settings require these; tests never reach the real services
+for name in ("REDIS_URL", "FIRECRAWL_API_KEY", "PINECONE_API_KEY", "GROQ_API_KEY"):
+    os.environ.setdefault(
+        name, "redis://localhost:6379" if name == "REDIS_URL" else "test"
+    )
+# Token counts are estimated unless a test loads a tokenizer itself
+os.environ.setdefault("PROMPT_TOKENIZER", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
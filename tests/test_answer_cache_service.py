@@ -0,0 +1,74 @@
+import asyncio
+
+import fakeredis
+import numpy as np
+import pytest
+
+from backend.config.redis import redis_client
+from backend.config.settings import settings
+from backend.services import answer_cache_service
+from backend.services.answer_cache_service import SemanticAnswerCache
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 4)
+    monkeypatch.setattr(
+        redis_client,
+        "async_redis_client",
+        fakeredis.FakeAsyncRedis(decode_responses=True),
+    )
+
+
+SOURCES = [{"url": "https://example.com/a", "chunk_id": "c1"}]
+
+
+def test_paraphrase_hits_until_source_is_reingested():
+    async def run():
+        cache = SemanticAnswerCache(max_size=4, threshold=0.95, ttl=60)
+        epoch = await answer_cache_service.get_ingest_epoch()
+        await cache.put([1.0, 0.0, 0.0, 0.0], "scope", "answer", SOURCES, epoch)
+
+        hit = await cache.get([0.99, 0.05, 0.0, 0.0], "scope")
+        assert hit == {"answer": "answer", "sources": SOURCES}
+        assert await cache.get([1.0, 0.0, 0.0, 0.0], "other-scope") is None
+        assert await cache.get([0.0, 1.0, 0.0, 0.0], "scope") is None
+
+        await answer_cache_service.bump_url_version("https://example.com/a")
+        assert await cache.get([1.0, 0.0, 0.0, 0.0], "scope") is None
+        return cache.stats()
+
+    stats = asyncio.run(run())
+    assert stats["hits"] == 1 and stats["misses"] == 3 and stats["stale"] == 1
+    assert stats["size"] == 0
+
+
+def test_concurrent_hits_are_all_counted():
+    async def run():
+        cache = SemanticAnswerCache(max_size=2, threshold=0.9, ttl=60)
+        await cache.put(np.ones(4), "scope", "answer", SOURCES, "0")
+        results = await asyncio.gather(
+            *[cache.get(np.ones(4), "scope") for _ in range(50)]
+        )
+        return cache, results
+
+    cache, results = asyncio.run(run())
+    assert all(results) and cache.hits == 50
+
+
+def test_answer_is_not_cached_if_sources_are_reingested_while_generating():
+    async def run():
+        cache = SemanticAnswerCache(max_size=4, threshold=0.95, ttl=60)
+        # Query reads the epoch, then retrieves the old chunks...
+        epoch = await answer_cache_service.get_ingest_epoch()
+        # ...the worker re-ingests the source while the LLM is generating...
+        await answer_cache_service.bump_url_version("https://example.com/a")
+        # ...and the answer built from the old chunks must not look current
+        await cache.put([1.0, 0.0, 0.0, 0.0], "scope", "stale answer", SOURCES, epoch)
+        assert await cache.get([1.0, 0.0, 0.0, 0.0], "scope") is None
+
+        epoch = await answer_cache_service.get_ingest_epoch()
+        await cache.put([1.0, 0.0, 0.0, 0.0], "scope", "fresh answer", SOURCES, epoch)
+        return await cache.get([1.0, 0.0, 0.0, 0.0], "scope")
+
+    assert asyncio.run(run())["answer"] == "fresh answer"
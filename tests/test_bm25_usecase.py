@@ -0,0 +1,203 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.config.settings import settings
+from backend.usecases.bm25_usecase import BM25Usecase, tokenize
+
+
+class FakeBM25Repository:
+    def __init__(self):
+        self.jobs = {}
+        self.fetched_jobs = []
+
+    async def add_job_index(self, job_id, url, chunk_ids, lengths, postings, metadata):
+        self.jobs[job_id] = {
+            "url": url,
+            "chunk_ids": chunk_ids,
+            "lengths": np.asarray(lengths, dtype="<u4"),
+            "postings": {
+                term: np.asarray(entries, dtype="<u4")
+                for term, entries in postings.items()
+            },
+        }
+        return True
+
+    async def delete_previous_jobs(self, url, job_id):
+        previous = [
+            j for j, job in self.jobs.items() if job["url"] == url and j != job_id
+        ]
+        for previous_job_id in previous:
+            del self.jobs[previous_job_id]
+        return len(previous)
+
+    async def get_stats(self):
+        return {
+            "document_count": sum(len(j["chunk_ids"]) for j in self.jobs.values()),
+            "total_length": int(sum(j["lengths"].sum() for j in self.jobs.values())),
+        }
+
+    async def get_block_headers(self, terms):
+        headers = []
+        for job_id, job in self.jobs.items():
+            for term in terms:
+                entries = job["postings"].get(term)
+                if entries is not None:
+                    headers.append(
+                        {
+                            "term": term,
+                            "job_id": job_id,
+                            "count": len(entries),
+                            "max_tf": int(entries[:, 1].max()),
+                            "min_length": int(job["lengths"][entries[:, 0]].min()),
+                        }
+                    )
+        return headers
+
+    async def get_postings(self, terms, job_ids):
+        self.fetched_jobs.extend(job_ids)
+        postings = {}
+        for job_id in job_ids:
+            for term in terms:
+                entries = self.jobs[job_id]["postings"].get(term)
+                if entries is not None:
+                    postings.setdefault(term, []).append((job_id, entries))
+        return postings
+
+    async def get_job_ids(self, filter_dict):
+        return [j for j, job in self.jobs.items() if job["url"] == filter_dict["url"]]
+
+    async def get_documents(self, job_ids, filter_dict=None):
+        return {
+            job_id: self.jobs[job_id]
+            for job_id in job_ids
+            if not filter_dict or self.jobs[job_id]["url"] == filter_dict.get("url")
+        }
+
+
+def build_index(jobs=40, chunks=10, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"term{i}" for i in range(30)]
+    usecase = BM25Usecase()
+    usecase.bm25_repository = FakeBM25Repository()
+
+    async def run():
+        for j in range(jobs):
+            documents = [
+                {
+                    "id": f"job{j}-chunk{c}",
+                    "content": " ".join(rng.choice(vocabulary, rng.integers(5, 40))),
+                }
+                for c in range(chunks)
+            ]
+            await usecase.index_chunks(documents, f"https://site/{j}", f"job{j}")
+
+    asyncio.run(run())
+    return usecase
+
+
+def test_tokenize_keeps_compounds_and_parts():
+    assert tokenize("The rate-limit of v2.1 is") == [
+        "rate-limit",
+        "rate",
+        "limit",
+        "v2.1",
+        "v2",
+        "1",
+    ]
+
+
+def test_pruned_search_matches_exhaustive_scoring(monkeypatch):
+    usecase = build_index()
+    filler = " ".join(f"term{i}" for i in range(30))
+
+    async def add_jobs():
+        # A few jobs about the query, many that mention it once in passing
+        for j in range(4):
+            await usecase.index_chunks(
+                [{"id": f"hit{j}", "content": "alpha beta " * (j + 2)}],
+                f"https://hits/{j}",
+                f"hit-job{j}",
+            )
+        for j in range(40):
+            await usecase.index_chunks(
+                [{"id": f"passing{j}", "content": f"alpha {filler}"}],
+                f"https://passing/{j}",
+                f"passing-job{j}",
+            )
+
+    asyncio.run(add_jobs())
+    query = "alpha beta term3"
+
+    monkeypatch.setattr(settings, "BM25_JOB_BATCH_SIZE", 1000)
+    exhaustive = asyncio.run(usecase.search(query, top_k=3))
+
+    monkeypatch.setattr(settings, "BM25_JOB_BATCH_SIZE", 2)
+    usecase.bm25_repository.fetched_jobs = []
+    pruned = asyncio.run(usecase.search(query, top_k=3))
+
+    assert [r["id"] for r in pruned] == [r["id"] for r in exhaustive]
+    assert [r["score"] for r in pruned] == pytest.approx(
+        [r["score"] for r in exhaustive]
+    )
+    assert len(usecase.bm25_repository.fetched_jobs) < 10
+
+
+def test_max_scored_jobs_caps_work(monkeypatch):
+    usecase = build_index()
+    monkeypatch.setattr(settings, "BM25_JOB_BATCH_SIZE", 1)
+    monkeypatch.setattr(settings, "BM25_MAX_SCORED_JOBS", 3)
+    usecase.bm25_repository.fetched_jobs = []
+    assert asyncio.run(usecase.search("term1", top_k=50))
+    assert len(usecase.bm25_repository.fetched_jobs) <= 3
+
+
+def test_reingest_replaces_earlier_job():
+    usecase = BM25Usecase()
+    usecase.bm25_repository = FakeBM25Repository()
+
+    async def run():
+        await usecase.index_chunks(
+            [{"id": "old", "content": "pinecone index"}], "https://a", "job-1"
+        )
+        await usecase.index_chunks(
+            [{"id": "new", "content": "pinecone index"}], "https://a", "job-2"
+        )
+        return await usecase.search("pinecone", top_k=5)
+
+    assert [r["id"] for r in asyncio.run(run())] == ["new"]
+
+
+def test_filter_is_applied_per_job():
+    usecase = build_index(jobs=5)
+    results = asyncio.run(
+        usecase.search("term1 term2", top_k=50, filter_dict={"url": "https://site/3"})
+    )
+    assert results and all(r["metadata"]["job_id"] == "job3" for r in results)
+
+
+def test_filter_is_applied_before_max_scored_jobs_cap(monkeypatch):
+    usecase = BM25Usecase()
+    usecase.bm25_repository = FakeBM25Repository()
+
+    async def run():
+        # Out-of-scope jobs outrank the in-scope one on every bound
+        for j in range(10):
+            await usecase.index_chunks(
+                [{"id": f"other{j}", "content": "pinecone " * 20}],
+                f"https://other/{j}",
+                f"other-job{j}",
+            )
+        await usecase.index_chunks(
+            [{"id": "scoped", "content": "pinecone index setup guide"}],
+            "https://scoped",
+            "scoped-job",
+        )
+        return await usecase.search(
+            "pinecone", top_k=5, filter_dict={"url": "https://scoped"}
+        )
+
+    monkeypatch.setattr(settings, "BM25_MAX_SCORED_JOBS", 3)
+    assert [r["id"] for r in asyncio.run(run())] == ["scoped"]
+    assert usecase.bm25_repository.fetched_jobs == ["scoped-job"]
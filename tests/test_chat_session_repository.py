@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from backend.repositories.chat_session_repository import ChatSessionRepository
+from backend.services.index_service import index_specs, obsolete_indexes
+
+
+def matches(document, query):
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if "$lt" in condition and not value < condition["$lt"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeResult:
+    def __init__(self, deleted_count):
+        self.deleted_count = deleted_count
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def limit(self, limit):
+        return FakeCursor(self.documents[:limit])
+
+    def __aiter__(self):
+        async def iterate():
+            for document in self.documents:
+                yield document
+
+        return iterate()
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        return FakeCursor([d for d in self.documents if matches(d, query)])
+
+    async def delete_one(self, query):
+        for document in self.documents:
+            if matches(document, query):
+                self.documents.remove(document)
+                return FakeResult(1)
+        return FakeResult(0)
+
+    async def delete_many(self, query):
+        before = len(self.documents)
+        self.documents[:] = [d for d in self.documents if not matches(d, query)]
+        return FakeResult(before - len(self.documents))
+
+
+def test_idle_sessions_are_deleted_with_their_messages_only():
+    now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    old = now - timedelta(days=40)
+    sessions = FakeCollection(
+        [
+            {"session_id": "idle", "updated_at": old},
+            {"session_id": "active", "updated_at": now},
+        ]
+    )
+    messages = FakeCollection(
+        [
+            {"session_id": "idle", "seq": 0, "timestamp": old},
+            # Early turn of a session that is still in use
+            {"session_id": "active", "seq": 0, "timestamp": old},
+            {"session_id": "active", "seq": 1, "timestamp": now},
+        ]
+    )
+    repository = ChatSessionRepository()
+    repository._get_collection = lambda: sessions
+    repository._get_messages_collection = lambda: messages
+
+    deleted = asyncio.run(repository.delete_idle_sessions(now - timedelta(days=30)))
+
+    assert deleted == 1
+    assert [s["session_id"] for s in sessions.documents] == ["active"]
+    assert [(m["session_id"], m["seq"]) for m in messages.documents] == [
+        ("active", 0),
+        ("active", 1),
+    ]
+
+
+def test_no_ttl_indexes_are_declared_and_old_ones_are_dropped():
+    specs = index_specs()
+    for indexes in (specs["chat_sessions"], specs["chat_messages"]):
+        assert all("expireAfterSeconds" not in i.document for i in indexes)
+    assert obsolete_indexes()["chat_messages"] == ["timestamp_ttl"]
@@ -0,0 +1,85 @@
+import asyncio
+from types import SimpleNamespace
+
+from pymongo.errors import BulkWriteError
+
+from backend.config.settings import settings
+from backend.repositories.chunk_repository import (
+    ChunkRepository,
+    pack_embedding,
+    unpack_embedding,
+)
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.documents = []
+
+    async def insert_many(self, documents, ordered=True):
+        self.documents.extend(documents)
+        return SimpleNamespace(inserted_ids=[d["chunk_id"] for d in documents])
+
+
+class FailingCollection:
+    def __init__(self, details):
+        self.details = details
+
+    async def insert_many(self, documents, ordered=True):
+        raise BulkWriteError(self.details)
+
+
+def add_chunks_with_errors(details):
+    repository = ChunkRepository()
+    repository._get_collection = lambda: FailingCollection(details)
+    chunks = [{"id": str(i), "content": "text", "metadata": {}} for i in range(5)]
+    return asyncio.run(repository.add_chunks(chunks))
+
+
+def test_add_chunks_counts_partial_inserts():
+    details = {
+        "nInserted": 3,
+        "writeErrors": [
+            {"index": 1, "code": 121, "errmsg": "validation failed"},
+            {"index": 4, "code": 121, "errmsg": "validation failed"},
+        ],
+    }
+    assert add_chunks_with_errors(details) == 3
+
+
+def test_add_chunks_treats_duplicates_as_stored():
+    details = {
+        "nInserted": 3,
+        "writeErrors": [
+            {"index": 1, "code": 11000, "errmsg": "duplicate key"},
+            {"index": 4, "code": 11000, "errmsg": "duplicate key"},
+        ],
+    }
+    assert add_chunks_with_errors(details) == 5
+
+
+def test_packed_embedding_round_trip():
+    embedding = [0.25, -1.5, 3.0]
+    for dtype in ("float32", "float16"):
+        unpacked = unpack_embedding(bytes(pack_embedding(embedding, dtype)), dtype)
+        assert unpacked.tolist() == embedding
+
+
+def test_add_chunks_stores_embeddings_in_the_same_insert(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_STORAGE_DTYPE", "float16")
+    collection = RecordingCollection()
+    repository = ChunkRepository()
+    repository._get_collection = lambda: collection
+    chunks = [
+        {"id": "a", "content": "text", "metadata": {}, "embedding": [0.5, -2.0]},
+        {"id": "b", "content": "duplicate", "metadata": {}},
+    ]
+
+    assert asyncio.run(repository.add_chunks(chunks)) == 2
+    embedded, linked = collection.documents
+    assert unpack_embedding(bytes(embedded["embedding"]), "float16").tolist() == [
+        0.5,
+        -2.0,
+    ]
+    assert (embedded["embedding_dtype"], embedded["embedding_dim"]) == ("float16", 2)
+    assert embedded["embedding_model"] == settings.EMBEDDING_MODEL
+    assert "embedding" not in linked
@@ -0,0 +1,109 @@
+import asyncio
+import random
+
+from backend.usecases.dedup_usecase import DedupUsecase
+
+
+class FakeFingerprintRepository:
+    def __init__(self):
+        self.fingerprints = []
+
+    async def find_candidates(self, bands, exclude_url):
+        return [
+            f
+            for f in self.fingerprints
+            if f["url"] != exclude_url and set(f["bands"]) & set(bands)
+        ]
+
+    async def add_fingerprints(self, fingerprints):
+        self.fingerprints.extend(fingerprints)
+        return True
+
+    async def delete_previous_jobs(self, url, job_id):
+        before = len(self.fingerprints)
+        self.fingerprints = [
+            f for f in self.fingerprints if f["url"] != url or f["job_id"] == job_id
+        ]
+        return before - len(self.fingerprints)
+
+
+def make_usecase(mode="link"):
+    usecase = DedupUsecase()
+    usecase.mode = mode
+    usecase.fingerprint_repository = FakeFingerprintRepository()
+    return usecase
+
+
+def chunk(chunk_id, content):
+    return {"id": chunk_id, "content": content, "metadata": {}}
+
+
+TEXT = " ".join(f"word{i}" for i in range(200))
+
+
+def test_fingerprint_is_stable_and_close_for_small_edits():
+    usecase = make_usecase()
+    edited = TEXT.replace("word100", "changed")
+    assert usecase.fingerprint(TEXT) == usecase.fingerprint(TEXT)
+    distance = (usecase.fingerprint(TEXT) ^ usecase.fingerprint(edited)).bit_count()
+    assert distance <= usecase.threshold
+    assert usecase.fingerprint("") == 0
+
+
+def test_fingerprints_within_threshold_share_a_band():
+    usecase = make_usecase()
+    rng = random.Random(0)
+    for _ in range(200):
+        fingerprint = rng.getrandbits(64)
+        other = fingerprint
+        for bit in rng.sample(range(64), usecase.threshold):
+            other ^= 1 << bit
+        assert set(usecase.bands(fingerprint)) & set(usecase.bands(other))
+
+
+def test_deduplicate_against_corpus_and_batch():
+    usecase = make_usecase()
+
+    async def run():
+        canonical, duplicates = await usecase.deduplicate(
+            [chunk("a", TEXT), chunk("b", TEXT + " tail")], "https://one"
+        )
+        assert [c["id"] for c in canonical] == ["a"]
+        assert duplicates[0]["metadata"]["duplicate_of"] == "a"
+        await usecase.register(canonical, "https://one", "job-1")
+
+        canonical, duplicates = await usecase.deduplicate(
+            [chunk("c", TEXT), chunk("d", "something else entirely")],
+            "https://two",
+        )
+        assert [c["id"] for c in canonical] == ["d"]
+        assert duplicates[0]["metadata"]["duplicate_of"] == "a"
+
+    asyncio.run(run())
+
+
+def test_register_drops_fingerprints_of_earlier_jobs():
+    usecase = make_usecase()
+
+    async def run():
+        first, _ = await usecase.deduplicate([chunk("a", TEXT)], "https://one")
+        await usecase.register(first, "https://one", "job-1")
+        second, _ = await usecase.deduplicate([chunk("b", TEXT)], "https://one")
+        assert [c["id"] for c in second] == ["b"]  # same-URL matches are ignored
+        await usecase.register(second, "https://one", "job-2")
+
+        repository = usecase.fingerprint_repository
+        assert [f["chunk_id"] for f in repository.fingerprints] == ["b"]
+
+    asyncio.run(run())
+
+
+def test_disabled_mode_keeps_every_chunk():
+    usecase = make_usecase("off")
+
+    async def run():
+        chunks = [chunk("a", TEXT), chunk("b", TEXT)]
+        canonical, duplicates = await usecase.deduplicate(chunks, "https://one")
+        assert canonical == chunks and duplicates == []
+
+    asyncio.run(run())
@@ -0,0 +1,35 @@
+import asyncio
+
+import fakeredis
+import numpy as np
+import pytest
+
+from backend.config.redis import redis_client
+from backend.services.embedding_cache_service import EmbeddingCacheService
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    monkeypatch.setattr(
+        redis_client,
+        "async_redis_client",
+        fakeredis.FakeAsyncRedis(decode_responses=True),
+    )
+
+
+def test_replicas_share_vectors_through_redis():
+    async def run():
+        writer = EmbeddingCacheService(max_size=4, use_redis=True)
+        reader = EmbeddingCacheService(max_size=4, use_redis=True)
+        await writer.put("what is  pinecone", "model", np.array([0.5, 0.25]))
+
+        assert await reader.get("what is pinecone", "other-model") is None
+        vector = await reader.get("what is pinecone", "model")
+        assert vector.dtype == np.float32
+        assert vector.tolist() == [0.5, 0.25]
+        # Served from the local LRU from now on
+        assert await reader.get("what is pinecone", "model") is not None
+        return reader.stats()
+
+    stats = asyncio.run(run())
+    assert (stats["hits"], stats["redis_hits"], stats["misses"]) == (2, 1, 1)
@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.config.settings import settings
+from backend.usecases import groq_usecase
+from backend.usecases.groq_usecase import GroqUsecase
+
+
+class FakeCompletions:
+    def __init__(self, delay):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+
+    async def create(self, **kwargs):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        message = SimpleNamespace(content="answer")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def make_usecase(monkeypatch):
+    # A fresh semaphore per test: it belongs to the test's event loop
+    monkeypatch.setattr(groq_usecase, "_llm_semaphore", None)
+
+    def make(delay):
+        usecase = GroqUsecase()
+        usecase.groq = SimpleNamespace(
+            chat=SimpleNamespace(completions=FakeCompletions(delay))
+        )
+        return usecase
+
+    return make
+
+
+def test_completions_are_limited_to_max_concurrency(make_usecase, monkeypatch):
+    monkeypatch.setattr(settings, "GROQ_MAX_CONCURRENCY", 2)
+    usecase = make_usecase(0.02)
+
+    async def run():
+        return await asyncio.gather(
+            *[usecase.generate_response("prompt") for _ in range(6)]
+        )
+
+    assert asyncio.run(run()) == ["answer"] * 6
+    assert usecase.groq.chat.completions.max_running == 2
+    assert groq_usecase.llm_stats()["in_flight"] == 0
+
+
+def test_slow_completion_times_out_and_frees_its_slot(make_usecase, monkeypatch):
+    monkeypatch.setattr(settings, "GROQ_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "GROQ_TIMEOUT_SECONDS", 0.05)
+    usecase = make_usecase(10)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await usecase.generate_response("prompt")
+        # The slot was released: the next call gets it and times out too
+        with pytest.raises(asyncio.TimeoutError):
+            await usecase.generate_response("prompt")
+
+    asyncio.run(run())
+    assert groq_usecase.llm_stats()["in_flight"] == 0
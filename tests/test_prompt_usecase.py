@@ -0,0 +1,69 @@
+from backend.config.settings import settings
+from backend.usecases.prompt_usecase import (
+    PromptUsecase,
+    count_tokens,
+    load_prompt_tokenizer,
+    truncate_to_tokens,
+)
+
+
+def test_estimates_without_a_tokenizer(monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_TOKENIZER", "")
+    assert load_prompt_tokenizer() is False
+    assert count_tokens("a" * 9) == 3
+    assert count_tokens("") == 0
+    assert truncate_to_tokens("abcdefghij", 2) == "abcdefgh"
+
+
+def test_falls_back_to_estimate_if_tokenizer_cannot_load(monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_TOKENIZER", "missing/no-such-tokenizer")
+    assert load_prompt_tokenizer() is False
+    assert count_tokens("b" * 9) == 3
+
+
+def chunk(i, size):
+    return {
+        "id": f"c{i}",
+        "content": f"{i}" * size,
+        "metadata": {"url": f"https://{i}"},
+    }
+
+
+def turns(count, size):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn{i} " * size}
+        for i in range(count)
+    ]
+
+
+def test_history_is_limited_to_its_share_dropping_oldest_turns(monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_TOKENIZER", "")
+    monkeypatch.setattr(settings, "PROMPT_MAX_TOKENS", 1000)
+    monkeypatch.setattr(settings, "PROMPT_HISTORY_SHARE", 0.25)
+
+    built = PromptUsecase().build("question", [chunk(1, 40)], turns(20, 20))
+    usage = built["usage"]
+    available = settings.PROMPT_MAX_TOKENS - usage["instruction_tokens"]
+    assert 0 < usage["history_tokens"] <= int(available * 0.25)
+    assert usage["history_messages_dropped"] == 20 - usage["history_messages"] > 0
+    # The newest turns are kept
+    assert "turn19" in built["prompt"] and "turn0 " not in built["prompt"]
+
+
+def test_context_fills_the_rest_truncating_then_dropping_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_TOKENIZER", "")
+    monkeypatch.setattr(settings, "PROMPT_MAX_TOKENS", 1000)
+    monkeypatch.setattr(settings, "PROMPT_MIN_CHUNK_TOKENS", 16)
+
+    chunks = [chunk(i, 1200) for i in range(1, 6)]  # ~300 tokens each
+    built = PromptUsecase().build("question", chunks, turns(4, 5))
+    usage = built["usage"]
+    assert usage["prompt_tokens"] <= settings.PROMPT_MAX_TOKENS
+    assert usage["chunks_truncated"] == 1
+    assert usage["chunks"] + usage["chunks_dropped"] == 5
+    assert usage["chunks_dropped"] > 0
+    # Kept in rank order; only the last kept chunk is cut
+    kept = built["chunks"]
+    assert [c["id"] for c in kept] == [f"c{i}" for i in range(1, len(kept) + 1)]
+    assert all(c["content"] == "%d" % (i + 1) * 1200 for i, c in enumerate(kept[:-1]))
+    assert len(kept[-1]["content"]) < 1200
@@ -0,0 +1,17 @@
+import pytest
+from pydantic import ValidationError
+
+from backend.config.settings import settings
+from backend.models.schemas.query_schema import BatchQueryRequest, QueryRequest
+
+
+@pytest.mark.parametrize("model", [QueryRequest, BatchQueryRequest])
+def test_top_k_is_bounded(model):
+    base = {"query": "q"} if model is QueryRequest else {"queries": ["q"]}
+    assert model(**base).top_k == 5
+    assert (
+        model(**base, top_k=settings.QUERY_MAX_TOP_K).top_k == settings.QUERY_MAX_TOP_K
+    )
+    for top_k in (None, 0, -1, settings.QUERY_MAX_TOP_K + 1):
+        with pytest.raises(ValidationError):
+            model(**base, top_k=top_k)
@@ -0,0 +1,283 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.config.settings import settings
+from backend.routes.query_route import _ndjson_stream, _sse_stream
+from backend.services.background_service import background_service
+from backend.usecases.prompt_usecase import PromptUsecase
+from backend.usecases.query_usecase import QueryUsecase, cite_sources
+
+
+def match(chunk_id, score=0.9):
+    return {"id": chunk_id, "score": score, "metadata": {"url": "https://a"}}
+
+
+class FakeRetrieval:
+    def __init__(self, matches):
+        self.matches = matches  # query -> matches
+        self.embed_calls = []
+
+    async def embed_query(self, request):
+        return [1.0, 0.0]
+
+    async def embed_queries(self, queries):
+        self.embed_calls.append(list(queries))
+        return [[1.0, 0.0] for _ in queries]
+
+    async def retrieve(self, request, top_k, filter_dict, query_embedding=None, **_):
+        return [1.0, 0.0], [dict(m) for m in self.matches.get(request, [])]
+
+
+class FakeChunkRepository:
+    def __init__(self):
+        self.calls = []
+
+    async def get_chunks(self, chunk_ids):
+        self.calls.append(list(chunk_ids))
+        return [
+            {"id": i, "content": f"content of {i}", "metadata": {"url": "https://a"}}
+            for i in chunk_ids
+        ]
+
+
+class FakeGroq:
+    def __init__(self, tokens=("Hello", ", ", "world")):
+        self.tokens = tokens
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.block = False
+        self.stream_closed = False
+        self.streamed = 0
+
+    async def generate_response(self, prompt):
+        self.calls += 1
+        if self.block:
+            await self.release.wait()
+        return "".join(self.tokens)
+
+    async def stream_response(self, prompt):
+        try:
+            for token in self.tokens:
+                self.streamed += 1
+                yield token
+        finally:
+            self.stream_closed = True
+
+
+class FakeChatSession:
+    def __init__(self):
+        self.user_messages = []
+        self.assistant_messages = []
+
+    async def get_or_create_session(self, session_id):
+        return {"session_id": session_id}
+
+    async def get_memory(self, session_id):
+        return {"summary": "", "messages": []}
+
+    async def add_user_message(self, session_id, message):
+        self.user_messages.append(message)
+        return True
+
+    async def add_assistant_message(self, session_id, answer, sources):
+        self.assistant_messages.append(answer)
+        return True
+
+
+class FakeSelection:
+    async def select(self, chunks, top_k):
+        return chunks[:top_k]
+
+
+class FakeSummary:
+    async def refresh(self, session_id):
+        return False
+
+
+def make_usecase(matches, groq=None):
+    return QueryUsecase(
+        retrieval_usecase=FakeRetrieval(matches),
+        chunk_repository=FakeChunkRepository(),
+        groq_usecase=groq or FakeGroq(),
+        chat_session_usecase=FakeChatSession(),
+        rerank_usecase=None,
+        selection_usecase=FakeSelection(),
+        prompt_usecase=PromptUsecase(),
+        session_summary_usecase=FakeSummary(),
+    )
+
+
+@pytest.fixture(autouse=True)
+def plain_pipeline(monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "RERANK_ENABLED", False)
+    monkeypatch.setattr(settings, "MMR_ENABLED", False)
+    monkeypatch.setattr(settings, "HYBRID_SEARCH_ENABLED", False)
+
+
+def chunk(**scores):
+    return {"id": "c1", "content": "text", "metadata": {"url": "https://a"}, **scores}
+
+
+def test_citation_score_stays_cosine_in_hybrid_mode(monkeypatch):
+    monkeypatch.setattr(settings, "HYBRID_SEARCH_ENABLED", True)
+    fused = chunk(score=0.0323, vector_score=0.71)
+    assert cite_sources([fused])[0]["score"] == 0.71
+    assert cite_sources([fused])[0]["rrf_score"] == 0.0323
+    assert cite_sources([chunk(score=0.0161)])[0]["score"] is None
+
+    reranked = chunk(score=0.9, retrieval_score=0.0323, vector_score=0.71)
+    source = cite_sources([reranked])[0]
+    assert (source["score"], source["rrf_score"], source["rerank_score"]) == (
+        0.71,
+        0.0323,
+        0.9,
+    )
+
+
+def test_citation_score_is_cosine_in_vector_mode(monkeypatch):
+    source = cite_sources([chunk(score=0.9, retrieval_score=0.71)])[0]
+    assert (source["score"], source["rerank_score"]) == (0.71, 0.9)
+    assert "rrf_score" not in source
+
+
+class FakeHTTPRequest:
+    def __init__(self, connected_events):
+        self.checks = 0
+        self.connected_events = connected_events
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.checks > self.connected_events
+
+
+def test_stream_events_in_order_and_history_saved_on_completion():
+    usecase = make_usecase({"q": [match("c1"), match("c2")]})
+
+    async def run():
+        events = [e async for e in usecase.stream_query("q", session_id="s1")]
+        await background_service.drain()
+        return events
+
+    events = asyncio.run(run())
+    assert [name for name, _ in events] == [
+        "sources",
+        "token",
+        "token",
+        "token",
+        "done",
+    ]
+    assert [s["chunk_id"] for s in events[0][1]["sources"]] == ["c1", "c2"]
+    assert events[-1][1]["answer"] == "Hello, world"
+    assert usecase.chat_session_usecase.user_messages == ["q"]
+    assert usecase.chat_session_usecase.assistant_messages == ["Hello, world"]
+
+
+def test_stream_client_disconnect_stops_llm_and_skips_history():
+    usecase = make_usecase({"q": [match("c1")]})
+
+    async def run():
+        # The client goes away after the sources and the first token
+        events = usecase.stream_query("q", session_id="s1")
+        body = [e async for e in _sse_stream(events, FakeHTTPRequest(2))]
+        await background_service.drain()
+        return body
+
+    body = asyncio.run(run())
+    assert [chunk.split("\n")[0] for chunk in body] == [
+        "event: sources",
+        "event: token",
+    ]
+    assert usecase.groq_usecase.stream_closed
+    assert usecase.groq_usecase.streamed < 3
+    assert usecase.chat_session_usecase.assistant_messages == []
+
+
+def test_batch_embeds_once_hydrates_shared_chunks_once_and_keeps_index():
+    matches = {
+        "q0": [match("a"), match("b")],
+        "q1": [match("b"), match("c")],
+        "q2": [match("a"), match("c")],
+    }
+    usecase = make_usecase(matches)
+
+    async def run(retrieval_only):
+        results = usecase.query_batch(
+            ["q0", "q1", "q2"], top_k=2, retrieval_only=retrieval_only
+        )
+        return [
+            json.loads(line)
+            async for line in _ndjson_stream(results, FakeHTTPRequest(99))
+        ]
+
+    results = asyncio.run(run(True))
+    assert usecase.retrieval_usecase.embed_calls == [["q0", "q1", "q2"]]
+    assert usecase.chunk_repository.calls == [["a", "b", "c"]]
+    by_index = {result["index"]: result for result in results}
+    assert sorted(by_index) == [0, 1, 2]
+    for index, result in by_index.items():
+        assert result["query"] == f"q{index}"
+        assert [s["chunk_id"] for s in result["sources"]] == [
+            m["id"] for m in matches[f"q{index}"]
+        ]
+
+    answered = asyncio.run(run(False))
+    assert all(result["answer"] == "Hello, world" for result in answered)
+    assert usecase.groq_usecase.calls == 3
+
+
+def test_coalesced_queries_share_one_run_and_own_their_results(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_COALESCING_ENABLED", True)
+    groq = FakeGroq()
+    groq.block = True
+    usecase = make_usecase({"q": [match("c1")], "Q ": [match("c1")]}, groq)
+
+    async def run():
+        leader = asyncio.create_task(usecase.query_documents("q"))
+        follower = asyncio.create_task(usecase.query_documents("Q "))
+        leaving = asyncio.create_task(usecase.query_documents("q"))
+        await asyncio.sleep(0.01)
+        # A caller that disconnects must not cancel the shared run
+        leaving.cancel()
+        await asyncio.sleep(0.01)
+        groq.release.set()
+        return await leader, await follower, leaving.cancelled()
+
+    leader, follower, left = asyncio.run(run())
+    assert left and groq.calls == 1
+    assert leader["answer"] == follower["answer"] == "Hello, world"
+    assert (leader["query"], follower["query"]) == ("q", "Q ")
+    leader["sources"][0]["score"] = -1.0
+    assert follower["sources"][0]["score"] == 0.9
+
+
+def test_session_loading_overlaps_retrieval():
+    usecase = make_usecase({"q": [match("c1")]})
+    retrieving = asyncio.Event()
+    retrieve = usecase.retrieval_usecase.retrieve
+    get_memory = usecase.chat_session_usecase.get_memory
+
+    async def slow_retrieve(*args, **kwargs):
+        retrieving.set()
+        await asyncio.sleep(0.01)
+        return await retrieve(*args, **kwargs)
+
+    async def memory_after_retrieval_started(session_id):
+        # Only completes if the session branch runs alongside retrieval
+        await asyncio.wait_for(retrieving.wait(), 1)
+        return await get_memory(session_id)
+
+    usecase.retrieval_usecase.retrieve = slow_retrieve
+    usecase.chat_session_usecase.get_memory = memory_after_retrieval_started
+
+    async def run():
+        result = await usecase.query_documents("q", session_id="s1")
+        await background_service.drain()
+        return result
+
+    assert asyncio.run(run())["answer"] == "Hello, world"
+    # The user message is only recorded once the memory was loaded
+    assert usecase.chat_session_usecase.user_messages == ["q"]
+    assert usecase.chat_session_usecase.assistant_messages == ["Hello, world"]
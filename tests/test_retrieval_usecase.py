@@ -0,0 +1,65 @@
+import pytest
+
+from backend.usecases.retrieval_usecase import reciprocal_rank_fusion
+
+
+def matches(*ids):
+    return [{"id": i, "score": 1.0 - n / 10, "metadata": {}} for n, i in enumerate(ids)]
+
+
+def test_rrf_rewards_agreement_between_retrievers():
+    fused = reciprocal_rank_fusion(
+        {"vector": matches("a", "b", "c"), "bm25": matches("c", "d", "a")}, top_k=10
+    )
+    assert [m["id"] for m in fused] == ["a", "c", "b", "d"]
+    assert fused[0]["score"] == pytest.approx(1 / 61 + 1 / 63)
+    assert fused[0]["vector_score"] == 1.0 and fused[0]["bm25_score"] == 0.8
+    assert "bm25_score" not in fused[2]
+
+
+def test_rrf_truncates_to_top_k_and_uses_rank_constant():
+    fused = reciprocal_rank_fusion({"vector": matches("a", "b", "c")}, top_k=2, k=0)
+    assert [m["id"] for m in fused] == ["a", "b"]
+    assert [m["score"] for m in fused] == pytest.approx([1.0, 0.5])
+
+
+def test_build_filter_translates_scope():
+    from datetime import datetime
+
+    from backend.models.schemas.query_schema import QueryFilters
+    from backend.services.vector_stores.base import matches_filter, vector_metadata
+    from backend.usecases.retrieval_usecase import build_filter
+
+    filter_dict = build_filter(
+        QueryFilters(
+            url_prefix="https://www.example.com/docs/",
+            domains=["https://Example.com"],
+            job_ids=["job-1"],
+            ingested_after=datetime(2024, 1, 1),
+        )
+    )
+    assert filter_dict == {
+        "url_prefixes": {"$eq": "example.com/docs"},
+        "domain": {"$in": ["example.com"]},
+        "job_id": {"$in": ["job-1"]},
+        "ingested_at": {"$gte": 1704067200},
+    }
+
+    def chunk(url, ingested_at):
+        return vector_metadata(
+            {
+                "id": "c",
+                "metadata": {"url": url, "job_id": "job-1", "ingested_at": ingested_at},
+            }
+        )
+
+    assert matches_filter(
+        chunk("https://example.com/docs/api", 1704067201), filter_dict
+    )
+    assert not matches_filter(
+        chunk("https://example.com/docs-old", 1704067201), filter_dict
+    )
+    assert not matches_filter(
+        chunk("https://example.com/docs/api", 1704067199), filter_dict
+    )
+    assert build_filter(QueryFilters()) is None
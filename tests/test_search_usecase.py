@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from backend.config.settings import settings
+from backend.models.schemas.search_schema import SearchRequest
+from backend.usecases.search_usecase import SearchUsecase
+
+
+class FakeRetrievalUsecase:
+    def __init__(self, matches):
+        self.matches = matches
+        self.depths = []
+
+    async def retrieve(self, query, top_k=5, filter_dict=None, **kwargs):
+        self.depths.append(top_k)
+        return [1.0], [dict(match) for match in self.matches[:top_k]]
+
+
+class FakeChunkRepository:
+    async def get_chunks(self, chunk_ids):
+        return [
+            {"id": i, "content": f"text {i}", "metadata": {"url": "https://x"}}
+            for i in chunk_ids
+        ]
+
+
+def make_usecase(matches):
+    return SearchUsecase(FakeRetrievalUsecase(matches), FakeChunkRepository())
+
+
+def all_pages(usecase, top_k, **kwargs):
+    pages, cursor = [], None
+    while True:
+        page = asyncio.run(usecase.search("q", top_k, cursor=cursor, **kwargs))
+        pages.append([r["chunk_id"] for r in page["results"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pages_cover_the_ranking_once(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_MAX_DEPTH", 20)
+    monkeypatch.setattr(settings, "HYBRID_SEARCH_ENABLED", False)
+    # Tied scores are ordered by id
+    matches = [
+        {"id": f"c{i:02d}", "score": 1.0 - (i // 2) / 10, "metadata": {}}
+        for i in range(25)
+    ]
+    usecase = make_usecase(matches)
+
+    pages = all_pages(usecase, 3)
+    flat = [chunk_id for page in pages for chunk_id in page]
+    assert flat == [f"c{i:02d}" for i in range(20)]
+    assert [len(page) for page in pages] == [3] * 6 + [2]
+    # Every page ranks at the same depth
+    assert set(usecase.retrieval_usecase.depths) == {20}
+
+
+def test_cursor_skips_nothing_when_the_index_changes(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_MAX_DEPTH", 20)
+    matches = [{"id": f"c{i}", "score": 1.0 - i / 10, "metadata": {}} for i in range(6)]
+    usecase = make_usecase(matches)
+
+    first = asyncio.run(usecase.search("q", 2))
+    # A new best match arrives between pages
+    usecase.retrieval_usecase.matches = [
+        {"id": "new", "score": 2.0, "metadata": {}}
+    ] + matches
+    second = asyncio.run(usecase.search("q", 2, cursor=first["next_cursor"]))
+    assert [r["chunk_id"] for r in first["results"]] == ["c0", "c1"]
+    assert [r["chunk_id"] for r in second["results"]] == ["c2", "c3"]
+
+
+def test_cursor_is_tied_to_its_search(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_MAX_DEPTH", 20)
+    matches = [{"id": f"c{i}", "score": 1.0 - i / 10, "metadata": {}} for i in range(6)]
+    usecase = make_usecase(matches)
+    cursor = asyncio.run(usecase.search("q", 2))["next_cursor"]
+
+    with pytest.raises(ValueError):
+        asyncio.run(usecase.search("q", 2, min_score=0.5, cursor=cursor))
+    with pytest.raises(ValueError):
+        asyncio.run(usecase.search("q", 2, cursor="not-a-cursor"))
+
+
+def test_search_request_rejects_bad_top_k():
+    assert SearchRequest(query="q").top_k == 10
+    for top_k in (None, 0, -3, settings.SEARCH_MAX_DEPTH + 1):
+        with pytest.raises(ValidationError):
+            SearchRequest(query="q", top_k=top_k)
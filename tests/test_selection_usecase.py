@@ -0,0 +1,108 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from backend.config.settings import settings
+from backend.usecases.selection_usecase import (
+    SelectionUsecase,
+    cutoff_key,
+    maximal_marginal_relevance,
+    score_cutoff,
+)
+
+
+def test_score_cutoff_is_relative_to_best_and_keeps_unscored():
+    chunks = [
+        {"id": "a", "vector_score": 0.8},
+        {"id": "b", "vector_score": 0.3},
+        {"id": "c"},  # BM25-only hit
+        {"id": "d", "vector_score": 0.1},
+    ]
+    kept = score_cutoff(chunks, 0.5, "vector_score")
+    assert [c["id"] for c in kept] == ["a", "c"]
+    assert score_cutoff(chunks, 0, "vector_score") == chunks
+    assert score_cutoff([{"id": "a", "score": -1.0}], 0.5) == [
+        {"id": "a", "score": -1.0}
+    ]
+
+
+def test_cutoff_key_ignores_fused_rrf_scores(monkeypatch):
+    monkeypatch.setattr(settings, "HYBRID_SEARCH_ENABLED", True)
+    assert cutoff_key([{"score": 1 / 61, "vector_score": 0.9}]) == "vector_score"
+    assert cutoff_key([{"score": 4.2, "retrieval_score": 1 / 61}]) == "score"
+    monkeypatch.setattr(settings, "HYBRID_SEARCH_ENABLED", False)
+    assert cutoff_key([{"score": 0.9}]) == "score"
+
+
+def test_mmr_skips_near_duplicates():
+    embeddings = np.array([[1.0, 0.0], [0.999, 0.045], [0.0, 1.0]], dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    relevance = np.array([1.0, 0.95, 0.6], dtype=np.float32)
+
+    assert maximal_marginal_relevance(relevance, embeddings, 2, 0.5) == [0, 2]
+    assert maximal_marginal_relevance(relevance, embeddings, 2, 1.0) == [0, 1]
+    assert maximal_marginal_relevance(relevance, embeddings, 5, 0.5) == [0, 2, 1]
+
+
+class FakeChunkRepository:
+    def __init__(self, stored):
+        self.stored = stored
+        self.requested = []
+
+    async def get_embeddings(self, chunk_ids):
+        self.requested.append(chunk_ids)
+        return {i: self.stored[i] for i in chunk_ids if i in self.stored}
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append((texts, kwargs))
+        return np.ones((len(texts), settings.EMBEDDING_DIMENSION), dtype=np.float32)
+
+
+class FakeEmbeddingUsecase:
+    def __init__(self):
+        self.model = FakeModel()
+
+
+def test_candidate_embeddings_prefer_hit_values(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 2)
+    repository = FakeChunkRepository({"b": np.array([0.0, 2.0], dtype=np.float32)})
+    embedding_usecase = FakeEmbeddingUsecase()
+    usecase = SelectionUsecase(repository, embedding_usecase)
+
+    chunks = [
+        {"id": "a", "content": "x", "values": [3.0, 0.0]},
+        {"id": "b", "content": "y"},
+        {"id": "c", "content": "z"},
+    ]
+    embeddings = asyncio.run(usecase._candidate_embeddings(chunks))
+
+    assert repository.requested == [["b", "c"]]
+    assert embedding_usecase.model.calls[0][0] == ["z"]
+    assert embedding_usecase.model.calls[0][1]["show_progress_bar"] is False
+    assert embeddings == pytest.approx(
+        np.array([[1.0, 0.0], [0.0, 1.0], [2**-0.5, 2**-0.5]])
+    )
+
+
+def test_select_cuts_on_cosine_then_diversifies(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 2)
+    monkeypatch.setattr(settings, "HYBRID_SEARCH_ENABLED", True)
+    monkeypatch.setattr(settings, "SCORE_CUTOFF_RATIO", 0.5)
+    monkeypatch.setattr(settings, "MMR_ENABLED", True)
+    monkeypatch.setattr(settings, "MMR_LAMBDA", 0.5)
+    usecase = SelectionUsecase(FakeChunkRepository({}), FakeEmbeddingUsecase())
+
+    chunks = [
+        {"id": "a", "score": 1 / 61, "vector_score": 0.9, "values": [1.0, 0.0]},
+        {"id": "b", "score": 1 / 62, "vector_score": 0.88, "values": [1.0, 0.01]},
+        {"id": "c", "score": 1 / 63, "vector_score": 0.6, "values": [0.0, 1.0]},
+        {"id": "d", "score": 1 / 64, "vector_score": 0.2, "values": [0.7, 0.7]},
+    ]
+    selected = asyncio.run(usecase.select(chunks, 2))
+    assert [c["id"] for c in selected] == ["a", "c"]
@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime
+
+import fakeredis
+import pytest
+
+from backend.config.redis import redis_client
+from backend.config.settings import settings
+from backend.services.session_cache_service import (
+    PENDING_SESSIONS_KEY,
+    SessionCacheService,
+)
+
+
+class FakeChatSessionRepository:
+    def __init__(self):
+        self.sessions = {}
+        self.messages = {}
+        self.fail_inserts = False
+        self.insert_calls = 0
+
+    async def get_or_create_session(self, session_id):
+        session = self.sessions.setdefault(
+            session_id,
+            {
+                "session_id": session_id,
+                "summary": "",
+                "summarized_count": 0,
+                "message_count": 0,
+            },
+        )
+        return dict(session)
+
+    async def get_recent_messages(self, session_id, limit):
+        stored = sorted(
+            (m for (sid, _), m in self.messages.items() if sid == session_id),
+            key=lambda m: m["seq"],
+        )
+        return stored[-limit:]
+
+    async def insert_messages(self, messages):
+        self.insert_calls += 1
+        if self.fail_inserts:
+            return False
+        for message in messages:
+            # Existing messages are skipped, like the unique (session_id, seq) index
+            self.messages.setdefault((message["session_id"], message["seq"]), message)
+            session = self.sessions[message["session_id"]]
+            session["message_count"] = max(session["message_count"], message["seq"])
+        return True
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(
+        redis_client,
+        "async_redis_client",
+        fakeredis.FakeAsyncRedis(decode_responses=True),
+    )
+    monkeypatch.setattr(settings, "SESSION_CACHE_MESSAGES", 3)
+    service = SessionCacheService()
+    service.chat_session_repository = FakeChatSessionRepository()
+    return service
+
+
+def message(session_id, content):
+    return {
+        "session_id": session_id,
+        "role": "user",
+        "content": content,
+        "timestamp": datetime(2024, 1, 1),
+    }
+
+
+def test_write_through_assigns_seq_and_stores(cache, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_WRITE_MODE", "write_through")
+
+    async def run():
+        for i in range(4):
+            assert await cache.add_message(message("s1", f"m{i}"))
+        return await cache.get_messages("s1", 10), await cache.get_session("s1")
+
+    cached, session = asyncio.run(run())
+    repository = cache.chat_session_repository
+    assert sorted(seq for _, seq in repository.messages) == [1, 2, 3, 4]
+    assert [m["seq"] for m in cached] == [2, 3, 4]  # Capped list
+    assert cached[-1]["content"] == "m3"
+    assert session["message_count"] == 4
+
+
+def test_write_behind_flush_retries_failed_batches(cache, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_WRITE_MODE", "write_behind")
+    repository = cache.chat_session_repository
+
+    async def run():
+        for i in range(3):
+            await cache.add_message(message("s1", f"a{i}"))
+        await cache.add_message(message("s2", "b0"))
+        assert not repository.messages
+
+        repository.fail_inserts = True
+        assert await cache.flush() == 0
+        assert cache.flush_failures == 1
+
+        repository.fail_inserts = False
+        assert await cache.flush() == 4
+        assert await cache.flush() == 0
+        return await cache._client().smembers(PENDING_SESSIONS_KEY)
+
+    pending = asyncio.run(run())
+    assert sorted(repository.messages) == [("s1", 1), ("s1", 2), ("s1", 3), ("s2", 1)]
+    assert not pending
+
+
+def test_miss_flushes_only_that_session_before_rebuilding(cache, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_WRITE_MODE", "write_behind")
+    repository = cache.chat_session_repository
+
+    async def run():
+        await cache.add_message(message("s1", "a0"))
+        await cache.add_message(message("s1", "a1"))
+        await cache.add_message(message("s2", "b0"))
+        await cache.evict("s1")
+
+        session = await cache.load_session("s1")
+        assert session["message_count"] == 2
+        assert ("s2", 1) not in repository.messages
+
+        await cache.add_message(message("s1", "a2"))
+        return await cache.get_messages("s1", 10)
+
+    cached = asyncio.run(run())
+    assert [m["seq"] for m in cached] == [1, 2, 3]
+
+
+def test_miss_fails_while_queued_messages_cannot_be_written(cache, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_WRITE_MODE", "write_behind")
+
+    async def run():
+        await cache.add_message(message("s1", "a0"))
+        await cache.evict("s1")
+        cache.chat_session_repository.fail_inserts = True
+        with pytest.raises(RuntimeError):
+            await cache.load_session("s1")
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_build_the_entry_once(cache, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_WRITE_MODE", "write_through")
+
+    async def run():
+        await asyncio.gather(
+            *[cache.add_message(message("s1", "x")) for _ in range(10)]
+        )
+        return await cache.get_session("s1")
+
+    session = asyncio.run(run())
+    assert session["message_count"] == 10
+    assert sorted(seq for _, seq in cache.chat_session_repository.messages) == list(
+        range(1, 11)
+    )
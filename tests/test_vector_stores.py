@@ -0,0 +1,290 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from backend.config.settings import settings
+
+DIMENSION = 16
+
+
+@pytest.fixture(autouse=True)
+def small_index(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", DIMENSION)
+    monkeypatch.setattr(settings, "HNSW_INITIAL_CAPACITY", 64)
+    monkeypatch.setattr(settings, "VECTOR_STORE_SAVE_INTERVAL", 0.0)
+    monkeypatch.setattr(settings, "VECTOR_STORE_RELOAD_INTERVAL", 0.0)
+
+
+def embedded_chunks(count, job_id="job-1", url="https://example.com/docs/a", seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "id": f"{job_id}-{i}",
+            "embedding": rng.normal(size=DIMENSION).tolist(),
+            "metadata": {"url": url, "job_id": job_id, "ingested_at": 1000 + i},
+        }
+        for i in range(count)
+    ]
+
+
+def search(store, embedding, top_k=5, filter_dict=None):
+    return asyncio.run(store.search_similar(embedding, top_k, filter_dict))
+
+
+def upsert(store, chunks):
+    assert asyncio.run(store.upsert_embeddings(chunks))
+
+
+def make_hnsw(path):
+    from backend.services.vector_stores.hnsw_store import HNSWVectorStore
+
+    return HNSWVectorStore(str(path))
+
+
+def test_hnsw_search_filter_delete_and_reupsert(tmp_path):
+    store = make_hnsw(tmp_path)
+    one = embedded_chunks(20, "job-1")
+    two = embedded_chunks(20, "job-2", url="https://other.org/x", seed=1)
+    upsert(store, one + two)
+
+    results = search(store, one[3]["embedding"])
+    assert results[0]["id"] == "job-1-3"
+    assert results[0]["score"] == pytest.approx(1.0, abs=1e-4)
+
+    scoped = search(store, one[3]["embedding"], 10, {"domain": {"$eq": "other.org"}})
+    assert scoped and all(r["metadata"]["job_id"] == "job-2" for r in scoped)
+
+    asyncio.run(store.delete_by_job_id("job-1"))
+    assert all(r["id"].startswith("job-2") for r in search(store, one[3]["embedding"]))
+
+    replaced = dict(two[0], embedding=one[3]["embedding"])
+    upsert(store, [replaced])
+    assert search(store, one[3]["embedding"], 1)[0]["id"] == "job-2-0"
+    assert len(store.labels) == 20
+
+
+def test_hnsw_reopen_and_cross_instance_reload(tmp_path):
+    writer = make_hnsw(tmp_path)
+    reader = make_hnsw(tmp_path)
+    chunks = embedded_chunks(30)
+    upsert(writer, chunks)
+    asyncio.run(writer.delete_by_job_id("missing"))
+
+    # The reader picks up the writer's save on its next search
+    assert search(reader, chunks[5]["embedding"], 1)[0]["id"] == "job-1-5"
+
+    upsert(writer, embedded_chunks(5, "job-2", seed=3))
+    asyncio.run(writer.delete_by_job_id("job-1"))
+    reopened = make_hnsw(tmp_path)
+    assert sorted(chunk_id for chunk_id, _ in reopened.labels.values()) == [
+        f"job-2-{i}" for i in range(5)
+    ]
+    assert search(reader, chunks[5]["embedding"], 3)[0]["id"].startswith("job-2")
+
+
+def test_hnsw_save_interval_appends_to_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_STORE_SAVE_INTERVAL", 3600.0)
+    store = make_hnsw(tmp_path)
+    store.last_save = float("-inf")
+    upsert(store, embedded_chunks(10))  # First write saves immediately
+    manifest_path = os.path.join(tmp_path, "hnsw_manifest.json")
+    saved_bytes = json.load(open(manifest_path))["log_bytes"]
+
+    upsert(store, embedded_chunks(10, "job-2", seed=1))
+    assert store.dirty
+    assert json.load(open(manifest_path))["log_bytes"] == saved_bytes
+    assert len(make_hnsw(tmp_path).labels) == 10  # Not saved yet
+
+    store.flush(force=False)
+    assert store.dirty  # Interval has not passed
+    store.flush()
+    manifest = json.load(open(manifest_path))
+    assert manifest["log_bytes"] > saved_bytes and manifest["generation"] == 0
+    assert len(make_hnsw(tmp_path).labels) == 20
+
+
+def test_hnsw_rewrites_log_after_many_deletes(tmp_path):
+    store = make_hnsw(tmp_path)
+    for n in range(4):
+        upsert(store, embedded_chunks(400, f"job-{n}", seed=n))
+        asyncio.run(store.delete_by_job_id(f"job-{n}"))
+    upsert(store, embedded_chunks(3, "job-last"))
+
+    assert store.generation > 0
+    assert not os.path.exists(os.path.join(tmp_path, "hnsw_labels_0.jsonl"))
+    reopened = make_hnsw(tmp_path)
+    assert sorted(chunk_id for chunk_id, _ in reopened.labels.values()) == [
+        f"job-last-{i}" for i in range(3)
+    ]
+
+
+def test_hnsw_converts_legacy_sidecar(tmp_path):
+    store = make_hnsw(tmp_path)
+    chunks = embedded_chunks(5)
+    upsert(store, chunks)
+    store.index.save_index(os.path.join(tmp_path, "hnsw_index.bin"))
+    with open(os.path.join(tmp_path, "hnsw_sidecar.json"), "w") as f:
+        json.dump(
+            {
+                "dimension": DIMENSION,
+                "max_elements": store.index.get_max_elements(),
+                "next_label": store.next_label,
+                "labels": {
+                    str(label): [chunk_id, metadata]
+                    for label, (chunk_id, metadata) in store.labels.items()
+                },
+            },
+            f,
+        )
+    store.close()
+    for name in os.listdir(tmp_path):
+        if name.startswith("hnsw_labels_") or name == "hnsw_manifest.json":
+            os.remove(os.path.join(tmp_path, name))
+
+    legacy = make_hnsw(tmp_path)
+    assert len(legacy.labels) == 5
+    upsert(legacy, embedded_chunks(1, "job-2"))
+    assert not os.path.exists(os.path.join(tmp_path, "hnsw_sidecar.json"))
+    assert len(make_hnsw(tmp_path).labels) == 6
+
+
+def test_hnsw_single_writer(tmp_path):
+    writer = make_hnsw(tmp_path)
+    other = make_hnsw(tmp_path)
+    upsert(writer, embedded_chunks(10))
+
+    # A second writing process would overwrite the first one's snapshots
+    assert not asyncio.run(other.upsert_embeddings(embedded_chunks(5, "job-2")))
+    assert not asyncio.run(other.delete_by_job_id("job-1"))
+    assert len(search(other, embedded_chunks(1)[0]["embedding"], 20)) == 10
+
+    writer.close()
+    upsert(other, embedded_chunks(5, "job-2", seed=1))
+    assert len(other.labels) == 15
+    assert len(make_hnsw(tmp_path).labels) == 15
+
+
+@pytest.fixture(params=["flat", "binary"])
+def flat_backend(request, monkeypatch):
+    monkeypatch.setattr(settings, "FLAT_SEARCH_BLOCK_ROWS", 8)
+    monkeypatch.setattr(settings, "BINARY_RESCORE_MULTIPLIER", 64)
+    if request.param == "flat":
+        from backend.services.vector_stores.flat_store import FlatVectorStore
+
+        return FlatVectorStore
+    from backend.services.vector_stores.binary_store import BinaryQuantizedVectorStore
+
+    return BinaryQuantizedVectorStore
+
+
+def test_flat_search_filter_delete_and_reupsert(tmp_path, flat_backend):
+    store = flat_backend(str(tmp_path))
+    one = embedded_chunks(20, "job-1")
+    two = embedded_chunks(20, "job-2", url="https://other.org/x", seed=1)
+    upsert(store, one + two)
+
+    results = search(store, one[3]["embedding"])
+    assert results[0]["id"] == "job-1-3"
+    assert results[0]["score"] == pytest.approx(1.0, abs=1e-4)
+    assert [r["score"] for r in results] == sorted(
+        (r["score"] for r in results), reverse=True
+    )
+
+    scoped = search(store, one[3]["embedding"], 10, {"job_id": {"$in": ["job-2"]}})
+    assert len(scoped) == 10 and all(r["id"].startswith("job-2") for r in scoped)
+    recent = search(store, one[3]["embedding"], 50, {"ingested_at": {"$gte": 1015}})
+    assert len(recent) == 10
+
+    asyncio.run(store.delete_by_job_id("job-1"))
+    assert all(r["id"].startswith("job-2") for r in search(store, one[3]["embedding"]))
+
+    replaced = dict(two[0], embedding=one[3]["embedding"])
+    upsert(store, [replaced])
+    assert search(store, one[3]["embedding"], 1)[0]["id"] == "job-2-0"
+    assert len(store.id_to_row) == 20
+
+
+def test_flat_reopen_compaction_and_cross_instance_refresh(tmp_path, flat_backend):
+    writer = flat_backend(str(tmp_path))
+    reader = flat_backend(str(tmp_path))
+    chunks = embedded_chunks(30)
+    upsert(writer, chunks)
+    assert search(reader, chunks[5]["embedding"], 1)[0]["id"] == "job-1-5"
+
+    upsert(writer, embedded_chunks(5, "job-2", seed=3))
+    asyncio.run(writer.delete_by_job_id("job-1"))  # Triggers a compaction
+    assert writer.generation == 1
+
+    results = search(reader, chunks[5]["embedding"], 10)
+    assert sorted(r["id"] for r in results) == [f"job-2-{i}" for i in range(5)]
+    reopened = flat_backend(str(tmp_path))
+    assert sorted(reopened.id_to_row) == [f"job-2-{i}" for i in range(5)]
+
+
+def test_flat_writers_in_several_processes_get_distinct_rows(tmp_path, flat_backend):
+    writers = [flat_backend(str(tmp_path)) for _ in range(4)]
+    jobs = [embedded_chunks(40, f"job-{n}", seed=n) for n in range(4)]
+
+    def write(n):
+        for chunk in jobs[n]:
+            writers[n]._upsert([chunk])
+
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(write, range(4)))
+
+    reopened = flat_backend(str(tmp_path))
+    assert len(reopened.id_to_row) == 160
+    for chunk in sum(jobs, []):
+        assert search(reopened, chunk["embedding"], 1)[0]["id"] == chunk["id"]
+
+
+def unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_search_include_values_returns_stored_vectors(tmp_path, flat_backend):
+    hnsw = make_hnsw(tmp_path / "hnsw")
+    flat = flat_backend(str(tmp_path / "flat"))
+    chunks = embedded_chunks(20) + embedded_chunks(3, "job-2", seed=1)
+    for store in (hnsw, flat):
+        upsert(store, chunks)
+        assert "values" not in search(store, chunks[4]["embedding"])[0]
+
+        for filter_dict in (None, {"job_id": {"$eq": "job-2"}}):
+            results = asyncio.run(
+                store.search_similar(
+                    chunks[4]["embedding"], 3, filter_dict, include_values=True
+                )
+            )
+            by_id = {chunk["id"]: chunk["embedding"] for chunk in chunks}
+            for result in results:
+                assert unit(result["values"]) == pytest.approx(
+                    unit(by_id[result["id"]]), abs=1e-4
+                )
+                assert "label" not in result
+
+
+@pytest.mark.parametrize("threshold", [0, 1000])
+def test_hnsw_filtered_search_skips_replaced_and_deleted(
+    tmp_path, monkeypatch, threshold
+):
+    # threshold 0 forces the graph search with the mask filter, 1000 the exact scan
+    monkeypatch.setattr(settings, "HNSW_FILTER_EXACT_THRESHOLD", threshold)
+    store = make_hnsw(tmp_path)
+    one = embedded_chunks(20, "job-1")
+    two = embedded_chunks(20, "job-2", seed=1)
+    upsert(store, one + two)
+    # Replacing moves a chunk to job-3; its old job-1 label must not match
+    upsert(store, [dict(one[0], metadata=dict(one[0]["metadata"], job_id="job-3"))])
+    asyncio.run(store.delete_by_job_id("job-2"))
+
+    scoped = search(store, one[0]["embedding"], 50, {"job_id": {"$eq": "job-1"}})
+    assert sorted(r["id"] for r in scoped) == sorted(c["id"] for c in one[1:])
+    moved = search(store, one[0]["embedding"], 5, {"job_id": {"$eq": "job-3"}})
+    assert [r["id"] for r in moved] == ["job-1-0"]
+    assert search(store, one[0]["embedding"], 5, {"job_id": {"$eq": "job-2"}}) == []
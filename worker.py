@@ -7,6 +7,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "backend"))
 
 from backend.config.redis import redis_client
 from backend.config.settings import settings
+from backend.services.embedding_pool_service import get_embedding_pool
+from backend.services.index_service import IndexService
+from backend.services.vector_stores import run_vector_store_flusher
 from backend.usecases.worker_usecase import WorkerUsecase
 
 
@@ -24,8 +27,23 @@ async def main():
         print(f"❌ Failed to connect to Redis: {str(e)}")
         return
 
+    # Create missing MongoDB indexes while the worker starts polling
+    index_task = asyncio.create_task(IndexService().bootstrap())
+
+    # Saves local vector indexes written by jobs every VECTOR_STORE_SAVE_INTERVAL
+    flusher_task = asyncio.create_task(run_vector_store_flusher())
+
     worker_usecase = WorkerUsecase()
-    await worker_usecase.worker_loop()
+    try:
+        await worker_usecase.worker_loop()
+    finally:
+        if not index_task.done():
+            index_task.cancel()
+        get_embedding_pool().shutdown()
+        # Saves whatever is still pending
+        flusher_task.cancel()
+        await asyncio.gather(flusher_task, return_exceptions=True)
+        await redis_client.disconnect_async()
 
 
 if __name__ == "__main__":